@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import os
 
@@ -7,6 +9,7 @@ from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import (
 	BaseMessage,
 	HumanMessage,
+	SystemMessage,
 )
 from langchain_core.messages.utils import convert_to_openai_messages
 
@@ -26,8 +29,19 @@ class Memory:
 	into concise, structured representations at specified intervals. It serves to optimize context window
 	utilization during extended task execution by converting verbose historical information into compact,
 	yet comprehensive memory constructs that preserve essential operational knowledge.
+
+	The summaries are created with Mem0, or with the agent's LLM alone when config.summarizer is 'llm', which needs
+	no embedder or vector store. Agent.step() creates them in the background with start_compaction() and swaps them
+	into the history with apply_compaction() once they are ready, so the steps don't wait for them.
 	"""
 
+	SUMMARY_PROMPT = (
+		'Summarize the history of a browser automation agent below into a procedural memory, so the agent can continue '
+		'its task from the summary instead of the history. List the steps it took in order with their results, '
+		'what it found out, and what it was about to do next. Keep the URLs, values and errors it still needs. '
+		'Answer with the summary only.'
+	)
+
 	def __init__(
 		self,
 		message_manager: MessageManager,
@@ -36,6 +50,9 @@ class Memory:
 	):
 		self.message_manager = message_manager
 		self.llm = llm
+		self.mem0 = None
+		self._compaction_task: asyncio.Task[str | None] | None = None
+		self._compacted_messages: list[ManagedMessage] = []
 
 		# Initialize configuration with defaults based on the LLM if not provided
 		if config is None:
@@ -60,6 +77,9 @@ class Memory:
 			self.config = MemoryConfig(**dict(config))  # re-validate untrusted user-provided config
 			self.config.llm_instance = llm
 
+		if self.config.summarizer == 'llm':
+			return
+
 		# Check for required packages
 		try:
 			# also disable mem0's telemetry when ANONYMIZED_TELEMETRY=False
@@ -91,52 +111,117 @@ class Memory:
 		"""
 		logger.info(f'Creating procedural memory at step {current_step}')
 
-		# Get all messages
-		all_messages = self.message_manager.state.history.messages
+		messages_to_process = self._get_messages_to_process()
+		if not messages_to_process:
+			return
+		# Create a procedural memory
+		memory_content = self._create([m.message for m in messages_to_process], current_step)
+		self._replace_with_memory(messages_to_process, memory_content)
 
-		# Separate messages into those to keep as-is and those to process for memory
-		new_messages = []
-		messages_to_process = []
+	def start_compaction(self, current_step: int) -> None:
+		"""
+		Start creating a procedural memory of the current history in the background, see apply_compaction().
 
-		for msg in all_messages:
-			if isinstance(msg, ManagedMessage) and msg.metadata.message_type in {'init', 'memory'}:
-				# Keep system and memory messages as they are
-				new_messages.append(msg)
-			else:
-				if len(msg.message.content) > 0:
-					messages_to_process.append(msg)
+		Args:
+		    current_step: The current step number of the agent
+		"""
+		if self._compaction_task and not self._compaction_task.done():
+			logger.debug('Procedural memory of the previous interval is still being created')
+			return
+
+		messages_to_process = self._get_messages_to_process()
+		if not messages_to_process:
+			return
+		logger.info(f'Creating procedural memory at step {current_step} in the background')
+		self._compacted_messages = messages_to_process
+		self._compaction_task = asyncio.create_task(self._acreate([m.message for m in messages_to_process], current_step))
+
+	def apply_compaction(self) -> bool:
+		"""
+		Replace the messages summarized by start_compaction() with their procedural memory, if it is ready.
+
+		The messages added to the history since the compaction started are kept after the memory.
+		Returns whether the history was compacted.
+		"""
+		task = self._compaction_task
+		if not task or not task.done():
+			return False
+		self._compaction_task = None
+		messages_to_process, self._compacted_messages = self._compacted_messages, []
+		if task.cancelled():
+			return False
+		return self._replace_with_memory(messages_to_process, task.result())
+
+	async def cancel_compaction(self) -> None:
+		"""Stop creating the procedural memory started by start_compaction()"""
+		task, self._compaction_task = self._compaction_task, None
+		self._compacted_messages = []
+		if task and not task.done():
+			task.cancel()
+			try:
+				await task
+			except asyncio.CancelledError:
+				pass
+
+	def _get_messages_to_process(self) -> list[ManagedMessage]:
+		"""The messages of the history to summarize, empty if there are not enough of them"""
+		messages_to_process = [
+			msg
+			for msg in self.message_manager.state.history.messages
+			# Keep system and memory messages as they are, the model outputs are summarized together with their tool messages
+			if msg.metadata.message_type not in {'init', 'memory'}
+		]
 
 		# Need at least 2 messages to create a meaningful summary
 		if len(messages_to_process) <= 1:
 			logger.info('Not enough non-memory messages to summarize')
-			return
-		# Create a procedural memory
-		memory_content = self._create([m.message for m in messages_to_process], current_step)
+			return []
+		return messages_to_process
 
+	def _replace_with_memory(self, messages_to_process: list[ManagedMessage], memory_content: str | None) -> bool:
+		"""Replace the processed messages with the consolidated memory, at the position of the first of them"""
 		if not memory_content:
 			logger.warning('Failed to create procedural memory')
-			return
+			return False
+
+		history = self.message_manager.state.history
+		processed_ids = {id(m) for m in messages_to_process}
+		if len(processed_ids & {id(m) for m in history.messages}) != len(processed_ids):
+			logger.warning('History changed while the procedural memory was created, discarding it')
+			return False
 
-		# Replace the processed messages with the consolidated memory
 		memory_message = HumanMessage(content=memory_content)
 		memory_tokens = self.message_manager._count_tokens(memory_message)
 		memory_metadata = MessageMetadata(tokens=memory_tokens, message_type='memory')
 
+		new_messages = []
+		for msg in history.messages:
+			if id(msg) not in processed_ids:
+				new_messages.append(msg)
+			elif msg is messages_to_process[0]:
+				new_messages.append(ManagedMessage(message=memory_message, metadata=memory_metadata))
+
 		# Calculate the total tokens being removed
 		removed_tokens = sum(m.metadata.tokens for m in messages_to_process)
 
-		# Add the memory message
-		new_messages.append(ManagedMessage(message=memory_message, metadata=memory_metadata))
-
 		# Update the history
-		self.message_manager.state.history.messages = new_messages
-		self.message_manager.state.history.current_tokens -= removed_tokens
-		self.message_manager.state.history.current_tokens += memory_tokens
+		history.messages = new_messages
+		history.current_tokens -= removed_tokens
+		history.current_tokens += memory_tokens
 		logger.info(f'Messages consolidated: {len(messages_to_process)} messages converted to procedural memory')
+		return True
 
 	def _create(self, messages: list[BaseMessage], current_step: int) -> str | None:
+		if self.config.summarizer == 'llm':
+			try:
+				return str(self.llm.invoke(self._get_summary_messages(messages)).content) or None
+			except Exception as e:
+				logger.error(f'Error creating procedural memory: {e}')
+				return None
+
 		parsed_messages = convert_to_openai_messages(messages)
 		try:
+			assert self.mem0 is not None
 			results = self.mem0.add(
 				messages=parsed_messages,
 				agent_id=self.config.agent_id,
@@ -149,3 +234,27 @@ class Memory:
 		except Exception as e:
 			logger.error(f'Error creating procedural memory: {e}')
 			return None
+
+	async def _acreate(self, messages: list[BaseMessage], current_step: int) -> str | None:
+		if self.config.summarizer == 'mem0':
+			# mem0 only has a blocking API
+			return await asyncio.to_thread(self._create, messages, current_step)
+		try:
+			return str((await self.llm.ainvoke(self._get_summary_messages(messages))).content) or None
+		except Exception as e:
+			logger.error(f'Error creating procedural memory: {e}')
+			return None
+
+	def _get_summary_messages(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+		history = []
+		for message in messages:
+			if isinstance(message.content, str):
+				content = message.content
+			else:
+				content = '\n'.join(item['text'] for item in message.content if isinstance(item, dict) and 'text' in item)
+			# the outputs of the agent are tool calls
+			for tool_call in getattr(message, 'tool_calls', None) or []:
+				content += json.dumps(tool_call['args'], ensure_ascii=False)
+			if content:
+				history.append(f'{message.type}: {content}')
+		return [SystemMessage(content=self.SUMMARY_PROMPT), HumanMessage(content='\n\n'.join(history))]
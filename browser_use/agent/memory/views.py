@@ -14,6 +14,8 @@ class MemoryConfig(BaseModel):
 	# Memory settings
 	agent_id: str = Field(default='browser_use_agent', min_length=1)
 	memory_interval: int = Field(default=10, gt=1, lt=100)
+	# 'llm' summarizes with the LLM alone, without mem0 and its embedder and vector store
+	summarizer: Literal['mem0', 'llm'] = 'mem0'
 
 	# Embedder settings
 	embedder_provider: Literal['openai', 'gemini', 'ollama', 'huggingface'] = 'huggingface'
@@ -11,6 +11,7 @@ from langchain_core.messages import (
 )
 from pydantic import BaseModel
 
+from browser_use.agent.message_manager.tokenizer import Tokenizer
 from browser_use.agent.message_manager.views import MessageMetadata
 from browser_use.agent.prompts import AgentMessagePrompt
 from browser_use.agent.views import ActionResult, AgentOutput, AgentStepInfo, MessageManagerState
@@ -28,6 +29,7 @@ class MessageManagerSettings(BaseModel):
 	message_context: str | None = None
 	sensitive_data: dict[str, str] | None = None
 	available_file_paths: list[str] | None = None
+	cache_breakpoints: bool = False  # mark the stable prefixes of the messages for the provider's prompt cache
 
 
 class MessageManager:
@@ -37,18 +39,26 @@ class MessageManager:
 		system_message: SystemMessage,
 		settings: MessageManagerSettings = MessageManagerSettings(),
 		state: MessageManagerState = MessageManagerState(),
+		tokenizer: Tokenizer | None = None,
 	):
 		self.task = task
 		self.settings = settings
 		self.state = state
+		self.tokenizer = tokenizer or Tokenizer(settings.estimated_characters_per_token, settings.image_tokens)
 		self.system_prompt = system_message
+		self._tokenizer_loaded = False
 
 		# Only initialize messages if state is empty
 		if len(self.state.history.messages) == 0:
 			self._init_messages()
 
 	def _init_messages(self) -> None:
-		"""Initialize the message history with system message, context, task, and other initial messages"""
+		"""
+		Initialize the message history with system message, context, task, and other initial messages
+
+		The initial messages only depend on the settings and are added in a fixed order before the history,
+		so they are the same on every step and can be read from the provider's prompt cache.
+		"""
 		self._add_message_with_tokens(self.system_prompt, message_type='init')
 
 		if self.settings.message_context:
@@ -61,11 +71,15 @@ class MessageManager:
 		self._add_message_with_tokens(task_message, message_type='init')
 
 		if self.settings.sensitive_data:
-			info = f'Here are placeholders for sensitive data: {list(self.settings.sensitive_data.keys())}'
+			info = f'Here are placeholders for sensitive data: {sorted(self.settings.sensitive_data.keys())}'
 			info += '\nTo use them, write <secret>the placeholder name</secret>'
 			info_message = HumanMessage(content=info)
 			self._add_message_with_tokens(info_message, message_type='init')
 
+		if self.settings.available_file_paths:
+			filepaths_msg = HumanMessage(content=f'Here are file paths you can use: {self.settings.available_file_paths}')
+			self._add_message_with_tokens(filepaths_msg, message_type='init')
+
 		placeholder_message = HumanMessage(content='Example output:')
 		self._add_message_with_tokens(placeholder_message, message_type='init')
 
@@ -106,16 +120,12 @@ class MessageManager:
 		self.add_tool_message(content='Browser started', message_type='init')
 
 		placeholder_message = HumanMessage(content='[Your task history memory starts here]')
-		self._add_message_with_tokens(placeholder_message)
-
-		if self.settings.available_file_paths:
-			filepaths_msg = HumanMessage(content=f'Here are file paths you can use: {self.settings.available_file_paths}')
-			self._add_message_with_tokens(filepaths_msg, message_type='init')
+		self._add_message_with_tokens(placeholder_message, message_type='history_start')
 
 	def add_new_task(self, new_task: str) -> None:
 		content = f'Your new ultimate task is: """{new_task}""". Take the previous context into account and finish your new ultimate task. '
 		msg = HumanMessage(content=content)
-		self._add_message_with_tokens(msg)
+		self._add_message_with_tokens(msg, message_type='task')
 		self.task = new_task
 
 	@time_execution_sync('--add_state_message')
@@ -181,8 +191,12 @@ class MessageManager:
 			self._add_message_with_tokens(msg, position)
 
 	@time_execution_sync('--get_messages')
-	def get_messages(self) -> list[BaseMessage]:
-		"""Get current message list, potentially trimmed to max tokens"""
+	def get_messages(self, add_cache_breakpoints: bool = True) -> list[BaseMessage]:
+		"""
+		Get current message list, potentially trimmed to max tokens
+
+		With the cache_breakpoints setting, the messages for the main LLM are marked with cache breakpoints.
+		"""
 
 		msg = [m.message for m in self.state.history.messages]
 		# debug which messages are in history with token count # log
@@ -193,8 +207,48 @@ class MessageManager:
 			logger.debug(f'{m.message.__class__.__name__} - Token count: {m.metadata.tokens}')
 		logger.debug(f'Total input tokens: {total_input_tokens}')
 
+		if self.settings.cache_breakpoints and add_cache_breakpoints:
+			for i in self._get_cache_breakpoints():
+				msg[i] = self._with_cache_breakpoint(msg[i])
+
 		return msg
 
+	def _get_cache_breakpoints(self) -> list[int]:
+		"""
+		Indexes of the messages that end the stable prefixes of the message list: the system prompt, the initial messages,
+		and the history before the last message, which is the only one that changes from one step to the next.
+		"""
+		system_end = init_end = history_end = None
+		for i, managed_message in enumerate(self.state.history.messages[:-1]):
+			if not self._is_cacheable(managed_message.message):
+				continue
+			if isinstance(managed_message.message, SystemMessage):
+				system_end = i
+			if managed_message.metadata.message_type == 'init':
+				init_end = i
+			history_end = i
+		return sorted({i for i in (system_end, init_end, history_end) if i is not None})
+
+	@staticmethod
+	def _is_cacheable(message: BaseMessage) -> bool:
+		"""Whether a cache breakpoint can be set on the message, it must end with text"""
+		if not isinstance(message, (HumanMessage, SystemMessage)):
+			return False
+		if isinstance(message.content, str):
+			return bool(message.content.strip())
+		last_block = message.content[-1] if message.content else None
+		return isinstance(last_block, dict) and last_block.get('type') == 'text' and bool(last_block.get('text', '').strip())
+
+	@staticmethod
+	def _with_cache_breakpoint(message: BaseMessage) -> BaseMessage:
+		"""A copy of the message with a cache breakpoint on its last content block, the history itself is left as is"""
+		if isinstance(message.content, str):
+			content = [{'type': 'text', 'text': message.content}]
+		else:
+			content = [dict(block) if isinstance(block, dict) else {'type': 'text', 'text': block} for block in message.content]
+		content[-1]['cache_control'] = {'type': 'ephemeral'}
+		return message.model_copy(update={'content': content})
+
 	def _add_message_with_tokens(
 		self, message: BaseMessage, position: int | None = None, message_type: str | None = None
 	) -> None:
@@ -241,13 +295,25 @@ class MessageManager:
 					message.content[i] = item
 		return message
 
+	async def load_tokenizer(self) -> None:
+		"""Load the tokenizer without blocking the event loop, and count the tokens of the history again with it"""
+		if self._tokenizer_loaded:
+			return
+		await self.tokenizer.load()
+		if self._tokenizer_loaded:
+			return
+		self._tokenizer_loaded = True
+		for managed_message in self.state.history.messages:
+			managed_message.metadata.tokens = self._count_tokens(managed_message.message)
+		self.state.history.current_tokens = sum(m.metadata.tokens for m in self.state.history.messages)
+
 	def _count_tokens(self, message: BaseMessage) -> int:
 		"""Count tokens in a message using the model's tokenizer"""
 		tokens = 0
 		if isinstance(message.content, list):
 			for item in message.content:
 				if 'image_url' in item:
-					tokens += self.settings.image_tokens
+					tokens += self._count_image_tokens(item)
 				elif isinstance(item, dict) and 'text' in item:
 					tokens += self._count_text_tokens(item['text'])
 		else:
@@ -259,11 +325,18 @@ class MessageManager:
 
 	def _count_text_tokens(self, text: str) -> int:
 		"""Count tokens in a text string"""
-		tokens = len(text) // self.settings.estimated_characters_per_token  # Rough estimate if no tokenizer available
-		return tokens
+		return self.tokenizer.count_text_tokens(text)
+
+	def _count_image_tokens(self, item: dict) -> int:
+		"""Count tokens of an image_url content item"""
+		image_url = item['image_url']
+		return self.tokenizer.count_image_tokens(image_url['url'] if isinstance(image_url, dict) else image_url)
 
 	def cut_messages(self):
-		"""Get current message list, potentially trimmed to max tokens"""
+		"""
+		Trim the messages so they fit in max_input_tokens: first the images of the last message, then the oldest steps
+		of the history while less than half of the last message's text would be left, and then the end of its text.
+		"""
 		diff = self.state.history.current_tokens - self.settings.max_input_tokens
 		if diff <= 0:
 			return None
@@ -275,36 +348,35 @@ class MessageManager:
 			text = ''
 			for item in msg.message.content:
 				if 'image_url' in item:
-					msg.message.content.remove(item)
-					diff -= self.settings.image_tokens
-					msg.metadata.tokens -= self.settings.image_tokens
-					self.state.history.current_tokens -= self.settings.image_tokens
-					logger.debug(
-						f'Removed image with {self.settings.image_tokens} tokens - total tokens now: {self.state.history.current_tokens}/{self.settings.max_input_tokens}'
-					)
+					logger.debug(f'Removed image with {self._count_image_tokens(item)} tokens')  # type: ignore
 				elif 'text' in item and isinstance(item, dict):
 					text += item['text']
-			msg.message.content = text
-			self.state.history.messages[-1] = msg
+			# replace the message to count the tokens of its text
+			self.state.history.remove_last_state_message()
+			self._add_message_with_tokens(HumanMessage(content=text))
+			msg = self.state.history.messages[-1]
+			diff = self.state.history.current_tokens - self.settings.max_input_tokens
 
 		if diff <= 0:
 			return None
 
-		# if still over, remove text from state message proportionally to the number of tokens needed with buffer
-		# Calculate the proportion of content to remove
+		# the history grows with every step, drop its oldest steps rather than most of the current state
+		if diff > msg.metadata.tokens // 2:
+			self._remove_oldest_history(diff - msg.metadata.tokens // 2)
+			diff = self.state.history.current_tokens - self.settings.max_input_tokens
+			if diff <= 0:
+				return None
+
+		# if still over, cut the end of the text to the exact number of tokens left for it
 		proportion_to_remove = diff / msg.metadata.tokens
 		if proportion_to_remove > 0.99:
 			raise ValueError(
 				f'Max token limit reached - history is too long - reduce the system prompt or task. '
 				f'proportion_to_remove: {proportion_to_remove}'
 			)
-		logger.debug(
-			f'Removing {proportion_to_remove * 100:.2f}% of the last message  {proportion_to_remove * msg.metadata.tokens:.2f} / {msg.metadata.tokens:.2f} tokens)'
-		)
+		logger.debug(f'Removing {proportion_to_remove * 100:.2f}% of the last message  {diff} / {msg.metadata.tokens} tokens)')
 
-		content = msg.message.content
-		characters_to_remove = int(len(content) * proportion_to_remove)
-		content = content[:-characters_to_remove]
+		content = self.tokenizer.truncate_text(str(msg.message.content), msg.metadata.tokens - diff)
 
 		# remove tokens and old long message
 		self.state.history.remove_last_state_message()
@@ -319,6 +391,29 @@ class MessageManager:
 			f'Added message with {last_msg.metadata.tokens} tokens - total tokens now: {self.state.history.current_tokens}/{self.settings.max_input_tokens} - total messages: {len(self.state.history.messages)}'
 		)
 
+	def _remove_oldest_history(self, tokens: int) -> None:
+		"""
+		Remove the oldest messages of the history before the last message until at least tokens tokens are removed.
+
+		Only the steps are removed, the messages with a message_type like the initial messages, the procedural memory and
+		new tasks are kept. The tool messages are removed together with the tool calls they answer.
+		"""
+		messages = self.state.history.messages
+		removed_messages = removed_tokens = 0
+		i = 0
+		while removed_tokens < tokens and i < len(messages) - 1:
+			if messages[i].metadata.message_type is not None:
+				i += 1
+				continue
+			removed_tokens += self.state.history.remove_message(i).metadata.tokens
+			removed_messages += 1
+			while i < len(messages) - 1 and isinstance(messages[i].message, ToolMessage):
+				removed_tokens += self.state.history.remove_message(i).metadata.tokens
+				removed_messages += 1
+
+		if removed_messages:
+			logger.info(f'Removed the {removed_messages} oldest messages of the history to fit in max_input_tokens')
+
 	def _remove_last_state_message(self) -> None:
 		"""Remove last state message from history"""
 		self.state.history.remove_last_state_message()
@@ -0,0 +1,207 @@
+"""
+Token counting for the messages of the MessageManager, with the tokenizer of the model when it's available.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import logging
+import math
+import struct
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from tiktoken import Encoding
+
+logger = logging.getLogger(__name__)
+
+# bytes needed to read the size of a PNG or WebP image, as base64 characters
+IMAGE_HEADER_BASE64_LENGTH = 44
+
+JPEG_START_OF_FRAME_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# the tiktoken encodings that were loaded, None for the ones that could not be loaded
+_encodings: dict[str, Encoding | None] = {}
+
+
+class Tokenizer:
+	"""
+	Counts the tokens of the text and images sent to an LLM.
+
+	This base tokenizer estimates them from the number of characters and counts every image as the same number of tokens,
+	subclasses count them like a model's tokenizer.
+	"""
+
+	def __init__(
+		self,
+		characters_per_token: int = 3,
+		image_tokens: int = 800,
+		image_token_counter: Callable[[int, int], int] | None = None,
+	):
+		self.characters_per_token = characters_per_token
+		self.image_tokens = image_tokens
+		self.image_token_counter = image_token_counter
+
+	async def load(self) -> None:
+		"""Load what the tokenizer needs to count exactly, without blocking the event loop"""
+
+	def count_text_tokens(self, text: str) -> int:
+		return len(text) // self.characters_per_token
+
+	def truncate_text(self, text: str, max_tokens: int) -> str:
+		"""The longest start of the text with at most max_tokens tokens"""
+		return text[: max(max_tokens, 0) * self.characters_per_token]
+
+	def count_image_tokens(self, image_url: str) -> int:
+		"""Tokens of an image, from its size if the model's image token counter is known and the size can be read"""
+		if self.image_token_counter:
+			size = get_image_size(image_url)
+			if size:
+				return self.image_token_counter(*size)
+		return self.image_tokens
+
+
+class TiktokenTokenizer(Tokenizer):
+	"""
+	Counts the tokens of text with a tiktoken encoding.
+
+	The encodings are downloaded once and cached by tiktoken, when one can't be loaded the tokens are estimated instead.
+	While an event loop runs, the tokens are estimated until load() loaded the encoding in a thread, so the loop is never
+	blocked by the download. Without an event loop the encoding is loaded on first use.
+	"""
+
+	def __init__(
+		self,
+		encoding_name: str,
+		characters_per_token: int = 3,
+		image_tokens: int = 800,
+		image_token_counter: Callable[[int, int], int] | None = None,
+	):
+		super().__init__(characters_per_token, image_tokens, image_token_counter)
+		self.encoding_name = encoding_name
+
+	@property
+	def encoding(self) -> Encoding | None:
+		if self.encoding_name not in _encodings:
+			try:
+				asyncio.get_running_loop()
+				return None
+			except RuntimeError:
+				return _load_encoding(self.encoding_name)
+		return _encodings[self.encoding_name]
+
+	async def load(self) -> None:
+		if self.encoding_name not in _encodings:
+			await asyncio.to_thread(_load_encoding, self.encoding_name)
+
+	def count_text_tokens(self, text: str) -> int:
+		encoding = self.encoding
+		if encoding is None:
+			return super().count_text_tokens(text)
+		return len(encoding.encode(text, disallowed_special=()))
+
+	def truncate_text(self, text: str, max_tokens: int) -> str:
+		encoding = self.encoding
+		if encoding is None:
+			return super().truncate_text(text, max_tokens)
+		tokens = encoding.encode(text, disallowed_special=())
+		if len(tokens) <= max_tokens:
+			return text
+		return encoding.decode(tokens[: max(max_tokens, 0)])
+
+
+def _load_encoding(encoding_name: str) -> Encoding | None:
+	if encoding_name not in _encodings:
+		try:
+			import tiktoken
+
+			_encodings[encoding_name] = tiktoken.get_encoding(encoding_name)
+		except Exception as e:
+			logger.warning(
+				f'Could not load the {encoding_name} tokenizer, estimating tokens from the number of characters instead: '
+				f'{type(e).__name__}: {e}'
+			)
+			_encodings[encoding_name] = None
+	return _encodings[encoding_name]
+
+
+def count_openai_image_tokens(width: int, height: int) -> int:
+	"""Tokens of a high detail image for the GPT-4o family: the image is scaled down and counted in 512px tiles"""
+	scale = min(1.0, 2048 / max(width, height))
+	width, height = width * scale, height * scale
+	scale = min(1.0, 768 / min(width, height))
+	width, height = width * scale, height * scale
+	return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+def get_tokenizer(model_name: str, characters_per_token: int = 3, image_tokens: int = 800) -> Tokenizer:
+	"""
+	The tokenizer that counts the tokens of a model best.
+
+	Only the tokenizers of OpenAI's models are public, the tokens of the other models are estimated from the number
+	of characters instead of being counted with the tokenizer of another provider.
+	"""
+	name = model_name.lower()
+	if name.startswith(('gpt-', 'chatgpt', 'o1', 'o3', 'o4')):
+		from tiktoken.model import encoding_name_for_model
+
+		try:
+			encoding_name = encoding_name_for_model(name)
+		except KeyError:
+			encoding_name = 'o200k_base'
+		return TiktokenTokenizer(encoding_name, characters_per_token, image_tokens, count_openai_image_tokens)
+	return Tokenizer(characters_per_token, image_tokens)
+
+
+def get_image_size(image_url: str) -> tuple[int, int] | None:
+	"""Width and height of a PNG, JPEG or WebP image in a base64 data URL, None if they can't be read"""
+	if not image_url.startswith('data:') or ';base64,' not in image_url:
+		return None
+	data = image_url.split(',', 1)[1]
+	try:
+		header = base64.b64decode(data[:IMAGE_HEADER_BASE64_LENGTH])
+		if header.startswith(b'\x89PNG\r\n\x1a\n'):
+			width, height = struct.unpack('>II', header[16:24])
+			return width, height
+		if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+			return _get_webp_size(header)
+		if header[:2] == b'\xff\xd8':
+			return _get_jpeg_size(base64.b64decode(data))
+	except (ValueError, struct.error):
+		pass
+	return None
+
+
+def _get_webp_size(header: bytes) -> tuple[int, int] | None:
+	chunk = header[12:16]
+	if chunk == b'VP8X':
+		return 1 + int.from_bytes(header[24:27], 'little'), 1 + int.from_bytes(header[27:30], 'little')
+	if chunk == b'VP8 ':
+		width, height = struct.unpack('<HH', header[26:30])
+		return width & 0x3FFF, height & 0x3FFF
+	if chunk == b'VP8L':
+		bits = int.from_bytes(header[21:25], 'little')
+		return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+	return None
+
+
+def _get_jpeg_size(data: bytes) -> tuple[int, int] | None:
+	# the size is in the start of frame segment, after the segments with the metadata
+	i = 2
+	while i + 9 <= len(data):
+		if data[i] != 0xFF:
+			return None
+		marker = data[i + 1]
+		if marker == 0xFF:
+			i += 1
+		elif marker in JPEG_START_OF_FRAME_MARKERS:
+			height, width = struct.unpack('>HH', data[i + 5 : i + 9])
+			return width, height
+		elif marker == 0x01 or 0xD0 <= marker <= 0xD8:
+			i += 2
+		else:
+			(length,) = struct.unpack('>H', data[i + 2 : i + 4])
+			i += 2 + length
+	return None
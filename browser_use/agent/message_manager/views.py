@@ -119,6 +119,12 @@ class MessageHistory(BaseModel):
 				self.messages.pop(i)
 				break
 
+	def remove_message(self, index: int) -> ManagedMessage:
+		"""Remove the message at index from history"""
+		managed_message = self.messages.pop(index)
+		self.current_tokens -= managed_message.metadata.tokens
+		return managed_message
+
 	def remove_last_state_message(self) -> None:
 		"""Remove last state message from history"""
 		if len(self.messages) > 2 and isinstance(self.messages[-1].message, HumanMessage):
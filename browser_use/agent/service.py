@@ -7,7 +7,7 @@ import os
 import re
 import sys
 import time
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
 from pathlib import Path
 from typing import Any, Generic, TypeVar
 
@@ -17,16 +17,19 @@ load_dotenv()
 
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import (
+	AIMessageChunk,
 	BaseMessage,
 	HumanMessage,
 	SystemMessage,
 )
+from langchain_core.runnables import Runnable, RunnableParallel, RunnableSequence
 from playwright.async_api import Browser, BrowserContext
 from pydantic import BaseModel, ValidationError
 
 from browser_use.agent.gif import create_history_gif
 from browser_use.agent.memory import Memory, MemoryConfig
 from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
+from browser_use.agent.message_manager.tokenizer import get_tokenizer
 from browser_use.agent.message_manager.utils import (
 	convert_input_messages,
 	extract_json_from_model_output,
@@ -34,6 +37,7 @@ from browser_use.agent.message_manager.utils import (
 	save_conversation,
 )
 from browser_use.agent.prompts import AgentMessagePrompt, PlannerPrompt, SystemPrompt
+from browser_use.agent.streaming import ActionStream
 from browser_use.agent.views import (
 	REQUIRED_LLM_API_ENV_VARS,
 	ActionResult,
@@ -152,6 +156,8 @@ class Agent(Generic[Context]):
 		planner_interval: int = 1,  # Run planner every N steps
 		is_planner_reasoning: bool = False,
 		extend_planner_system_message: str | None = None,
+		prefetch_browser_state: bool = False,
+		stream_actions: bool = False,
 		injected_agent_state: AgentState | None = None,
 		context: Context | None = None,
 		save_playwright_script_path: str | None = None,
@@ -191,6 +197,8 @@ class Agent(Generic[Context]):
 			is_planner_reasoning=is_planner_reasoning,
 			save_playwright_script_path=save_playwright_script_path,
 			extend_planner_system_message=extend_planner_system_message,
+			prefetch_browser_state=prefetch_browser_state,
+			stream_actions=stream_actions,
 		)
 
 		# Memory settings
@@ -249,6 +257,15 @@ class Agent(Generic[Context]):
 
 		# Initialize message manager with state
 		# Initial system prompt with all actions - will be updated during each step
+		message_manager_settings = MessageManagerSettings(
+			max_input_tokens=self.settings.max_input_tokens,
+			include_attributes=self.settings.include_attributes,
+			message_context=self.settings.message_context,
+			sensitive_data=sensitive_data,
+			available_file_paths=self.settings.available_file_paths,
+			# OpenAI and Gemini cache the prompt prefixes on their own, Anthropic only up to the marked breakpoints
+			cache_breakpoints=self.chat_model_library in ('ChatAnthropic', 'ChatAnthropicVertex'),
+		)
 		self._message_manager = MessageManager(
 			task=task,
 			system_message=SystemPrompt(
@@ -257,15 +274,20 @@ class Agent(Generic[Context]):
 				override_system_message=override_system_message,
 				extend_system_message=extend_system_message,
 			).get_system_message(),
-			settings=MessageManagerSettings(
-				max_input_tokens=self.settings.max_input_tokens,
-				include_attributes=self.settings.include_attributes,
-				message_context=self.settings.message_context,
-				sensitive_data=sensitive_data,
-				available_file_paths=self.settings.available_file_paths,
-			),
+			settings=message_manager_settings,
 			state=self.state.message_manager_state,
+			tokenizer=get_tokenizer(
+				self.model_name,
+				characters_per_token=message_manager_settings.estimated_characters_per_token,
+				image_tokens=message_manager_settings.image_tokens,
+			),
 		)
+		# the tokenizer may have to be downloaded, it's loaded in a thread while the browser starts and awaited by the first step
+		self._load_tokenizer_task: asyncio.Task[None] | None = None
+		try:
+			self._load_tokenizer_task = asyncio.get_running_loop().create_task(self._message_manager.load_tokenizer())
+		except RuntimeError:
+			pass  # no event loop yet, the first step loads it
 
 		if self.enable_memory:
 			try:
@@ -320,6 +342,9 @@ class Agent(Generic[Context]):
 		self.register_done_callback = register_done_callback
 		self.register_external_agent_status_raise_error_callback = register_external_agent_status_raise_error_callback
 
+		# Input tokens read from the prompt cache by the LLM calls of the current step
+		self._cached_input_tokens: int | None = None
+
 		# Context
 		self.context: Context | None = context
 
@@ -455,19 +480,23 @@ class Agent(Generic[Context]):
 	async def step(self, step_info: AgentStepInfo | None = None) -> None:
 		"""Execute one step of the task"""
 		logger.info(f'📍 Step {self.state.n_steps}')
-		state = None
+		browser_state_summary = None
 		model_output = None
 		result: list[ActionResult] = []
 		step_start_time = time.time()
 		tokens = 0
+		self._cached_input_tokens = None
 
 		try:
+			await (self._load_tokenizer_task or self._message_manager.load_tokenizer())
 			browser_state_summary = await self.browser_session.get_state_summary(cache_clickable_elements_hashes=True)
 			current_page = await self.browser_session.get_current_page()
 
-			# generate procedural memory if needed
-			if self.enable_memory and self.memory and self.state.n_steps % self.memory.config.memory_interval == 0:
-				self.memory.create_procedural_memory(self.state.n_steps)
+			# generate procedural memory in the background if needed, and swap it into the history once it is ready
+			if self.enable_memory and self.memory:
+				self.memory.apply_compaction()
+				if self.state.n_steps % self.memory.config.memory_interval == 0:
+					self.memory.start_compaction(self.state.n_steps)
 
 			await self._raise_if_stopped_or_paused()
 
@@ -505,6 +534,12 @@ class Agent(Generic[Context]):
 				step_info=step_info,
 				use_vision=self.settings.use_vision,
 			)
+			try:
+				# cut the state to the input token budget before it is sent to the planner or the LLM
+				self._message_manager.cut_messages()
+			except ValueError:
+				self._message_manager._remove_last_state_message()
+				raise
 
 			# Run planner at specified intervals if planner is configured
 			if self.settings.planner_llm and self.state.n_steps % self.settings.planner_interval == 0:
@@ -525,8 +560,16 @@ class Agent(Generic[Context]):
 			input_messages = self._message_manager.get_messages()
 			tokens = self._message_manager.state.history.current_tokens
 
+			action_stream: ActionStream | None = None
+			act_task: asyncio.Task[list[ActionResult]] | None = None
+			if self.settings.stream_actions:
+				action_model = self.DoneActionModel if self.AgentOutput is self.DoneAgentOutput else self.ActionModel
+				action_stream = ActionStream(action_model, max_actions=self.settings.max_actions_per_step)
+				# the actions are executed as soon as they are streamed, while the rest of the response is generated
+				act_task = asyncio.create_task(self.multi_act(action_stream))
+
 			try:
-				model_output = await self.get_next_action(input_messages)
+				model_output = await self.get_next_action(input_messages, action_stream)
 				if (
 					not model_output.action
 					or not isinstance(model_output.action, list)
@@ -573,29 +616,43 @@ class Agent(Generic[Context]):
 				self._message_manager.add_model_output(model_output)
 			except asyncio.CancelledError:
 				# Task was cancelled due to Ctrl+C
+				if act_task:
+					act_task.cancel()
 				self._message_manager._remove_last_state_message()
 				raise InterruptedError('Model query cancelled by user')
 			except InterruptedError:
 				# Agent was paused during get_next_action
+				result = await self._stop_streamed_actions(action_stream, act_task)
 				self._message_manager._remove_last_state_message()
 				raise  # Re-raise to be caught by the outer try/except
 			except Exception as e:
 				# model call failed, remove last state message from history
+				result = await self._stop_streamed_actions(action_stream, act_task)
 				self._message_manager._remove_last_state_message()
 				raise e
 
-			result: list[ActionResult] = await self.multi_act(model_output.action)
+			if action_stream and act_task:
+				# the actions that were not streamed yet are executed once the full response is parsed
+				action_stream.finish(model_output.action)
+				result = await act_task
+			else:
+				result = await self.multi_act(model_output.action)
 
 			self.state.last_result = result
 
 			if len(result) > 0 and result[-1].is_done:
 				logger.info(f'📄 Result: {result[-1].extracted_content}')
+			elif self.settings.prefetch_browser_state:
+				# let the page settle and extract the next state while the history item and the step hooks run,
+				# the next step awaits it before it prompts the LLM
+				self.browser_session.prefetch_state_summary()
 
 			self.state.consecutive_failures = 0
 
 		except InterruptedError:
 			# logger.debug('Agent paused')
-			self.state.last_result = [
+			# the results of the actions that were streamed before the pause are kept, they already changed the page
+			self.state.last_result = result + [
 				ActionResult(
 					error='The agent was paused mid-step - the last action might need to be repeated', include_in_memory=False
 				)
@@ -607,7 +664,8 @@ class Agent(Generic[Context]):
 			self.state.last_result = [ActionResult(error='The agent was paused with Ctrl+C', include_in_memory=False)]
 			raise InterruptedError('Step cancelled by user')
 		except Exception as e:
-			result = await self._handle_step_error(e)
+			# the results of the actions that were streamed before the response failed are reported with the error
+			result = result + await self._handle_step_error(e)
 			self.state.last_result = result
 
 		finally:
@@ -615,15 +673,33 @@ class Agent(Generic[Context]):
 			if not result:
 				return
 
-			if state:
+			if browser_state_summary:
 				metadata = StepMetadata(
 					step_number=self.state.n_steps,
 					step_start_time=step_start_time,
 					step_end_time=step_end_time,
 					input_tokens=tokens,
+					cached_input_tokens=self._cached_input_tokens,
 				)
 				self._make_history_item(model_output, browser_state_summary, result, metadata)
 
+	async def _stop_streamed_actions(
+		self, action_stream: ActionStream | None, act_task: asyncio.Task[list[ActionResult]] | None
+	) -> list[ActionResult]:
+		"""
+		Stop executing the actions of a response that could not be used, an action that already started is finished.
+
+		Returns the results of the actions that were executed.
+		"""
+		if not action_stream or not act_task:
+			return []
+		action_stream.cancel()
+		try:
+			return await act_task
+		except Exception as e:
+			logger.debug(f'Streamed actions failed: {type(e).__name__}: {e}')
+			return []
+
 	@time_execution_async('--handle_step_error (agent)')
 	async def _handle_step_error(self, error: Exception) -> list[ActionResult]:
 		"""Handle all types of errors that can occur during a step"""
@@ -639,12 +715,11 @@ class Agent(Generic[Context]):
 		if isinstance(error, (ValidationError, ValueError)):
 			logger.error(f'{prefix}{error_msg}')
 			if 'Max token limit reached' in error_msg:
-				# cut tokens from history
+				# leave some room for the next state, which is cut to the new limit at the start of the next step
 				self._message_manager.settings.max_input_tokens = self.settings.max_input_tokens - 500
 				logger.info(
 					f'Cutting tokens from history - new max input tokens: {self._message_manager.settings.max_input_tokens}'
 				)
-				self._message_manager.cut_messages()
 			elif 'Could not parse response' in error_msg:
 				# give model a hint how output should look like
 				error_msg += '\n\nReturn a valid JSON object with the required fields.'
@@ -714,14 +789,21 @@ class Agent(Generic[Context]):
 			return input_messages
 
 	@time_execution_async('--get_next_action (agent)')
-	async def get_next_action(self, input_messages: list[BaseMessage]) -> AgentOutput:
-		"""Get next action from LLM based on current state"""
+	async def get_next_action(self, input_messages: list[BaseMessage], action_stream: ActionStream | None = None) -> AgentOutput:
+		"""
+		Get next action from LLM based on current state
+
+		If an action stream is given, the response is streamed and each action is fed to it as soon as it is complete.
+		"""
 		input_messages = self._convert_input_messages(input_messages)
 
 		if self.tool_calling_method == 'raw':
 			logger.debug(f'Using {self.tool_calling_method} for {self.chat_model_library}')
 			try:
-				output = self.llm.invoke(input_messages)
+				if action_stream:
+					output = await self._stream_llm(self.llm, input_messages, action_stream)
+				else:
+					output = self.llm.invoke(input_messages)
 				response = {'raw': output, 'parsed': None}
 			except Exception as e:
 				logger.error(f'Failed to invoke model: {str(e)}')
@@ -739,7 +821,7 @@ class Agent(Generic[Context]):
 		elif self.tool_calling_method is None:
 			structured_llm = self.llm.with_structured_output(self.AgentOutput, include_raw=True)
 			try:
-				response: dict[str, Any] = await structured_llm.ainvoke(input_messages)  # type: ignore
+				response: dict[str, Any] = await self._invoke_structured_llm(structured_llm, input_messages, action_stream)
 				parsed: AgentOutput | None = response['parsed']
 
 			except Exception as e:
@@ -749,7 +831,7 @@ class Agent(Generic[Context]):
 		else:
 			logger.debug(f'Using {self.tool_calling_method} for {self.chat_model_library}')
 			structured_llm = self.llm.with_structured_output(self.AgentOutput, include_raw=True, method=self.tool_calling_method)
-			response: dict[str, Any] = await structured_llm.ainvoke(input_messages)  # type: ignore
+			response: dict[str, Any] = await self._invoke_structured_llm(structured_llm, input_messages, action_stream)
 
 		# Handle tool call responses
 		if response.get('parsing_error') and 'raw' in response:
@@ -779,6 +861,10 @@ class Agent(Generic[Context]):
 		else:
 			parsed = response['parsed']
 
+		cached_input_tokens = self._get_cached_input_tokens(response.get('raw'))
+		if cached_input_tokens is not None:
+			self._cached_input_tokens = (self._cached_input_tokens or 0) + cached_input_tokens
+
 		if not parsed:
 			try:
 				parsed_json = extract_json_from_model_output(response['raw'].content)
@@ -796,6 +882,53 @@ class Agent(Generic[Context]):
 
 		return parsed
 
+	@staticmethod
+	def _get_cached_input_tokens(message: Any) -> int | None:
+		"""Input tokens the provider read from its prompt cache, as reported in the usage metadata of its response"""
+		usage_metadata = getattr(message, 'usage_metadata', None)
+		if not usage_metadata:
+			return None
+		cached_input_tokens = usage_metadata.get('input_token_details', {}).get('cache_read')
+		if cached_input_tokens is not None:
+			logger.debug(f'💾 {cached_input_tokens}/{usage_metadata["input_tokens"]} input tokens read from the prompt cache')
+		return cached_input_tokens
+
+	async def _invoke_structured_llm(
+		self, structured_llm: Runnable, input_messages: list[BaseMessage], action_stream: ActionStream | None
+	) -> dict[str, Any]:
+		"""Invoke the structured output runnable, streaming the raw response to the action stream if one is given"""
+		if (
+			action_stream
+			and isinstance(structured_llm, RunnableSequence)
+			and isinstance(structured_llm.first, RunnableParallel)
+			and 'raw' in structured_llm.first.steps__
+		):
+			# with include_raw the runnable is RunnableMap(raw=llm) | parser, and the parser's fallback can't stream,
+			# so the LLM is streamed on its own and the parser gets the full response
+			raw = await self._stream_llm(structured_llm.first.steps__['raw'], input_messages, action_stream)
+			return await structured_llm.last.ainvoke({'raw': raw})
+		return await structured_llm.ainvoke(input_messages)  # type: ignore
+
+	async def _stream_llm(self, llm: Runnable, input_messages: list[BaseMessage], action_stream: ActionStream) -> AIMessageChunk:
+		"""Stream the response of the LLM, feeding the JSON of its first tool call, or of its content, to the action stream"""
+		from_content = self.tool_calling_method in ('raw', 'json_mode')
+		response: AIMessageChunk | None = None
+		tool_call_index = None
+		async for chunk in llm.astream(input_messages):
+			response = chunk if response is None else response + chunk
+			if from_content:
+				if isinstance(chunk.content, str):
+					action_stream.feed(chunk.content)
+				continue
+			for tool_call_chunk in chunk.tool_call_chunks:
+				if tool_call_index is None:
+					tool_call_index = tool_call_chunk['index']
+				if tool_call_chunk['index'] == tool_call_index and tool_call_chunk['args']:
+					action_stream.feed(tool_call_chunk['args'])
+		if response is None:
+			raise LLMException(401, 'LLM API call returned no response')
+		return response
+
 	def _log_agent_run(self) -> None:
 		"""Log the agent run"""
 		logger.info(f'🚀 Starting task: {self.task}')
@@ -1026,10 +1159,10 @@ class Agent(Generic[Context]):
 	@time_execution_async('--multi-act (agent)')
 	async def multi_act(
 		self,
-		actions: list[ActionModel],
+		actions: list[ActionModel] | ActionStream,
 		check_for_new_elements: bool = True,
 	) -> list[ActionResult]:
-		"""Execute multiple actions"""
+		"""Execute multiple actions, the actions of an action stream as soon as each of them arrives"""
 		results = []
 
 		cached_selector_map = await self.browser_session.get_selector_map()
@@ -1037,7 +1170,14 @@ class Agent(Generic[Context]):
 
 		await self.browser_session.remove_highlights()
 
-		for i, action in enumerate(actions):
+		# the number of streamed actions is only known once the response is complete
+		of_total = f' / {len(actions)}' if isinstance(actions, list) else ''
+
+		i = 0
+		async for action in self._iterate_actions(actions):
+			if i != 0:
+				await asyncio.sleep(self.browser_profile.wait_between_actions)
+
 			if action.get_index() is not None and i != 0:
 				new_browser_state_summary = await self.browser_session.get_state_summary(cache_clickable_elements_hashes=False)
 				new_selector_map = new_browser_state_summary.selector_map
@@ -1048,7 +1188,7 @@ class Agent(Generic[Context]):
 				new_target = new_selector_map.get(action.get_index())  # type: ignore
 				new_target_hash = new_target.hash.branch_path_hash if new_target else None
 				if orig_target_hash != new_target_hash:
-					msg = f'Element index changed after action {i} / {len(actions)}, because page changed.'
+					msg = f'Element index changed after action {i}{of_total}, because page changed.'
 					logger.info(msg)
 					results.append(ActionResult(extracted_content=msg, include_in_memory=True))
 					break
@@ -1056,7 +1196,7 @@ class Agent(Generic[Context]):
 				new_path_hashes = {e.hash.branch_path_hash for e in new_selector_map.values()}
 				if check_for_new_elements and not new_path_hashes.issubset(cached_path_hashes):
 					# next action requires index but there are new elements on the page
-					msg = f'Something new appeared after action {i} / {len(actions)}'
+					msg = f'Something new appeared after action {i}{of_total}'
 					logger.info(msg)
 					results.append(ActionResult(extracted_content=msg, include_in_memory=True))
 					break
@@ -1075,11 +1215,10 @@ class Agent(Generic[Context]):
 
 				results.append(result)
 
-				logger.debug(f'Executed action {i + 1} / {len(actions)}')
-				if results[-1].is_done or results[-1].error or i == len(actions) - 1:
+				logger.debug(f'Executed action {i + 1}{of_total}')
+				if results[-1].is_done or results[-1].error:
 					break
-
-				await asyncio.sleep(self.browser_profile.wait_between_actions)
+				i += 1
 				# hash all elements. if it is a subset of cached_state its fine - else break (new elements on page)
 
 			except asyncio.CancelledError:
@@ -1092,6 +1231,15 @@ class Agent(Generic[Context]):
 
 		return results
 
+	@staticmethod
+	async def _iterate_actions(actions: list[ActionModel] | ActionStream) -> AsyncIterator[ActionModel]:
+		if isinstance(actions, ActionStream):
+			async for action in actions:
+				yield action
+		else:
+			for action in actions:
+				yield action
+
 	async def _validate_output(self) -> bool:
 		"""Validate the output of the last action is what the user wanted"""
 		system_msg = (
@@ -1417,7 +1565,8 @@ class Agent(Generic[Context]):
 				is_planner_reasoning=self.settings.is_planner_reasoning,
 				extended_planner_system_prompt=self.settings.extend_planner_system_message,
 			),
-			*self._message_manager.get_messages()[1:],  # Use full message history except the first
+			# Use full message history except the first, the cache breakpoints are for the main LLM
+			*self._message_manager.get_messages(add_cache_breakpoints=False)[1:],
 		]
 
 		if not self.settings.use_vision_for_planner and self.settings.use_vision:
@@ -1468,6 +1617,9 @@ class Agent(Generic[Context]):
 	async def close(self):
 		"""Close all resources"""
 		try:
+			if self.memory:
+				await self.memory.cancel_compaction()
+
 			# First close browser resources
 			await self.browser_session.stop()
 
@@ -0,0 +1,168 @@
+"""
+Incremental parsing of the actions of an LLM response, so they can be executed while the rest is still being generated.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+
+from pydantic import ValidationError
+
+from browser_use.controller.registry.views import ActionModel
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalActionParser:
+	"""
+	Parses the actions of an AgentOutput JSON document while it is being streamed.
+
+	feed() takes the next piece of the document and returns the actions it completed, as dicts, in order.
+	Anything before the document (code fences, <think> blocks) and after it is ignored.
+	"""
+
+	def __init__(self) -> None:
+		self._buffer = ''
+		self._position = 0
+		self._depth = 0
+		self._in_string = False
+		self._escaped = False
+		self._string_start = -1
+		self._last_string: str | None = None
+		self._key: str | None = None
+		self._action_list_depth: int | None = None
+		self._action_start = -1
+		self._started = False
+		self._finished = False
+
+	def feed(self, text: str) -> list[dict]:
+		self._buffer += text
+		actions: list[dict] = []
+		buffer = self._buffer
+		i = self._position
+
+		if not self._started:
+			if '<think>' in buffer:
+				think_end = buffer.find('</think>')
+				if think_end == -1:
+					return actions
+				i = think_end
+			start = buffer.find('{', i)
+			if start == -1:
+				return actions
+			self._started = True
+			i = start
+
+		while i < len(buffer) and not self._finished:
+			char = buffer[i]
+			if self._in_string:
+				if self._escaped:
+					self._escaped = False
+				elif char == '\\':
+					self._escaped = True
+				elif char == '"':
+					self._in_string = False
+					if self._string_start != -1:
+						self._last_string = json.loads(buffer[self._string_start : i + 1])
+						self._string_start = -1
+			elif char == '"':
+				self._in_string = True
+				# only the keys of the document itself are needed
+				self._string_start = i if self._depth == 1 else -1
+			elif char == ':' and self._depth == 1:
+				self._key = self._last_string
+			elif char == ',' and self._depth == 1:
+				self._key = None
+			elif char in '{[':
+				if char == '[' and self._depth == 1 and self._key == 'action':
+					self._action_list_depth = 2
+				elif char == '{' and self._depth == self._action_list_depth:
+					self._action_start = i
+				self._depth += 1
+			elif char in '}]':
+				self._depth -= 1
+				if self._depth == self._action_list_depth and self._action_start != -1:
+					try:
+						action = json.loads(buffer[self._action_start : i + 1])
+					except ValueError:
+						# the document is malformed, parsing the full response reports it
+						self._finished = True
+						break
+					actions.append(action)
+					self._action_start = -1
+				elif self._depth == 1:
+					self._action_list_depth = None
+				elif self._depth == 0:
+					self._finished = True
+			i += 1
+
+		self._position = i
+		return actions
+
+
+class ActionStream:
+	"""
+	The actions of an LLM response, iterated with async for as soon as each of them is parsed.
+
+	The response is fed with feed() while it is streamed, and the stream is closed with finish() once the full
+	response is parsed, which also adds the actions that could not be parsed from the stream.
+	"""
+
+	def __init__(self, action_model: type[ActionModel], max_actions: int):
+		self.action_model = action_model
+		self.max_actions = max_actions
+		self.actions: list[ActionModel] = []
+		self._parser = IncrementalActionParser()
+		self._queue: asyncio.Queue[ActionModel | None] = asyncio.Queue()
+		self._closed = False
+		self._invalid = False
+
+	def feed(self, text: str) -> None:
+		for action in self._parser.feed(text):
+			if self._invalid:
+				return
+			try:
+				action_model = self.action_model(**action)
+			except ValidationError as e:
+				action_model = None
+				logger.debug(f'Invalid streamed action, waiting for the full response: {e}')
+			if action_model is None or not action_model.model_dump(exclude_unset=True):
+				# the actions must run in order, none is dispatched after an invalid or unknown one
+				self._invalid = True
+				return
+			self._put(action_model)
+
+	def finish(self, actions: list[ActionModel]) -> None:
+		for action in actions[len(self.actions) :]:
+			self._put(action)
+		self._close()
+
+	def cancel(self) -> None:
+		"""Closes the stream without dispatching the actions that were not picked up yet"""
+		while not self._queue.empty():
+			self._queue.get_nowait()
+		self._close()
+
+	def _put(self, action: ActionModel) -> None:
+		if self._closed or len(self.actions) >= self.max_actions:
+			return
+		self.actions.append(action)
+		self._queue.put_nowait(action)
+
+	def _close(self) -> None:
+		if not self._closed:
+			self._closed = True
+			self._queue.put_nowait(None)
+
+	def __aiter__(self) -> ActionStream:
+		return self
+
+	async def __anext__(self) -> ActionModel:
+		action = await self._queue.get()
+		if action is None:
+			# every iteration after the end ends right away
+			self._queue.put_nowait(None)
+			raise StopAsyncIteration
+		return action
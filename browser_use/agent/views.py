@@ -70,6 +70,8 @@ class AgentSettings(BaseModel):
 	planner_interval: int = 1  # Run planner every N steps
 	is_planner_reasoning: bool = False  # type: ignore
 	extend_planner_system_message: str | None = None
+	prefetch_browser_state: bool = False  # Extract the next browser state in the background during the end of each step
+	stream_actions: bool = False  # Execute each action as soon as the LLM has streamed it
 
 	# Playwright script generation setting
 	save_playwright_script_path: str | None = None  # Path to save the generated Playwright script
@@ -120,6 +122,7 @@ class StepMetadata(BaseModel):
 	step_end_time: float
 	input_tokens: int  # Approximate tokens from message manager for this step
 	step_number: int
+	cached_input_tokens: int | None = None  # Input tokens read from the provider's prompt cache, if it reports them
 
 	@property
 	def duration_seconds(self) -> float:
@@ -237,6 +240,10 @@ class AgentHistoryList(BaseModel):
 		"""Get token usage for each step"""
 		return [h.metadata.input_tokens for h in self.history if h.metadata]
 
+	def total_cached_input_tokens(self) -> int:
+		"""Get total input tokens read from the provider's prompt cache across all steps, as reported by the provider"""
+		return sum(h.metadata.cached_input_tokens or 0 for h in self.history if h.metadata)
+
 	def __str__(self) -> str:
 		"""Representation of the AgentHistoryList object"""
 		return f'AgentHistoryList(all_results={self.action_results()}, all_model_outputs={self.model_actions()})'
@@ -0,0 +1,305 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from playwright.async_api import Frame, Page, Request, Response
+
+logger = logging.getLogger(__name__)
+
+# Define relevant resource types and content types
+RELEVANT_RESOURCE_TYPES = {
+	'document',
+	'stylesheet',
+	'image',
+	'font',
+	'script',
+	'iframe',
+}
+
+RELEVANT_CONTENT_TYPES = {
+	'text/html',
+	'text/css',
+	'application/javascript',
+	'image/',
+	'font/',
+	'application/json',
+}
+
+# Content types of streaming or real-time responses, which never really finish loading
+STREAMING_CONTENT_TYPES = {
+	'streaming',
+	'video',
+	'audio',
+	'webm',
+	'mp4',
+	'event-stream',
+	'websocket',
+	'protobuf',
+}
+
+# Additional patterns to filter out
+IGNORED_URL_PATTERNS = {
+	# Analytics and tracking
+	'analytics',
+	'tracking',
+	'telemetry',
+	'beacon',
+	'metrics',
+	# Ad-related
+	'doubleclick',
+	'adsystem',
+	'adserver',
+	'advertising',
+	# Social media widgets
+	'facebook.com/plugins',
+	'platform.twitter',
+	'linkedin.com/embed',
+	# Live chat and support
+	'livechat',
+	'zendesk',
+	'intercom',
+	'crisp.chat',
+	'hotjar',
+	# Push notifications
+	'push-notifications',
+	'onesignal',
+	'pushwoosh',
+	# Background sync/heartbeat
+	'heartbeat',
+	'ping',
+	'alive',
+	# WebRTC and streaming
+	'webrtc',
+	'rtmp://',
+	'wss://',
+	# Common CDNs for dynamic content
+	'cloudfront.net',
+	'fastly.net',
+}
+
+MAX_RELEVANT_RESPONSE_SIZE = 5 * 1024 * 1024  # 5MB, larger responses are likely not essential for page load
+
+DOM_QUIET_TIME = 0.1  # seconds without DOM changes for the DOM to count as settled
+DOM_QUIET_TIMEOUT = 1.0  # pages with animations or live tickers never settle, don't wait longer than this for them
+
+# keeps an observer in the page that records the DOM changes not caused by our own highlights
+INSTALL_DOM_ACTIVITY_OBSERVER_JS = """
+	let activity = window.__browserUseDomActivity;
+	if (!activity) {
+		activity = window.__browserUseDomActivity = {
+			documentId: Math.random().toString(36).slice(2),
+			version: 0,
+			lastStructuralChange: performance.now(),
+		};
+		const HIGHLIGHT_CONTAINER_ID = 'playwright-highlight-container';
+		const OWN_ATTRIBUTES = ['browser-user-highlight-id', 'data-browser-use-id'];
+		const isOwnChange = record => {
+			if (record.type === 'attributes' && OWN_ATTRIBUTES.includes(record.attributeName)) return true;
+			const target = record.target.nodeType === Node.ELEMENT_NODE ? record.target : record.target.parentElement;
+			if (target?.closest(`#${HIGHLIGHT_CONTAINER_ID}`)) return true;
+			const nodes = [...record.addedNodes, ...record.removedNodes];
+			return nodes.length > 0 && nodes.every(node => node.id === HIGHLIGHT_CONTAINER_ID);
+		};
+		new MutationObserver(records => {
+			for (const record of records) {
+				if (isOwnChange(record)) continue;
+				activity.version++;
+				if (record.type !== 'attributes') activity.lastStructuralChange = performance.now();
+			}
+		}).observe(document, { subtree: true, childList: true, characterData: true, attributes: true });
+	}
+"""
+
+# resolves once the document had no structural changes for quietMs
+WAIT_FOR_DOM_QUIET_JS = (
+	'({ quietMs, timeoutMs }) => {'
+	+ INSTALL_DOM_ACTIVITY_OBSERVER_JS
+	+ """
+	return new Promise(resolve => {
+		const deadline = performance.now() + timeoutMs;
+		const check = () => {
+			const now = performance.now();
+			const quietFor = now - activity.lastStructuralChange;
+			if (quietFor >= quietMs || now >= deadline) {
+				resolve(quietFor >= quietMs);
+				return;
+			}
+			// wake up exactly when the quiet period would be over, it's extended by any change in between
+			setTimeout(check, Math.min(quietMs - quietFor, deadline - now));
+		};
+		check();
+	});
+}"""
+)
+
+# identifies the document, its DOM changes and the scroll position and size of the viewport
+GET_DOM_VERSION_JS = (
+	'() => {'
+	+ INSTALL_DOM_ACTIVITY_OBSERVER_JS
+	+ """
+	return [activity.documentId, activity.version, window.scrollX, window.scrollY, window.innerWidth, window.innerHeight];
+}"""
+)
+
+
+def is_relevant_request(request: 'Request') -> bool:
+	"""Whether the page has to wait for this request to count as loaded"""
+	# Filter by resource type
+	if request.resource_type not in RELEVANT_RESOURCE_TYPES:
+		return False
+
+	# Filter out by URL patterns
+	url = request.url.lower()
+	if any(pattern in url for pattern in IGNORED_URL_PATTERNS):
+		return False
+
+	# Filter out data URLs and blob URLs
+	if url.startswith(('data:', 'blob:')):
+		return False
+
+	# Filter out requests with certain headers
+	headers = request.headers
+	if headers.get('purpose') == 'prefetch' or headers.get('sec-fetch-dest') in ['video', 'audio']:
+		return False
+
+	return True
+
+
+def is_relevant_response(response: 'Response') -> bool:
+	"""Whether this response is page content, as opposed to streaming, unknown or very large content"""
+	content_type = response.headers.get('content-type', '').lower()
+	if any(t in content_type for t in STREAMING_CONTENT_TYPES):
+		return False
+
+	if not any(ct in content_type for ct in RELEVANT_CONTENT_TYPES):
+		return False
+
+	content_length = response.headers.get('content-length')
+	if content_length and int(content_length) > MAX_RELEVANT_RESPONSE_SIZE:
+		return False
+
+	return True
+
+
+class PageActivityTracker:
+	"""
+	Keeps track of the in-flight requests and the navigations of a page, to tell when it has settled.
+
+	The listeners stay attached for the lifetime of the page, so a page that was idle while the agent
+	was thinking is known to be settled right away, and a waiter is woken up by the events themselves
+	instead of polling.
+	"""
+
+	def __init__(self, page: 'Page'):
+		self.page = page
+		self.pending_requests: set['Request'] = set()
+		self.last_activity = asyncio.get_running_loop().time()
+		self.navigation_count = 0
+		# a page we only start tracking now may be in the middle of loading
+		self.settled_navigation_count = -1
+		self._activity = asyncio.Event()
+
+		page.on('request', self._on_request)
+		page.on('response', self._on_response)
+		page.on('requestfailed', self._on_request_failed)
+		page.on('framenavigated', self._on_frame_navigated)
+
+	def detach(self) -> None:
+		self.page.remove_listener('request', self._on_request)
+		self.page.remove_listener('response', self._on_response)
+		self.page.remove_listener('requestfailed', self._on_request_failed)
+		self.page.remove_listener('framenavigated', self._on_frame_navigated)
+
+	@property
+	def navigated_since_settled(self) -> bool:
+		return self.navigation_count != self.settled_navigation_count
+
+	def _record_activity(self) -> None:
+		self.last_activity = asyncio.get_running_loop().time()
+		self._activity.set()
+
+	def _on_request(self, request: 'Request') -> None:
+		if not is_relevant_request(request):
+			return
+		self.pending_requests.add(request)
+		self._record_activity()
+
+	def _on_response(self, response: 'Response') -> None:
+		request = response.request
+		if request not in self.pending_requests:
+			return
+		self.pending_requests.remove(request)
+		if is_relevant_response(response):
+			self._record_activity()
+		else:
+			self._activity.set()
+
+	def _on_request_failed(self, request: 'Request') -> None:
+		# failed and aborted requests never get a response
+		if request in self.pending_requests:
+			self.pending_requests.remove(request)
+			self._activity.set()
+
+	def _on_frame_navigated(self, frame: 'Frame') -> None:
+		if frame.parent_frame is None:
+			self.navigation_count += 1
+			self._record_activity()
+
+	async def wait_for_network_idle(self, idle_time: float) -> None:
+		"""Returns once no relevant request is in flight and none started or finished for idle_time seconds"""
+		loop = asyncio.get_running_loop()
+		while True:
+			self._activity.clear()
+			remaining = None
+			if not self.pending_requests:
+				remaining = self.last_activity + idle_time - loop.time()
+				if remaining <= 0:
+					return
+			try:
+				await asyncio.wait_for(self._activity.wait(), remaining)
+			except TimeoutError:
+				pass
+
+	async def wait_for_dom_quiet(self) -> None:
+		"""Returns once the DOM had no structural changes for DOM_QUIET_TIME, or after DOM_QUIET_TIMEOUT"""
+		try:
+			quiet = await self.page.evaluate(
+				WAIT_FOR_DOM_QUIET_JS, {'quietMs': DOM_QUIET_TIME * 1000, 'timeoutMs': DOM_QUIET_TIMEOUT * 1000}
+			)
+			if not quiet:
+				logger.debug(f'DOM still changing after {DOM_QUIET_TIMEOUT}s, continuing')
+		except Exception as e:
+			# the document is replaced by a navigation, the network wait covers loading the new one
+			logger.debug(f'Could not wait for the DOM to settle: {type(e).__name__}: {e}')
+
+	async def get_dom_version(self) -> tuple | None:
+		"""
+		A value that only stays the same while the page shows the same document, with no DOM changes
+		and the same scroll position and viewport. None if the page can't be evaluated.
+		"""
+		try:
+			return (self.navigation_count, *await self.page.evaluate(GET_DOM_VERSION_JS))
+		except Exception as e:
+			logger.debug(f'Could not get the DOM version: {type(e).__name__}: {e}')
+			return None
+
+	async def wait_until_settled(self, network_idle_time: float, timeout: float) -> bool:
+		"""
+		Waits for a navigated page's DOM to be loaded, then for its network and DOM to settle.
+
+		Returns False if the page didn't settle within timeout seconds. The navigation counts as handled either way,
+		so the next waits don't wait for the load of a page that never settles again.
+		"""
+		try:
+			await asyncio.wait_for(self._wait_until_settled(network_idle_time), timeout)
+			settled = True
+		except asyncio.TimeoutError:
+			settled = False
+		self.settled_navigation_count = self.navigation_count
+		return settled
+
+	async def _wait_until_settled(self, network_idle_time: float) -> None:
+		if self.navigated_since_settled:
+			await self.page.wait_for_load_state('domcontentloaded')
+		await asyncio.gather(self.wait_for_network_idle(network_idle_time), self.wait_for_dom_quiet())
@@ -570,7 +570,9 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 	)
 
 	# --- Page load/wait timings ---
-	minimum_wait_page_load_time: float = Field(default=0.25, description='Minimum time to wait before capturing page state.')
+	minimum_wait_page_load_time: float = Field(
+		default=0.25, description='Minimum time to wait before capturing page state after a navigation.'
+	)
 	wait_for_network_idle_page_load_time: float = Field(default=0.5, description='Time to wait for network idle.')
 	maximum_wait_page_load_time: float = Field(default=5.0, description='Maximum time to wait for page load.')
 	wait_between_actions: float = Field(default=0.5, description='Time to wait between actions.')
@@ -579,6 +581,45 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 	include_dynamic_attributes: bool = Field(default=True, description='Include dynamic attributes in selectors.')
 	highlight_elements: bool = Field(default=True, description='Highlight interactive elements on the page.')
 	viewport_expansion: int = Field(default=500, description='Viewport expansion in pixels for LLM context.')
+	viewport_scoped_dom: bool = Field(
+		default=False,
+		description='Skip whole DOM branches outside the expanded viewport that contain nothing visible in the viewport, instead of visiting all their nodes (faster on long infinite-scroll pages).',
+	)
+	include_cross_origin_iframes: bool = Field(
+		default=False,
+		description='Also extract the DOM of visible cross-origin iframes (fetched concurrently), their elements get indexes in blocks of 1000 after the page elements.',
+	)
+	incremental_dom_snapshots: bool = Field(
+		default=False,
+		description='Track DOM mutations in the page and only re-walk the subtrees that changed since the previous step, instead of the whole DOM.',
+	)
+	dom_wire_format: Literal['json', 'packed'] = Field(
+		default='json',
+		description="Format of the DOM map sent from the page: 'json' sends one object per node, 'packed' sends compact parallel arrays (smaller and faster to decode on large pages).",
+	)
+	construct_dom_in_thread: bool = Field(
+		default=False,
+		description='Build the DOM tree from the page map in a worker thread, so large pages do not block the event loop (useful when many agents share one process).',
+	)
+	stamp_element_ids: bool = Field(
+		default=False,
+		description='Mark each highlighted element with a data-browser-use-id attribute holding its index, so actions find it with a single query instead of rebuilding its CSS selector.',
+	)
+	screenshot_format: Literal['png', 'jpeg', 'webp'] = Field(
+		default='png',
+		description="Image format of the screenshots sent to the LLM, 'jpeg' and 'webp' are much smaller than 'png' and faster to encode.",
+	)
+	screenshot_quality: int | None = Field(
+		default=None, description="Compression quality (0-100) of 'jpeg' and 'webp' screenshots, None for the browser's default."
+	)
+	screenshot_max_dimension: int | None = Field(
+		default=None,
+		description='Downscale screenshots so their longest side is at most this many pixels (e.g. 1280), the browser renders them at that size.',
+	)
+	screenshot_from_screencast: bool = Field(
+		default=False,
+		description='Keep the latest frames the browser paints (CDP screencast) and use the latest one as the viewport screenshot, instead of capturing a new screenshot every step.',
+	)
 
 	profile_directory: str = 'Default'  # e.g. 'Profile 1', 'Profile 2', 'Custom Profile', etc.
 
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+	from playwright.async_api import CDPSession, Page
+
+logger = logging.getLogger(__name__)
+
+SCREENCAST_BUFFER_SIZE = 3  # frames kept in memory per page, older frames are dropped
+SCREENCAST_FRAME_GRACE_TIME = 0.05  # seconds to wait for the frame of a repaint, a page that doesn't repaint sends no frames
+
+# resolves after the page painted its current state, the frame of that paint is sent by the screencast right after
+WAIT_FOR_PAINT_JS = '() => new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)))'
+
+
+@dataclass
+class ScreencastFrame:
+	data: str  # base64 encoded image, as sent by the browser
+	timestamp: float  # event loop time the frame was received at
+
+
+class Screencast:
+	"""
+	Keeps the latest frames the browser paints for a page, received over a CDP screencast.
+
+	Chromium only sends a frame when the page repaints, so once the page is settled the latest frame shows
+	what's on screen, without making the browser capture and encode a new screenshot.
+	"""
+
+	def __init__(
+		self,
+		page: 'Page',
+		cdp_session: 'CDPSession',
+		image_format: Literal['png', 'jpeg'] = 'png',
+		quality: int | None = None,
+		max_dimension: int | None = None,
+		buffer_size: int = SCREENCAST_BUFFER_SIZE,
+	):
+		self.page = page
+		self.cdp_session = cdp_session
+		self.image_format = image_format
+		self.quality = quality
+		self.max_dimension = max_dimension
+		self.frames: deque[ScreencastFrame] = deque(maxlen=buffer_size)
+		self.started = False
+		self._new_frame = asyncio.Event()
+		self._pending_acks: set[asyncio.Task] = set()
+
+	async def start(self) -> None:
+		params: dict[str, Any] = {'format': self.image_format, 'everyNthFrame': 1}
+		if self.image_format == 'jpeg' and self.quality is not None:
+			params['quality'] = self.quality
+		if self.max_dimension:
+			params['maxWidth'] = self.max_dimension
+			params['maxHeight'] = self.max_dimension
+
+		self.cdp_session.on('Page.screencastFrame', self._on_frame)
+		await self.cdp_session.send('Page.startScreencast', params)
+		self.started = True
+
+	async def stop(self) -> None:
+		self.started = False
+		self.cdp_session.remove_listener('Page.screencastFrame', self._on_frame)
+		await self.cdp_session.send('Page.stopScreencast')
+		self.frames.clear()
+
+	def _on_frame(self, event: dict) -> None:
+		self.frames.append(ScreencastFrame(data=event['data'], timestamp=asyncio.get_running_loop().time()))
+		self._new_frame.set()
+
+		# the browser stops sending frames until the previous ones are acknowledged
+		task = asyncio.create_task(self._ack_frame(event['sessionId']))
+		self._pending_acks.add(task)
+		task.add_done_callback(self._pending_acks.discard)
+
+	async def _ack_frame(self, session_id: int) -> None:
+		try:
+			await self.cdp_session.send('Page.screencastFrameAck', {'sessionId': session_id})
+		except Exception as e:
+			# the page was closed or navigated away
+			logger.debug(f'Failed to acknowledge screencast frame: {type(e).__name__}: {e}')
+
+	async def get_current_frame(self) -> ScreencastFrame | None:
+		"""
+		Returns the frame showing the current state of the page, or None if no frame was received yet.
+
+		Waits for the page to paint any pending changes and gives the frame of that paint a moment to arrive,
+		if no new frame comes the page didn't repaint and the latest frame is still up to date.
+		"""
+		loop = asyncio.get_running_loop()
+		requested_at = loop.time()
+		await self.page.evaluate(WAIT_FOR_PAINT_JS)
+
+		deadline = loop.time() + SCREENCAST_FRAME_GRACE_TIME
+		while not self.frames or self.frames[-1].timestamp < requested_at:
+			self._new_frame.clear()
+			remaining = deadline - loop.time()
+			if remaining <= 0:
+				break
+			try:
+				await asyncio.wait_for(self._new_frame.wait(), remaining)
+			except TimeoutError:
+				break
+
+		return self.frames[-1] if self.frames else None
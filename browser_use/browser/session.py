@@ -9,32 +9,37 @@ import os
 import random
 import re
 import time
+import weakref
+from collections.abc import Awaitable
 from dataclasses import dataclass
-from functools import wraps
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Self, Set, Tuple, cast, Union
+from typing import Any, Dict, List, Optional, Self, Set, Tuple, TypeVar, cast, Union
 
 import psutil
 from playwright.async_api import (
 	Browser as PlaywrightBrowser,
 	BrowserContext as PlaywrightBrowserContext,
+	CDPSession,
 	ElementHandle,
+	Frame,
 	FrameLocator,
 	Page,
 	Playwright,
-	TimeoutError,
 	async_playwright,
 )
 from pydantic import BaseModel, ConfigDict, Field, InstanceOf, PrivateAttr, model_validator, AliasChoices
 from pydantic.fields import FieldInfo
-from playwright._impl._api_structures import ViewportSize
+from playwright._impl._api_structures import FloatRect, ViewportSize
 
 from browser_use.dom.views import DOMElementNode
+from browser_use.browser.page_activity import PageActivityTracker
 from browser_use.browser.views import BrowserError, TabInfo, BrowserStateSummary
 from browser_use.browser.profile import BrowserProfile, DEFAULT_BROWSER_PROFILE, get_display_size
+from browser_use.browser.screencast import Screencast, ScreencastFrame
 from browser_use.dom.clickable_element_processor.service import ClickableElementProcessor
-from browser_use.dom.service import DomService
-from browser_use.dom.views import SelectorMap
+from browser_use.dom.service import ELEMENT_ID_ATTRIBUTE, DomService
+from browser_use.dom.views import DOMState, SelectorMap
 from browser_use.exceptions import URLNotAllowedError
 from browser_use.mouse.service import MouseMovementService
 from browser_use.mouse.views import MouseMovementConfig, MouseMovementPattern
@@ -44,10 +49,104 @@ from browser_use.utils import time_execution_async, time_execution_sync
 IN_DOCKER = os.environ.get('IN_DOCKER', 'false').lower()[0] in 'ty1'
 
 logger = logging.getLogger('browser_use.browser.session')
-
+T = TypeVar('T')
 
 _GLOB_WARNING_SHOWN = False  # used inside _is_url_allowed to avoid spamming the logs with the same warning multiple times
 
+# attributes that are stable and useful for selecting an element, see BrowserSession._enhanced_css_selector_for_element
+SAFE_SELECTOR_ATTRIBUTES = frozenset(
+	{
+		# Data attributes (if they're stable in your application)
+		'id',
+		# Standard HTML attributes
+		'name',
+		'type',
+		'placeholder',
+		# Accessibility attributes
+		'aria-label',
+		'aria-labelledby',
+		'aria-describedby',
+		'role',
+		# Common form attributes
+		'for',
+		'autocomplete',
+		'required',
+		'readonly',
+		# Media attributes
+		'alt',
+		'title',
+		'src',
+		# Custom stable attributes (add any application-specific ones)
+		'href',
+		'target',
+	}
+)
+DYNAMIC_SELECTOR_ATTRIBUTES = frozenset({'data-id', 'data-qa', 'data-cy', 'data-testid'})
+VALID_CSS_CLASS_NAME_PATTERN = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_-]*$')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# checks in one round-trip that a resolved element is still in the page, scrolls it into view if it's visible
+# and reads the properties the actions need, null if the element is gone
+PREPARE_ELEMENT_JS = """element => {
+	if (!element.isConnected) return null;
+	const rect = element.getBoundingClientRect();
+	const isVisible = rect.width > 0 && rect.height > 0 && getComputedStyle(element).visibility !== 'hidden';
+	if (isVisible) element.scrollIntoViewIfNeeded();
+	return {
+		tagName: element.tagName.toLowerCase(),
+		isVisible,
+		isContentEditable: element.isContentEditable,
+		readOnly: !!element.readOnly,
+		disabled: !!element.disabled,
+	};
+}"""
+
+# fills the elements buildDomTree.js gave these highlight indexes in the last extraction, in one go,
+# returns an error message for each field that couldn't be filled, and 'not found' for elements that are gone
+FILL_ELEMENTS_JS = """(fields) => fields.map(({ index, tagName, value }) => {
+	const element = window._browserUseElementsByIndex?.get(index);
+	if (!element?.isConnected || element.tagName.toLowerCase() !== tagName) return 'not found';
+	if (element.disabled || element.readOnly) return 'element is disabled or read-only';
+
+	// each field reports its own error, the other fields are still filled
+	try {
+		element.focus();
+		if (tagName === 'input' && (element.type === 'checkbox' || element.type === 'radio')) {
+			const checked = !['', 'false', '0', 'off', 'no', 'unchecked'].includes(value.trim().toLowerCase());
+			// clicking fires the same events as a user toggling it
+			if (element.checked !== checked) element.click();
+			return null;
+		}
+		if (tagName === 'select') {
+			const option = Array.from(element.options).find(option => option.value === value || option.text.trim() === value.trim());
+			if (!option) return `no option "${value}"`;
+			value = option.value;
+		}
+		if (tagName === 'input' || tagName === 'textarea' || tagName === 'select') {
+			// the native setter, frameworks like React track the value property of the element itself,
+			// taken from the base class of the element's own window as subclasses don't define it
+			const view = element.ownerDocument.defaultView || window;
+			const elementClass = { input: view.HTMLInputElement, textarea: view.HTMLTextAreaElement, select: view.HTMLSelectElement }[tagName];
+			Object.getOwnPropertyDescriptor(elementClass.prototype, 'value').set.call(element, value);
+		} else if (element.isContentEditable) {
+			element.textContent = value;
+		} else {
+			return `<${tagName}> elements can't be filled`;
+		}
+		element.dispatchEvent(new Event('input', { bubbles: true }));
+		element.dispatchEvent(new Event('change', { bubbles: true }));
+		return null;
+	} catch (error) {
+		return String(error?.message || error);
+	}
+})"""
+
+# the element buildDomTree.js gave this highlight index in the last extraction, if it's still in the page
+RESOLVE_ELEMENT_BY_INDEX_JS = """({ index, tagName }) => {
+	const element = window._browserUseElementsByIndex?.get(index);
+	return element?.isConnected && element.tagName.toLowerCase() === tagName ? element : null;
+}"""
+
 
 def truncate_url(s: str, max_len: int | None = None) -> str:
 	"""Truncate/pretty-print a URL with a maximum length, removing the protocol and www. prefix"""
@@ -82,6 +181,64 @@ def require_initialization(func):
 DEFAULT_BROWSER_PROFILE = BrowserProfile()
 
 
+@lru_cache(maxsize=4096)
+def _xpath_to_css_selector(xpath: str) -> str:
+	"""Converts simple XPath expressions to CSS selectors, the same xpaths come up again in every step and in history items"""
+	if not xpath:
+		return ''
+
+	# Remove leading slash if present
+	xpath = xpath.lstrip('/')
+
+	# Split into parts
+	parts = xpath.split('/')
+	css_parts = []
+
+	for part in parts:
+		if not part:
+			continue
+
+		# Handle custom elements with colons by escaping them
+		if ':' in part and '[' not in part:
+			base_part = part.replace(':', r'\:')
+			css_parts.append(base_part)
+			continue
+
+		# Handle index notation [n]
+		if '[' in part:
+			base_part = part[: part.find('[')]
+			# Handle custom elements with colons in the base part
+			if ':' in base_part:
+				base_part = base_part.replace(':', r'\:')
+			index_part = part[part.find('[') :]
+
+			# Handle multiple indices
+			indices = [i.strip('[]') for i in index_part.split(']')[:-1]]
+
+			for idx in indices:
+				try:
+					# Handle numeric indices
+					if idx.isdigit():
+						index = int(idx) - 1
+						base_part += f':nth-of-type({index + 1})'
+					# Handle last() function
+					elif idx == 'last()':
+						base_part += ':last-of-type'
+					# Handle position() functions
+					elif 'position()' in idx:
+						if '>1' in idx:
+							base_part += ':nth-of-type(n+2)'
+				except ValueError:
+					continue
+
+			css_parts.append(base_part)
+		else:
+			css_parts.append(part)
+
+	base_selector = ' > '.join(css_parts)
+	return base_selector
+
+
 @dataclass
 class CachedClickableElementHashes:
 	"""
@@ -92,6 +249,41 @@ class CachedClickableElementHashes:
 	hashes: set[str]
 
 
+@dataclass
+class CachedElementHandle:
+	"""
+	Element handle resolved for an element of the current DOM tree
+	"""
+
+	element: DOMElementNode
+	page: Page
+	handle: ElementHandle
+
+
+@dataclass
+class PreparedElement:
+	"""
+	Element scrolled into view for an action, with the properties the action needs
+	"""
+
+	handle: ElementHandle
+	tag_name: str
+	is_visible: bool
+	is_content_editable: bool
+	readonly: bool
+	disabled: bool
+
+
+@dataclass
+class StatePrefetch:
+	"""
+	State summary being extracted in the background for the next step
+	"""
+
+	page: Page
+	task: asyncio.Task[BrowserStateSummary]
+
+
 class BrowserSession(BaseModel):
 	"""
 	Represents an active browser session with a running browser process somewhere.
@@ -169,6 +361,19 @@ class BrowserSession(BaseModel):
 	_cached_browser_state_summary: BrowserStateSummary | None = PrivateAttr(default=None)
 	_cached_clickable_element_hashes: CachedClickableElementHashes | None = PrivateAttr(default=None)
 	_mouse_movement_service: Optional[MouseMovementService] = PrivateAttr(default=None)
+	_dom_services: weakref.WeakKeyDictionary[Page, DomService] = PrivateAttr(default_factory=weakref.WeakKeyDictionary)
+	_page_activity_trackers: weakref.WeakKeyDictionary[Page, PageActivityTracker] = PrivateAttr(
+		default_factory=weakref.WeakKeyDictionary
+	)
+	_cached_dom_version: tuple | None = PrivateAttr(default=None)
+	_cdp_sessions: weakref.WeakKeyDictionary[Page, CDPSession] = PrivateAttr(default_factory=weakref.WeakKeyDictionary)
+	_screencasts: weakref.WeakKeyDictionary[Page, Screencast] = PrivateAttr(default_factory=weakref.WeakKeyDictionary)
+	_tab_titles: weakref.WeakKeyDictionary[Page, str | None] = PrivateAttr(default_factory=weakref.WeakKeyDictionary)
+	_tab_title_watched_pages: weakref.WeakSet[Page] = PrivateAttr(default_factory=weakref.WeakSet)
+	_tab_navigation_counts: weakref.WeakKeyDictionary[Page, int] = PrivateAttr(default_factory=weakref.WeakKeyDictionary)
+	_element_handles: dict[int, CachedElementHandle] = PrivateAttr(default_factory=dict)
+	_page_possibly_changed: bool = PrivateAttr(default=True)
+	_state_prefetch: StatePrefetch | None = PrivateAttr(default=None)
 
 	@model_validator(mode='after')
 	def apply_session_overrides_to_profile(self) -> Self:
@@ -230,6 +435,10 @@ class BrowserSession(BaseModel):
 		return self
 
 	async def stop(self) -> None:
+		if self._state_prefetch is not None:
+			self._state_prefetch.task.cancel()
+			self._state_prefetch = None
+
 		if not self.browser_profile.keep_alive:
 			logger.info('🛑 Shutting down browser...')
 			if self.browser_context:
@@ -610,10 +819,18 @@ class BrowserSession(BaseModel):
 		Handles cases where the page might be closed or inaccessible.
 		"""
 		page = await self.get_current_page()
-		try:
-			await page.evaluate(
-				"""
+		# cross-origin iframes extracted separately have highlights of their own
+		dom_service = self._dom_services.get(page)
+		frames = [page, *(frame for frame in dom_service.iframe_frames if not frame.is_detached())] if dom_service else [page]
+		results = await asyncio.gather(
+			*(
+				frame.evaluate(
+					"""
                 try {
+                    // Stop repositioning the highlights on scroll and resize
+                    (window._highlightCleanupFunctions || []).forEach(fn => fn());
+                    window._highlightCleanupFunctions = [];
+
                     // Remove the highlight container and all its contents
                     const container = document.getElementById('playwright-highlight-container');
                     if (container) {
@@ -629,10 +846,15 @@ class BrowserSession(BaseModel):
                     console.error('Failed to remove highlights:', e);
                 }
                 """
-			)
-		except Exception as e:
-			logger.debug(f'⚠  Failed to remove highlights (this is usually ok): {type(e).__name__}: {e}')
-			# Don't raise the error since this is not critical functionality
+				)
+				for frame in frames
+			),
+			return_exceptions=True,
+		)
+		for e in results:
+			if isinstance(e, BaseException):
+				logger.debug(f'⚠  Failed to remove highlights (this is usually ok): {type(e).__name__}: {e}')
+				# Don't raise the error since this is not critical functionality
 
 	@require_initialization
 	async def get_dom_element_by_index(self, index: int) -> Any | None:
@@ -729,21 +951,16 @@ class BrowserSession(BaseModel):
 		"""
 		try:
 			logger.debug(f"🖱️ Clicking element: {repr(element_node)}")
-			element_handle = await self.get_locate_element(element_node)
+			# resolves the element, scrolls it into view and checks its visibility in one round-trip,
+			# click() itself waits for the element to be stable
+			prepared = await self._prepare_element(element_node)
 
-			if element_handle is None:
+			if prepared is None:
 				raise BrowserError(f'Element: {repr(element_node)} not found')
 
-			# Ensure element is ready
-			try:
-				await element_handle.wait_for_element_state('stable', timeout=1000)
-				is_visible = await self._is_visible(element_handle)
-
-				if not is_visible:
-					raise BrowserError(f'Element: {repr(element_node)} is not visible')
-			except Exception as e:
-				logger.debug(f"Element state error: {e}")
-				raise BrowserError(f'Element: {repr(element_node)} is not ready for click: {str(e)}')
+			if not prepared.is_visible:
+				raise BrowserError(f'Element: {repr(element_node)} is not ready for click: Element is not visible')
+			element_handle = prepared.handle
 
 			# Add visual cursor if enabled
 			if hasattr(self, '_mouse_movement_service') and self._mouse_movement_service.config.show_visual_cursor:
@@ -773,19 +990,57 @@ class BrowserSession(BaseModel):
 	async def get_tabs_info(self) -> list[TabInfo]:
 		"""Get information about all tabs"""
 
+		pages = self.browser_context.pages
+
+		# titles of the other tabs are cached until they navigate, the current page can change its title any time
+		stale_pages = [page for page in pages if page is self.agent_current_page or page not in self._tab_titles]
+		titles = {page: self._tab_titles[page] for page in pages if page not in stale_pages}
+		titles.update(zip(stale_pages, await asyncio.gather(*(self._fetch_tab_title(page) for page in stale_pages))))
+
 		tabs_info = []
-		for page_id, page in enumerate(self.browser_context.pages):
-			try:
-				tab_info = TabInfo(page_id=page_id, url=page.url, title=await asyncio.wait_for(page.title(), timeout=1))
-			except TimeoutError:
+		for page_id, page in enumerate(pages):
+			title = titles[page]
+			if title is None:
 				# page.title() can hang forever on tabs that are crashed/disappeared/about:blank
 				# we dont want to try automating those tabs because they will hang the whole script
-				logger.debug('⚠  Failed to get tab info for tab #%s: %s (ignoring)', page_id, page.url)
 				tab_info = TabInfo(page_id=page_id, url='about:blank', title='ignore this tab and do not use it')
+			else:
+				tab_info = TabInfo(page_id=page_id, url=page.url, title=title)
 			tabs_info.append(tab_info)
 
 		return tabs_info
 
+	async def _fetch_tab_title(self, page: Page) -> str | None:
+		"""
+		Get the title of a tab, or None if it doesn't respond, and watch the tab for changes of its title.
+
+		The title is cached unless the tab navigated while it was fetched, it could be the title of the previous document.
+		"""
+		if page not in self._tab_title_watched_pages:
+			self._tab_title_watched_pages.add(page)
+
+			def on_frame_navigated(frame: Frame) -> None:
+				if frame.parent_frame is None:
+					self._invalidate_tab_title(page)
+
+			page.on('framenavigated', on_frame_navigated)
+			page.on('domcontentloaded', lambda _: self._invalidate_tab_title(page))
+			page.on('close', lambda _: self._invalidate_tab_title(page))
+
+		navigation_count = self._tab_navigation_counts.get(page, 0)
+		try:
+			title = await asyncio.wait_for(page.title(), timeout=1)
+		except Exception:
+			logger.debug('⚠  Failed to get tab info for tab %s (ignoring)', page.url)
+			title = None
+		if self._tab_navigation_counts.get(page, 0) == navigation_count:
+			self._tab_titles[page] = title
+		return title
+
+	def _invalidate_tab_title(self, page: Page) -> None:
+		self._tab_navigation_counts[page] = self._tab_navigation_counts.get(page, 0) + 1
+		self._tab_titles.pop(page, None)
+
 	@require_initialization
 	async def close_tab(self, tab_index: int | None = None) -> None:
 		pages = self.browser_context.pages
@@ -857,182 +1112,33 @@ class BrowserSession(BaseModel):
 	# 	"""
 	# 	return list(Path(self.browser_profile.downloads_dir).glob('*'))
 
-	async def _wait_for_stable_network(self):
-		pending_requests = set()
-		last_activity = asyncio.get_event_loop().time()
+	def get_page_activity_tracker(self, page: Page) -> PageActivityTracker:
+		"""Get the activity tracker of a page, its listeners stay attached for the lifetime of the page"""
+		tracker = self._page_activity_trackers.get(page)
+		if tracker is None:
+			tracker = self._page_activity_trackers[page] = PageActivityTracker(page)
+		return tracker
 
+	async def _wait_for_stable_network(self):
 		page = await self.get_current_page()
+		tracker = self.get_page_activity_tracker(page)
 
-		# Define relevant resource types and content types
-		RELEVANT_RESOURCE_TYPES = {
-			'document',
-			'stylesheet',
-			'image',
-			'font',
-			'script',
-			'iframe',
-		}
-
-		RELEVANT_CONTENT_TYPES = {
-			'text/html',
-			'text/css',
-			'application/javascript',
-			'image/',
-			'font/',
-			'application/json',
-		}
-
-		# Additional patterns to filter out
-		IGNORED_URL_PATTERNS = {
-			# Analytics and tracking
-			'analytics',
-			'tracking',
-			'telemetry',
-			'beacon',
-			'metrics',
-			# Ad-related
-			'doubleclick',
-			'adsystem',
-			'adserver',
-			'advertising',
-			# Social media widgets
-			'facebook.com/plugins',
-			'platform.twitter',
-			'linkedin.com/embed',
-			# Live chat and support
-			'livechat',
-			'zendesk',
-			'intercom',
-			'crisp.chat',
-			'hotjar',
-			# Push notifications
-			'push-notifications',
-			'onesignal',
-			'pushwoosh',
-			# Background sync/heartbeat
-			'heartbeat',
-			'ping',
-			'alive',
-			# WebRTC and streaming
-			'webrtc',
-			'rtmp://',
-			'wss://',
-			# Common CDNs for dynamic content
-			'cloudfront.net',
-			'fastly.net',
-		}
-
-		async def on_request(request):
-			# Filter by resource type
-			if request.resource_type not in RELEVANT_RESOURCE_TYPES:
-				return
-
-			# Filter out streaming, websocket, and other real-time requests
-			if request.resource_type in {
-				'websocket',
-				'media',
-				'eventsource',
-				'manifest',
-				'other',
-			}:
-				return
-
-			# Filter out by URL patterns
-			url = request.url.lower()
-			if any(pattern in url for pattern in IGNORED_URL_PATTERNS):
-				return
-
-			# Filter out data URLs and blob URLs
-			if url.startswith(('data:', 'blob:')):
-				return
-
-			# Filter out requests with certain headers
-			headers = request.headers
-			if headers.get('purpose') == 'prefetch' or headers.get('sec-fetch-dest') in [
-				'video',
-				'audio',
-			]:
-				return
-
-			nonlocal last_activity
-			pending_requests.add(request)
-			last_activity = asyncio.get_event_loop().time()
-			# logger.debug(f'Request started: {request.url} ({request.resource_type})')
-
-		async def on_response(response):
-			request = response.request
-			if request not in pending_requests:
-				return
-
-			# Filter by content type if available
-			content_type = response.headers.get('content-type', '').lower()
-
-			# Skip if content type indicates streaming or real-time data
-			if any(
-				t in content_type
-				for t in [
-					'streaming',
-					'video',
-					'audio',
-					'webm',
-					'mp4',
-					'event-stream',
-					'websocket',
-					'protobuf',
-				]
-			):
-				pending_requests.remove(request)
-				return
-
-			# Only process relevant content types
-			if not any(ct in content_type for ct in RELEVANT_CONTENT_TYPES):
-				pending_requests.remove(request)
-				return
-
-			# Skip if response is too large (likely not essential for page load)
-			content_length = response.headers.get('content-length')
-			if content_length and int(content_length) > 5 * 1024 * 1024:  # 5MB
-				pending_requests.remove(request)
-				return
-
-			nonlocal last_activity
-			pending_requests.remove(request)
-			last_activity = asyncio.get_event_loop().time()
-			# logger.debug(f'Request resolved: {request.url} ({content_type})')
-
-		# Attach event listeners
-		page.on('request', on_request)
-		page.on('response', on_response)
-
-		try:
-			# Wait for idle time
-			start_time = asyncio.get_event_loop().time()
-			while True:
-				await asyncio.sleep(0.1)
-				now = asyncio.get_event_loop().time()
-				if (
-					len(pending_requests) == 0
-					and (now - last_activity) >= self.browser_profile.wait_for_network_idle_page_load_time
-				):
-					break
-				if now - start_time > self.browser_profile.maximum_wait_page_load_time:
-					logger.debug(
-						f'Network timeout after {self.browser_profile.maximum_wait_page_load_time}s with {len(pending_requests)} '
-						f'pending requests: {[r.url for r in pending_requests]}'
-					)
-					break
-
-		finally:
-			# Clean up event listeners
-			page.remove_listener('request', on_request)
-			page.remove_listener('response', on_response)
+		if not await tracker.wait_until_settled(
+			self.browser_profile.wait_for_network_idle_page_load_time,
+			timeout=self.browser_profile.maximum_wait_page_load_time,
+		):
+			logger.debug(
+				f'Network timeout after {self.browser_profile.maximum_wait_page_load_time}s with {len(tracker.pending_requests)} '
+				f'pending requests: {[r.url for r in tracker.pending_requests]}'
+			)
+			return
 
 		logger.debug(f'⚖️  Network stabilized for {self.browser_profile.wait_for_network_idle_page_load_time} seconds')
 
 	async def _wait_for_page_and_frames_load(self, timeout_overwrite: float | None = None):
 		"""
 		Ensures page is fully loaded before continuing.
-		Waits for either network to be idle or minimum WAIT_TIME, whichever is longer.
+		Waits for the network and the DOM to settle, and after a navigation for at least the minimum WAIT_TIME.
 		Also checks if the loaded URL is allowed.
 		"""
 		# Start timing
@@ -1040,6 +1146,7 @@ class BrowserSession(BaseModel):
 
 		# Wait for page load
 		page = await self.get_current_page()
+		navigated = self.get_page_activity_tracker(page).navigated_since_settled
 		try:
 			await self._wait_for_stable_network()
 
@@ -1051,9 +1158,10 @@ class BrowserSession(BaseModel):
 			logger.warning('⚠️  Page load failed, continuing...')
 			pass
 
-		# Calculate remaining time to meet minimum WAIT_TIME
+		# Calculate remaining time to meet minimum WAIT_TIME, a page that didn't navigate has nothing left to render
 		elapsed = time.time() - start_time
-		remaining = max((timeout_overwrite or self.browser_profile.minimum_wait_page_load_time) - elapsed, 0)
+		minimum_wait = timeout_overwrite or self.browser_profile.minimum_wait_page_load_time
+		remaining = max(minimum_wait - elapsed, 0) if navigated else 0
 
 		logger.debug(f'--Page loaded in {elapsed:.2f} seconds, waiting for additional {remaining:.2f} seconds')
 
@@ -1296,8 +1404,18 @@ class BrowserSession(BaseModel):
 			This is used to calculate which elements are new to the LLM since the last message,
 			which helps reduce token usage.
 		"""
-		await self._wait_for_page_and_frames_load()
-		updated_state = await self._get_updated_state()
+		page = await self.get_current_page()
+		updated_state = await self._take_prefetched_state(page)
+		if updated_state is None:
+			if not self._page_possibly_changed and not self.get_page_activity_tracker(page).navigated_since_settled:
+				# only read-only actions ran since the last state, there is nothing to wait for,
+				# and the last state can be reused as is if the page is provably unchanged
+				updated_state = await self._get_cached_state_if_unchanged(page, self._cached_browser_state_summary)
+			else:
+				await self._wait_for_page_and_frames_load()
+		if updated_state is None:
+			updated_state = await self._get_updated_state()
+		self._page_possibly_changed = False
 
 		# Find out which elements are new
 		# Do this only if url has not changed
@@ -1327,6 +1445,67 @@ class BrowserSession(BaseModel):
 
 		return self._cached_browser_state_summary
 
+	def mark_page_possibly_changed(self) -> None:
+		"""Called before an action that may change the page, the next state summary then waits for it and extracts it again"""
+		self._page_possibly_changed = True
+
+	def prefetch_state_summary(self) -> None:
+		"""
+		Start waiting for the current page to settle and extracting its state in the background.
+
+		The next get_state_summary() returns the prefetched state if the page didn't change since it was extracted,
+		so the page can settle and be extracted while the caller does other work that doesn't need the state.
+		"""
+		if self._state_prefetch is not None or self.agent_current_page is None:
+			return
+
+		async def prefetch_state() -> BrowserStateSummary:
+			await self._wait_for_page_and_frames_load()
+			return await self._get_updated_state()
+
+		# the prefetched state covers the changes made so far, an action that runs after it invalidates it
+		self._page_possibly_changed = False
+		self._state_prefetch = StatePrefetch(page=self.agent_current_page, task=asyncio.create_task(prefetch_state()))
+
+	async def _take_prefetched_state(self, page: Page) -> BrowserStateSummary | None:
+		"""The prefetched state, if the page is still the one it was extracted from and didn't change since"""
+		prefetch, self._state_prefetch = self._state_prefetch, None
+		if prefetch is None:
+			return None
+		try:
+			# the extraction isn't cancelled, the DOM service must see the result of every snapshot it takes
+			prefetched_state = await prefetch.task
+		except Exception as e:
+			logger.debug(f'Failed to prefetch the state: {type(e).__name__}: {e}')
+			prefetched_state = None
+
+		if prefetched_state is not None and not self._page_possibly_changed and prefetch.page is page:
+			prefetched_state = await self._get_cached_state_if_unchanged(page, prefetched_state)
+			if prefetched_state is not None:
+				logger.debug('⚡ Page is unchanged since the state was prefetched, using it')
+				return prefetched_state
+			logger.debug('Page changed since the state was prefetched, extracting it again')
+		self._page_possibly_changed = True
+		return None
+
+	async def _get_cached_state_if_unchanged(
+		self, page: Page, cached_state: BrowserStateSummary | None
+	) -> BrowserStateSummary | None:
+		"""The state extracted last, if the page still shows the same document with the same DOM, scroll position and viewport"""
+		if cached_state is None or self._cached_dom_version is None or cached_state.url != page.url:
+			return None
+		if await self.get_page_activity_tracker(page).get_dom_version() != self._cached_dom_version:
+			return None
+		logger.debug('♻️  Page is unchanged since the last state, reusing it')
+		return cached_state
+
+	def get_dom_service(self, page: Page) -> DomService:
+		"""Get the DomService of a page, kept for the lifetime of the page so it can reuse its last DOM snapshot"""
+		dom_service = self._dom_services.get(page)
+		if dom_service is None:
+			dom_service = self._dom_services[page] = DomService(page)
+		return dom_service
+
 	async def _get_updated_state(self, focus_element: int = -1) -> BrowserStateSummary:
 		"""Update and return state."""
 
@@ -1340,16 +1519,53 @@ class BrowserSession(BaseModel):
 			logger.debug(f'👋  Current page is no longer accessible: {type(e).__name__}: {e}')
 			raise BrowserError('Browser closed: no valid pages available')
 
-		try:
-			await self.remove_highlights()
-			dom_service = DomService(page)
-			content = await dom_service.get_clickable_elements(
-				focus_element=focus_element,
-				viewport_expansion=self.browser_profile.viewport_expansion,
-				highlight_elements=self.browser_profile.highlight_elements,
+		timings: dict[str, float] = {}
+
+		async def timed(name: str, awaitable: Awaitable[T]) -> T:
+			start = time.perf_counter()
+			try:
+				return await awaitable
+			finally:
+				timings[name] = time.perf_counter() - start
+
+		async def get_dom_and_screenshot() -> tuple[DOMState, str]:
+			# the version is read before the extraction, so changes made while extracting show in the next version
+			dom_version, _ = await asyncio.gather(
+				self.get_page_activity_tracker(page).get_dom_version(),
+				# the highlights are drawn by the DOM extraction and must be in the screenshot
+				timed('remove_highlights', self.remove_highlights()),
 			)
+			self._cached_dom_version = dom_version
+			dom_service = self.get_dom_service(page)
+			content = await timed(
+				'dom',
+				dom_service.get_clickable_elements(
+					focus_element=focus_element,
+					viewport_expansion=self.browser_profile.viewport_expansion,
+					highlight_elements=self.browser_profile.highlight_elements,
+					incremental=self.browser_profile.incremental_dom_snapshots,
+					wire_format=self.browser_profile.dom_wire_format,
+					viewport_scoped=self.browser_profile.viewport_scoped_dom,
+					cross_origin_iframes=self.browser_profile.include_cross_origin_iframes,
+					construct_in_thread=self.browser_profile.construct_dom_in_thread,
+					stamp_element_ids=self.browser_profile.stamp_element_ids,
+				),
+			)
+			# the handles were resolved for the elements of the previous tree
+			self._element_handles.clear()
+			screenshot_b64 = await timed('screenshot', self.take_screenshot())
+			return content, screenshot_b64
 
-			tabs_info = await self.get_tabs_info()
+		try:
+			start = time.perf_counter()
+			# the tabs, scroll position and title don't depend on the DOM, fetch them while it's being extracted
+			(content, screenshot_b64), tabs_info, (pixels_above, pixels_below), title = await asyncio.gather(
+				get_dom_and_screenshot(),
+				timed('tabs', self.get_tabs_info()),
+				timed('scroll_info', self.get_scroll_info(page)),
+				timed('title', page.title()),
+			)
+			timings['total'] = time.perf_counter() - start
 
 			# Get all cross-origin iframes within the page and open them in new tabs
 			# mark the titles of the new tabs so the LLM knows to check them for additional content
@@ -1372,22 +1588,21 @@ class BrowserSession(BaseModel):
 			# 		)
 			# 	)
 
-			screenshot_b64 = await self.take_screenshot()
-			pixels_above, pixels_below = await self.get_scroll_info(page)
-
 			self.browser_state_summary = BrowserStateSummary(
 				element_tree=content.element_tree,
 				selector_map=content.selector_map,
 				url=page.url,
-				title=await page.title(),
+				title=title,
 				tabs=tabs_info,
 				screenshot=screenshot_b64,
 				pixels_above=pixels_above,
 				pixels_below=pixels_below,
+				timings=timings,
 			)
 
 			return self.browser_state_summary
 		except Exception as e:
+			self._cached_dom_version = None
 			logger.error(f'❌  Failed to update state: {e}')
 			# Return last known good state if available
 			if hasattr(self, 'browser_state_summary'):
@@ -1396,9 +1611,12 @@ class BrowserSession(BaseModel):
 
 	# region - Browser Actions
 	@time_execution_async('--take_screenshot')
-	async def take_screenshot(self, full_page: bool = False) -> str:
+	async def take_screenshot(self, full_page: bool = False, clip: FloatRect | None = None) -> str:
 		"""
-		Returns a base64 encoded screenshot of the current page.
+		Returns a base64 encoded screenshot of the current page, of the viewport unless full_page is set.
+
+		clip captures only a region, in CSS pixels relative to the viewport (or to the page when full_page is set).
+		The format, quality and maximum size are configured by the screenshot_* options of the browser profile.
 		"""
 
 		# We no longer force tabs to the foreground as it disrupts user focus
@@ -1406,18 +1624,104 @@ class BrowserSession(BaseModel):
 		page = await self.get_current_page()
 		await page.wait_for_load_state()
 
+		profile = self.browser_profile
+		if profile.screenshot_from_screencast and not full_page and clip is None:
+			try:
+				frame = await self._get_current_screencast_frame(page)
+				if frame:
+					return frame.data
+			except Exception as e:
+				logger.debug(f'Failed to get a screencast frame, taking a screenshot instead: {type(e).__name__}: {e}')
+
+		if profile.screenshot_format == 'webp' or profile.screenshot_max_dimension:
+			# only the browser can encode webp and render a downscaled screenshot, which also saves encoding the full size image
+			try:
+				return await self._take_cdp_screenshot(page, full_page=full_page, clip=clip)
+			except Exception as e:
+				logger.debug(f'Failed to take screenshot over CDP, falling back to Playwright: {type(e).__name__}: {e}')
+
+		screenshot_type = 'jpeg' if profile.screenshot_format == 'jpeg' else 'png'
 		screenshot = await self.agent_current_page.screenshot(
 			full_page=full_page,
+			clip=clip,
+			type=screenshot_type,
+			quality=profile.screenshot_quality if screenshot_type == 'jpeg' else None,
 			animations='disabled',
 			caret='initial',
 		)
 
-		screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
+		# encoding a full page screenshot takes long enough to hold up the other tasks on the event loop
+		screenshot_b64 = await asyncio.to_thread(lambda: base64.b64encode(screenshot).decode('utf-8'))
 
 		# await self.remove_highlights()
 
 		return screenshot_b64
 
+	async def _take_cdp_screenshot(self, page: Page, full_page: bool = False, clip: FloatRect | None = None) -> str:
+		"""Takes a screenshot with Page.captureScreenshot, which returns it already encoded as base64"""
+		profile = self.browser_profile
+		cdp_session = await self._get_cdp_session(page)
+
+		viewport = await page.evaluate(
+			"""() => ({
+				x: window.visualViewport.pageLeft,
+				y: window.visualViewport.pageTop,
+				width: window.visualViewport.width,
+				height: window.visualViewport.height,
+				scrollWidth: document.documentElement.scrollWidth,
+				scrollHeight: document.documentElement.scrollHeight,
+				devicePixelRatio: window.devicePixelRatio,
+			})"""
+		)
+
+		# the clip of captureScreenshot is in page coordinates
+		if clip:
+			region = dict(clip) if full_page else {**clip, 'x': viewport['x'] + clip['x'], 'y': viewport['y'] + clip['y']}
+		elif full_page:
+			region = {'x': 0, 'y': 0, 'width': viewport['scrollWidth'], 'height': viewport['scrollHeight']}
+		else:
+			region = {'x': viewport['x'], 'y': viewport['y'], 'width': viewport['width'], 'height': viewport['height']}
+
+		scale = 1.0
+		if profile.screenshot_max_dimension:
+			longest_side = max(region['width'], region['height']) * viewport['devicePixelRatio']
+			scale = min(1.0, profile.screenshot_max_dimension / longest_side)
+
+		params: dict[str, Any] = {
+			'format': profile.screenshot_format,
+			'clip': {**region, 'scale': scale},
+			'captureBeyondViewport': full_page,
+		}
+		if profile.screenshot_format != 'png' and profile.screenshot_quality is not None:
+			params['quality'] = profile.screenshot_quality
+
+		result = await cdp_session.send('Page.captureScreenshot', params)
+		return result['data']
+
+	async def _get_current_screencast_frame(self, page: Page) -> ScreencastFrame | None:
+		"""Returns the latest screencast frame of the page, starting the screencast on the first call"""
+		screencast = self._screencasts.get(page)
+		if screencast is None:
+			profile = self.browser_profile
+			screencast = Screencast(
+				page,
+				await self._get_cdp_session(page),
+				# the screencast can't encode webp
+				image_format='png' if profile.screenshot_format == 'png' else 'jpeg',
+				quality=profile.screenshot_quality,
+				max_dimension=profile.screenshot_max_dimension,
+			)
+			self._screencasts[page] = screencast
+			await screencast.start()
+		return await screencast.get_current_frame()
+
+	async def _get_cdp_session(self, page: Page) -> CDPSession:
+		cdp_session = self._cdp_sessions.get(page)
+		if cdp_session is None:
+			cdp_session = await page.context.new_cdp_session(page)
+			self._cdp_sessions[page] = cdp_session
+		return cdp_session
+
 	# endregion
 
 	# region - User Actions
@@ -1425,81 +1729,39 @@ class BrowserSession(BaseModel):
 	@classmethod
 	def _convert_simple_xpath_to_css_selector(cls, xpath: str) -> str:
 		"""Converts simple XPath expressions to CSS selectors."""
-		if not xpath:
-			return ''
-
-		# Remove leading slash if present
-		xpath = xpath.lstrip('/')
-
-		# Split into parts
-		parts = xpath.split('/')
-		css_parts = []
-
-		for part in parts:
-			if not part:
-				continue
-
-			# Handle custom elements with colons by escaping them
-			if ':' in part and '[' not in part:
-				base_part = part.replace(':', r'\:')
-				css_parts.append(base_part)
-				continue
-
-			# Handle index notation [n]
-			if '[' in part:
-				base_part = part[: part.find('[')]
-				# Handle custom elements with colons in the base part
-				if ':' in base_part:
-					base_part = base_part.replace(':', r'\:')
-				index_part = part[part.find('[') :]
-
-				# Handle multiple indices
-				indices = [i.strip('[]') for i in index_part.split(']')[:-1]]
-
-				for idx in indices:
-					try:
-						# Handle numeric indices
-						if idx.isdigit():
-							index = int(idx) - 1
-							base_part += f':nth-of-type({index + 1})'
-						# Handle last() function
-						elif idx == 'last()':
-							base_part += ':last-of-type'
-						# Handle position() functions
-						elif 'position()' in idx:
-							if '>1' in idx:
-								base_part += ':nth-of-type(n+2)'
-					except ValueError:
-						continue
-
-				css_parts.append(base_part)
-			else:
-				css_parts.append(part)
-
-		base_selector = ' > '.join(css_parts)
-		return base_selector
+		return _xpath_to_css_selector(xpath)
 
 	@classmethod
-	@time_execution_sync('--enhanced_css_selector_for_element')
 	def _enhanced_css_selector_for_element(cls, element: DOMElementNode, include_dynamic_attributes: bool = True) -> str:
 		"""
 		Creates a CSS selector for a DOM element, handling various edge cases and special characters.
 
+		The selector is built once per element and then memoized on the element.
+
 		Args:
 				element: The DOM element to create a selector for
 
 		Returns:
 				A valid CSS selector string
 		"""
+		if element._css_selectors is None:
+			element._css_selectors = {}
+		css_selector = element._css_selectors.get(include_dynamic_attributes)
+		if css_selector is None:
+			css_selector = element._css_selectors[include_dynamic_attributes] = cls._build_enhanced_css_selector(
+				element, include_dynamic_attributes
+			)
+		return css_selector
+
+	@classmethod
+	@time_execution_sync('--enhanced_css_selector_for_element')
+	def _build_enhanced_css_selector(cls, element: DOMElementNode, include_dynamic_attributes: bool) -> str:
 		try:
 			# Get base selector from XPath
 			css_selector = cls._convert_simple_xpath_to_css_selector(element.xpath)
 
 			# Handle class attributes
 			if 'class' in element.attributes and element.attributes['class'] and include_dynamic_attributes:
-				# Define a regex pattern for valid class names in CSS
-				valid_class_name_pattern = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_-]*$')
-
 				# Iterate through the class attribute values
 				classes = element.attributes['class'].split()
 				for class_name in classes:
@@ -1508,48 +1770,14 @@ class BrowserSession(BaseModel):
 						continue
 
 					# Check if the class name is valid
-					if valid_class_name_pattern.match(class_name):
+					if VALID_CSS_CLASS_NAME_PATTERN.match(class_name):
 						# Append the valid class name to the CSS selector
 						css_selector += f'.{class_name}'
 					else:
 						# Skip invalid class names
 						continue
 
-			# Expanded set of safe attributes that are stable and useful for selection
-			SAFE_ATTRIBUTES = {
-				# Data attributes (if they're stable in your application)
-				'id',
-				# Standard HTML attributes
-				'name',
-				'type',
-				'placeholder',
-				# Accessibility attributes
-				'aria-label',
-				'aria-labelledby',
-				'aria-describedby',
-				'role',
-				# Common form attributes
-				'for',
-				'autocomplete',
-				'required',
-				'readonly',
-				# Media attributes
-				'alt',
-				'title',
-				'src',
-				# Custom stable attributes (add any application-specific ones)
-				'href',
-				'target',
-			}
-
-			if include_dynamic_attributes:
-				dynamic_attributes = {
-					'data-id',
-					'data-qa',
-					'data-cy',
-					'data-testid',
-				}
-				SAFE_ATTRIBUTES.update(dynamic_attributes)
+			safe_attributes = SAFE_SELECTOR_ATTRIBUTES | DYNAMIC_SELECTOR_ATTRIBUTES if include_dynamic_attributes else SAFE_SELECTOR_ATTRIBUTES
 
 			# Handle other attributes
 			for attribute, value in element.attributes.items():
@@ -1560,7 +1788,7 @@ class BrowserSession(BaseModel):
 				if not attribute.strip():
 					continue
 
-				if attribute not in SAFE_ATTRIBUTES:
+				if attribute not in safe_attributes:
 					continue
 
 				# Escape special characters in attribute names
@@ -1575,7 +1803,7 @@ class BrowserSession(BaseModel):
 					if '\n' in value:
 						value = value.split('\n')[0]
 					# Regex-substitute *any* whitespace with a single space, then strip.
-					collapsed_value = re.sub(r'\s+', ' ', value).strip()
+					collapsed_value = WHITESPACE_PATTERN.sub(' ', value).strip()
 					# Escape embedded double-quotes.
 					safe_value = collapsed_value.replace('"', '\\"')
 					css_selector += f'[{safe_attribute}*="{safe_value}"]'
@@ -1606,7 +1834,65 @@ class BrowserSession(BaseModel):
 
 	@time_execution_async('--get_locate_element')
 	async def get_locate_element(self, element: DOMElementNode) -> ElementHandle | None:
+		prepared = await self._prepare_element(element)
+		return prepared.handle if prepared else None
+
+	async def _prepare_element(self, element: DOMElementNode) -> PreparedElement | None:
+		"""
+		Resolves an element of the current DOM tree, scrolls it into view and reads the properties the actions need.
+
+		A handle resolved before or the element the DOM extraction kept for its highlight index take a single
+		evaluate each, the element is only located by its selector when both are gone.
+		"""
 		page = await self.get_current_page()
+
+		# multi-action steps often reference the same element again, reuse its handle while it's still in the page
+		cached = self._element_handles.get(element.highlight_index) if element.highlight_index is not None else None
+		if cached and cached.element is element and cached.page is page:
+			prepared = await self._prepare_element_handle(cached.handle)
+			if prepared:
+				return prepared
+			del self._element_handles[element.highlight_index]
+
+		element_handle = None
+		if element.highlight_index is not None:
+			try:
+				index_handle = await page.evaluate_handle(
+					RESOLVE_ELEMENT_BY_INDEX_JS, {'index': element.highlight_index, 'tagName': element.tag_name}
+				)
+				element_handle = index_handle.as_element()
+				if element_handle is None:
+					await index_handle.dispose()
+			except Exception as e:
+				logger.debug(f'Failed to resolve element by its highlight index: {type(e).__name__}: {e}')
+		if element_handle is None:
+			element_handle = await self._locate_element(page, element)
+		if element_handle is None:
+			return None
+
+		prepared = await self._prepare_element_handle(element_handle)
+		if prepared and element.highlight_index is not None:
+			self._element_handles[element.highlight_index] = CachedElementHandle(element=element, page=page, handle=element_handle)
+		return prepared
+
+	async def _prepare_element_handle(self, element_handle: ElementHandle) -> PreparedElement | None:
+		try:
+			properties = await element_handle.evaluate(PREPARE_ELEMENT_JS)
+		except Exception:
+			return None  # its document was replaced by a navigation
+		if properties is None:
+			return None
+		return PreparedElement(
+			handle=element_handle,
+			tag_name=properties['tagName'],
+			is_visible=properties['isVisible'],
+			is_content_editable=properties['isContentEditable'],
+			readonly=properties['readOnly'],
+			disabled=properties['disabled'],
+		)
+
+	async def _locate_element(self, page: Page, element: DOMElementNode) -> ElementHandle | None:
+		"""Finds an element by its stamp or its selector, _prepare_element then scrolls it into view"""
 		current_frame = page
 
 		# Start with the target element and collect all parents
@@ -1629,23 +1915,28 @@ class BrowserSession(BaseModel):
 			)
 			current_frame = current_frame.frame_locator(css_selector)
 
-		css_selector = self._enhanced_css_selector_for_element(
-			element, include_dynamic_attributes=self.browser_profile.include_dynamic_attributes
-		)
-
 		try:
-			if isinstance(current_frame, FrameLocator):
-				element_handle = await current_frame.locator(css_selector).element_handle()
-				return element_handle
-			else:
-				# Try to scroll into view if hidden
-				element_handle = await current_frame.query_selector(css_selector)
+			if self.browser_profile.stamp_element_ids and element.highlight_index is not None:
+				# the element was stamped with its index when the tree was built, unless the page re-rendered it since,
+				# clones of the element carry the stamp too so it's only trusted if exactly one element has it
+				stamp_selector = f'[{ELEMENT_ID_ATTRIBUTE}="{element.highlight_index}"]'
+				if isinstance(current_frame, FrameLocator):
+					stamp_locator = current_frame.locator(stamp_selector)
+					element_handle = await stamp_locator.element_handle() if await stamp_locator.count() == 1 else None
+				else:
+					stamped_elements = await current_frame.query_selector_all(stamp_selector)
+					element_handle = stamped_elements[0] if len(stamped_elements) == 1 else None
 				if element_handle:
-					is_visible = await self._is_visible(element_handle)
-					if is_visible:
-						await element_handle.scroll_into_view_if_needed()
 					return element_handle
-				return None
+
+			css_selector = self._enhanced_css_selector_for_element(
+				element, include_dynamic_attributes=self.browser_profile.include_dynamic_attributes
+			)
+
+			if isinstance(current_frame, FrameLocator):
+				return await current_frame.locator(css_selector).element_handle()
+			else:
+				return await current_frame.query_selector(css_selector)
 		except Exception as e:
 			logger.error(f'❌  Failed to locate element: {str(e)}')
 			return None
@@ -1740,36 +2031,19 @@ class BrowserSession(BaseModel):
 			# if element_node.highlight_index is not None:
 			# 	await self._update_state(focus_element=element_node.highlight_index)
 
-			element_handle = await self.get_locate_element(element_node)
+			# resolves the element, scrolls it into view and reads the properties that decide how to type in one round-trip
+			prepared = await self._prepare_element(element_node)
 
-			if element_handle is None:
+			if prepared is None:
 				raise BrowserError(f'Element: {repr(element_node)} not found')
-
-			# Ensure element is ready for input
-			try:
-				await element_handle.wait_for_element_state('stable', timeout=1000)
-				is_visible = await self._is_visible(element_handle)
-				if is_visible:
-					await element_handle.scroll_into_view_if_needed(timeout=1000)
-			except Exception:
-				pass
-
-			# Get element properties to determine input method
-			tag_handle = await element_handle.get_property('tagName')
-			tag_name = (await tag_handle.json_value()).lower()
-			is_contenteditable = await element_handle.get_property('isContentEditable')
-			readonly_handle = await element_handle.get_property('readOnly')
-			disabled_handle = await element_handle.get_property('disabled')
-
-			readonly = await readonly_handle.json_value() if readonly_handle else False
-			disabled = await disabled_handle.json_value() if disabled_handle else False
+			element_handle = prepared.handle
 
 			# always click the element first to make sure it's in the focus
 			await element_handle.click()
 			await asyncio.sleep(0.1)
 
 			try:
-				if (await is_contenteditable.json_value() or tag_name == 'input') and not (readonly or disabled):
+				if (prepared.is_content_editable or prepared.tag_name == 'input') and not (prepared.readonly or prepared.disabled):
 					await element_handle.evaluate('el => {el.textContent = ""; el.value = "";}')
 					await element_handle.type(text, delay=5)
 				else:
@@ -1784,6 +2058,30 @@ class BrowserSession(BaseModel):
 			logger.debug(f'❌  Failed to input text into element: {repr(element_node)}. Error: {str(e)}')
 			raise BrowserError(f'Failed to input text into index {element_node.highlight_index}')
 
+	@require_initialization
+	@time_execution_async('--fill_element_nodes')
+	async def _fill_element_nodes(self, fields: list[tuple[DOMElementNode, str]]) -> list[str | None]:
+		"""
+		Fill several form elements with a single evaluate, returns an error message for each field that failed, else None.
+
+		Elements the page no longer has from the last extraction (e.g. re-rendered, or in a cross-origin iframe)
+		are located and typed into one by one.
+		"""
+		page = await self.get_current_page()
+		errors: list[str | None] = await page.evaluate(
+			FILL_ELEMENTS_JS,
+			[{'index': element.highlight_index, 'tagName': element.tag_name, 'value': value} for element, value in fields],
+		)
+
+		for i, ((element, value), error) in enumerate(zip(fields, errors)):
+			if error == 'not found':
+				try:
+					await self._input_text_element_node(element, value)
+					errors[i] = None
+				except BrowserError as e:
+					errors[i] = str(e)
+		return errors
+
 	@require_initialization
 	@time_execution_async('--switch_to_tab')
 	async def switch_to_tab(self, page_id: int) -> Page:
@@ -1892,9 +2190,9 @@ class BrowserSession(BaseModel):
 
 	async def get_scroll_info(self, page: Page) -> tuple[int, int]:
 		"""Get scroll position information for the current page."""
-		scroll_y = await page.evaluate('window.scrollY')
-		viewport_height = await page.evaluate('window.innerHeight')
-		total_height = await page.evaluate('document.documentElement.scrollHeight')
+		scroll_y, viewport_height, total_height = await page.evaluate(
+			'() => [window.scrollY, window.innerHeight, document.documentElement.scrollHeight]'
+		)
 		pixels_above = scroll_y
 		pixels_below = total_height - (scroll_y + viewport_height)
 		return pixels_above, pixels_below
@@ -32,6 +32,7 @@ class BrowserStateSummary(DOMState):
 	pixels_above: int = 0
 	pixels_below: int = 0
 	browser_errors: list[str] = field(default_factory=list)
+	timings: dict[str, float] = field(default_factory=dict)  # seconds spent capturing each part of the state
 
 
 @dataclass
@@ -54,6 +55,15 @@ class BrowserStateHistory:
 		return data
 
 
+def screenshot_mime_type(screenshot_b64: str) -> str:
+	"""The MIME type of a base64 encoded screenshot, from the signature at the start of the image"""
+	if screenshot_b64.startswith('/9j/'):
+		return 'image/jpeg'
+	if screenshot_b64.startswith('UklGR'):
+		return 'image/webp'
+	return 'image/png'
+
+
 class BrowserError(Exception):
 	"""Base class for all browser errors"""
 
@@ -59,6 +59,7 @@ class Registry(Generic[Context]):
 		param_model: type[BaseModel] | None = None,
 		domains: list[str] | None = None,
 		page_filter: Callable[[Any], bool] | None = None,
+		read_only: bool = False,
 	):
 		"""Decorator for registering actions"""
 
@@ -91,6 +92,7 @@ class Registry(Generic[Context]):
 				param_model=actual_param_model,
 				domains=domains,
 				page_filter=page_filter,
+				read_only=read_only,
 			)
 			self.registry.actions[func.__name__] = action
 			return func
@@ -163,8 +165,10 @@ class Registry(Generic[Context]):
 				extra_args['page_extraction_llm'] = page_extraction_llm
 			if 'available_file_paths' in parameter_names:
 				extra_args['available_file_paths'] = available_file_paths
-			if action_name == 'input_text' and sensitive_data:
+			if action_name in ('input_text', 'fill_form') and sensitive_data:
 				extra_args['has_sensitive_data'] = True
+			if browser_session and not action.read_only:
+				browser_session.mark_page_possibly_changed()
 			if is_pydantic:
 				return await action.function(validated_params, **extra_args)
 			return await action.function(**validated_params.model_dump(), **extra_args)
@@ -16,6 +16,9 @@ class RegisteredAction(BaseModel):
 	domains: list[str] | None = None  # e.g. ['*.google.com', 'www.bing.com', 'yahoo.*]
 	page_filter: Callable[[Page], bool] | None = None
 
+	# actions that only read from the page, after them the page doesn't need to be waited for or re-extracted if it's unchanged
+	read_only: bool = False
+
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
 	def prompt_description(self) -> str:
@@ -20,6 +20,7 @@ from browser_use.controller.views import (
 	CloseTabAction,
 	DoneAction,
 	DragDropAction,
+	FillFormAction,
 	GoToUrlAction,
 	InputTextAction,
 	NoParamsAction,
@@ -115,7 +116,7 @@ class Controller(Generic[Context]):
 			return ActionResult(extracted_content=msg, include_in_memory=True)
 
 		# wait for x seconds
-		@self.registry.action('Wait for x seconds default 3')
+		@self.registry.action('Wait for x seconds default 3', read_only=True)
 		async def wait(seconds: int = 3):
 			msg = f'🕒  Waiting for {seconds} seconds'
 			logger.info(msg)
@@ -178,6 +179,41 @@ class Controller(Generic[Context]):
 			logger.debug(f'Element xpath: {element_node.xpath}')
 			return ActionResult(extracted_content=msg, include_in_memory=True)
 
+		@self.registry.action(
+			'Fill several form fields at once, more efficient than one input_text per field. For checkboxes and radio buttons use "true" or "false", for dropdowns the option text',
+			param_model=FillFormAction,
+		)
+		async def fill_form(params: FillFormAction, browser_session: BrowserSession, has_sensitive_data: bool = False):
+			if not params.fields:
+				return ActionResult(error='No fields to fill')
+			selector_map = await browser_session.get_selector_map()
+
+			errors: dict[int, str] = {}
+			fields = []
+			for field in params.fields:
+				if field.index in selector_map:
+					fields.append((selector_map[field.index], field.value))
+				else:
+					errors[field.index] = 'element does not exist'
+			if fields:
+				for (element_node, _), error in zip(fields, await browser_session._fill_element_nodes(fields)):
+					if error:
+						errors[element_node.highlight_index] = error  # type: ignore
+
+			lines = []
+			for field in params.fields:
+				if field.index in errors:
+					lines.append(f'❌  Failed to fill index {field.index}: {errors[field.index]}')
+				elif has_sensitive_data:
+					lines.append(f'⌨️  Input sensitive data into index {field.index}')
+				else:
+					lines.append(f'⌨️  Input {field.value} into index {field.index}')
+			msg = '\n'.join(lines)
+			logger.info(msg)
+			if len(errors) == len(params.fields):
+				return ActionResult(error=msg, include_in_memory=True)
+			return ActionResult(extracted_content=msg, include_in_memory=True)
+
 		# Save PDF
 		@self.registry.action(
 			'Save the current page as a PDF file',
@@ -225,6 +261,7 @@ class Controller(Generic[Context]):
 		# Content Actions
 		@self.registry.action(
 			'Extract page content to retrieve specific information from the page, e.g. all company names, a specific description, all information about, links with companies in structured format or simply links',
+			read_only=True,
 		)
 		async def extract_content(
 			goal: str, should_strip_link_urls: bool, browser_session: BrowserSession, page_extraction_llm: BaseChatModel
@@ -369,6 +406,7 @@ class Controller(Generic[Context]):
 
 		@self.registry.action(
 			description='Get all options from a native dropdown',
+			read_only=True,
 		)
 		async def get_dropdown_options(index: int, browser_session: BrowserSession) -> ActionResult:
 			"""Get all options from a native dropdown"""
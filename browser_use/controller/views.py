@@ -21,6 +21,15 @@ class InputTextAction(BaseModel):
 	xpath: str | None = None
 
 
+class FormField(BaseModel):
+	index: int
+	value: str
+
+
+class FillFormAction(BaseModel):
+	fields: list[FormField]
+
+
 class DoneAction(BaseModel):
 	text: str
 	success: bool
@@ -4,10 +4,29 @@
     focusHighlightIndex: -1,
     viewportExpansion: 0,
     debugMode: false,
+    trackMutations: false,
+    deltaFromSnapshot: null,
+    wireFormat: "json",
+    viewportScoped: false,
+    highlightIndexBase: 0,
+    xpathOfElement: null,
+    stampElementIds: false,
   }
 ) => {
-  const { doHighlightElements, focusHighlightIndex, viewportExpansion, debugMode } = args;
-  let highlightIndex = 0; // Reset highlight index
+  const {
+    doHighlightElements,
+    focusHighlightIndex,
+    viewportExpansion,
+    debugMode,
+    trackMutations = false,
+    deltaFromSnapshot = null,
+    wireFormat = "json",
+    viewportScoped = false,
+    highlightIndexBase = 0,
+    xpathOfElement = null,
+    stampElementIds = false,
+  } = args;
+  let highlightIndex = highlightIndexBase; // Reset highlight index (frames extracted separately get their own block)
 
   // Add timing stack to handle recursion
   const TIMING_STACK = {
@@ -217,6 +236,36 @@
   // Add a WeakMap cache for XPath strings
   const xpathCache = new WeakMap();
 
+  // Mutation-tracked snapshots (trackMutations): the snapshot state is kept on window
+  // between calls, so a later call can re-walk only the subtrees that changed.
+  const SNAPSHOT_STATE_KEY = "_browserUseDomSnapshot";
+  const MAX_DIRTY_NODES = 2000;
+  const MAX_DELTA_ROOTS = 100;
+  const IGNORED_MUTATION_ATTRIBUTES = new Set(["browser-user-highlight-id", "data-browser-use-id"]);
+  const LAYOUT_AFFECTING_RESOURCES = new Set(["IMG", "IFRAME", "VIDEO", "EMBED", "OBJECT"]);
+  const MUTATION_OBSERVER_OPTIONS = { subtree: true, childList: true, attributes: true, characterData: true };
+  let SNAPSHOT = null; // snapshot state built or patched by this call
+  let IS_DELTA = false;
+  const ASSIGNED_HIGHLIGHTS = new Set();
+
+  // The highlighted elements of the last call are kept on window by their index, so an action can
+  // get hold of an element in a single evaluate (see RESOLVE_ELEMENT_BY_INDEX_JS in session.py).
+  // With stampElementIds they also carry their index in an attribute, to be found by a plain query.
+  const ELEMENTS_BY_INDEX_KEY = "_browserUseElementsByIndex";
+  const STAMP_ATTRIBUTE = "data-browser-use-id";
+  const STAMPED_ELEMENTS_KEY = "_browserUseStampedElements";
+  const ASSIGNED_ELEMENTS = new Map(); // highlight index -> element, of this call's walk
+
+  // Viewport-scoped walks (viewportScoped): whole branches that are off-screen and contain nothing
+  // painted in the viewport are skipped, instead of visiting every node to decide
+  const VIEWPORT_SAMPLE_SPACING = 32; // px between the points sampled with elementsFromPoint
+  let VIEWPORT_SCOPE = null; // elements painted at the sampled points, and their ancestors
+
+  // Packed wire format (wireFormat: "packed"), node flags must match PACKED_* in dom/service.py
+  const PACKED_FLAGS = { isVisible: 1, isInteractive: 2, isTopElement: 4, isInViewport: 8, shadowRoot: 16 };
+  const PACKED_TEXT_NODE = 32;
+  const PACKED_RELATIVE_XPATH = 64;
+
   // Initialize once and reuse
   const viewportObserver = new IntersectionObserver(
     (entries) => {
@@ -227,23 +276,124 @@
     { rootMargin: `${viewportExpansion}px` }
   );
 
+  const HIGHLIGHT_COLORS = [
+    "#FF0000",
+    "#00FF00",
+    "#0000FF",
+    "#FFA500",
+    "#800080",
+    "#008080",
+    "#FF69B4",
+    "#4B0082",
+    "#FF4500",
+    "#2E8B57",
+    "#DC143C",
+    "#4682B4",
+  ];
+  const HIGHLIGHT_LABEL_WIDTH = 20;
+  const HIGHLIGHT_LABEL_HEIGHT = 16;
+  const PENDING_HIGHLIGHTS = []; // drawn by flushHighlights once the walk is done
+
   /**
-   * Highlights an element in the DOM and returns the index of the next element.
+   * Queues an element to be highlighted.
+   *
+   * Overlays are only inserted by flushHighlights after the walk, so the layout reads of the
+   * walk are not interleaved with DOM writes that invalidate the layout.
    */
   function highlightElement(element, index, parentIframe = null) {
-    pushTiming('highlighting');
-    
-    if (!element) return index;
+    if (element) PENDING_HIGHLIGHTS.push({ element, index, parentIframe });
+  }
+
+  /**
+   * Reads the client rects of a highlighted element and the offset of its iframe.
+   * The cached rects of the walk are used unless fresh ones are asked for.
+   */
+  function measureHighlight({ element, parentIframe }, fresh = false) {
+    const offset = { x: 0, y: 0 };
+    if (parentIframe) {
+      const iframeRect = fresh ? parentIframe.getBoundingClientRect() : getCachedBoundingRect(parentIframe);
+      offset.x = iframeRect.left;
+      offset.y = iframeRect.top;
+    }
+    const rects = fresh ? element.getClientRects() : getCachedClientRects(element);
+    return { rects: rects || [], offset };
+  }
+
+  /**
+   * Positions the overlays and the label of a highlight from a measurement, without reading layout.
+   */
+  function positionHighlight(highlight, { rects, offset }, viewport) {
+    highlight.overlays.forEach((overlay, i) => {
+      const rect = rects[i];
+      if (!rect || rect.width === 0 || rect.height === 0) {
+        overlay.style.display = "none";
+        return;
+      }
+      overlay.style.display = "block";
+      overlay.style.top = `${rect.top + offset.y}px`;
+      overlay.style.left = `${rect.left + offset.x}px`;
+      overlay.style.width = `${rect.width}px`;
+      overlay.style.height = `${rect.height}px`;
+    });
 
-    // Store overlays and the single label for updating
-    const overlays = [];
-    let label = null;
-    let labelWidth = 20;
-    let labelHeight = 16;
-    let cleanupFn = null;
+    const { label } = highlight;
+    if (rects.length === 0) {
+      // Hide label if element has no rects anymore
+      label.style.display = "none";
+      return;
+    }
+
+    // Position a single label relative to the first rect
+    const firstRect = rects[0];
+    const firstRectTop = firstRect.top + offset.y;
+    const firstRectLeft = firstRect.left + offset.x;
+
+    let labelTop = firstRectTop + 2;
+    let labelLeft = firstRectLeft + firstRect.width - HIGHLIGHT_LABEL_WIDTH - 2;
+
+    // Adjust label position if first rect is too small
+    if (firstRect.width < HIGHLIGHT_LABEL_WIDTH + 4 || firstRect.height < HIGHLIGHT_LABEL_HEIGHT + 4) {
+      labelTop = firstRectTop - HIGHLIGHT_LABEL_HEIGHT - 2;
+      labelLeft = firstRectLeft + firstRect.width - HIGHLIGHT_LABEL_WIDTH; // Align with right edge
+      if (labelLeft < offset.x) labelLeft = firstRectLeft; // Prevent going off-left
+    }
+
+    // Ensure label stays within viewport bounds
+    labelTop = Math.max(0, Math.min(labelTop, viewport.height - HIGHLIGHT_LABEL_HEIGHT));
+    labelLeft = Math.max(0, Math.min(labelLeft, viewport.width - HIGHLIGHT_LABEL_WIDTH));
+
+    label.style.top = `${labelTop}px`;
+    label.style.left = `${labelLeft}px`;
+    label.style.display = "block";
+  }
+
+  function throttleFunction(func, delay) {
+    let lastCall = 0;
+    return (...args) => {
+      const now = performance.now();
+      if (now - lastCall < delay) return;
+      lastCall = now;
+      return func(...args);
+    };
+  }
+
+  /**
+   * Draws the queued highlights in two phases: all elements are measured first, then all
+   * overlays are created and inserted in one operation. A single scroll/resize listener
+   * repositions them the same way, so scrolling does not force a layout per highlight.
+   */
+  function flushHighlights() {
+    if (PENDING_HIGHLIGHTS.length === 0) return;
+    pushTiming('highlighting');
 
     try {
-      // Create or get highlight container
+      const pending = PENDING_HIGHLIGHTS.splice(0);
+
+      // Read phase, nothing was written since the walk so the cached rects are still valid
+      const measurements = pending.map(entry => measureHighlight(entry));
+      const viewport = { width: window.innerWidth, height: window.innerHeight };
+
+      // Write phase
       let container = document.getElementById(HIGHLIGHT_CONTAINER_ID);
       if (!container) {
         container = document.createElement("div");
@@ -259,200 +409,68 @@
         document.body.appendChild(container);
       }
 
-      // Get element client rects
-      const rects = element.getClientRects(); // Use getClientRects()
-
-      if (!rects || rects.length === 0) return index; // Exit if no rects
-
-      // Generate a color based on the index
-      const colors = [
-        "#FF0000",
-        "#00FF00",
-        "#0000FF",
-        "#FFA500",
-        "#800080",
-        "#008080",
-        "#FF69B4",
-        "#4B0082",
-        "#FF4500",
-        "#2E8B57",
-        "#DC143C",
-        "#4682B4",
-      ];
-      const colorIndex = index % colors.length;
-      const baseColor = colors[colorIndex];
-      const backgroundColor = baseColor + "1A"; // 10% opacity version of the color
-
-      // Get iframe offset if necessary
-      let iframeOffset = { x: 0, y: 0 };
-      if (parentIframe) {
-        const iframeRect = parentIframe.getBoundingClientRect(); // Keep getBoundingClientRect for iframe offset
-        iframeOffset.x = iframeRect.left;
-        iframeOffset.y = iframeRect.top;
-      }
-
-      // Create fragment to hold overlay elements
       const fragment = document.createDocumentFragment();
-
-      // Create highlight overlays for each client rect
-      for (const rect of rects) {
-        if (rect.width === 0 || rect.height === 0) continue; // Skip empty rects
-
-        const overlay = document.createElement("div");
-        overlay.style.position = "fixed";
-        overlay.style.border = `2px solid ${baseColor}`;
-        overlay.style.backgroundColor = backgroundColor;
-        overlay.style.pointerEvents = "none";
-        overlay.style.boxSizing = "border-box";
-
-        const top = rect.top + iframeOffset.y;
-        const left = rect.left + iframeOffset.x;
-
-        overlay.style.top = `${top}px`;
-        overlay.style.left = `${left}px`;
-        overlay.style.width = `${rect.width}px`;
-        overlay.style.height = `${rect.height}px`;
-
-        fragment.appendChild(overlay);
-        overlays.push({ element: overlay, initialRect: rect }); // Store overlay and its rect
-      }
-
-      // Create and position a single label relative to the first rect
-      const firstRect = rects[0];
-      label = document.createElement("div");
-      label.className = "playwright-highlight-label";
-      label.style.position = "fixed";
-      label.style.background = baseColor;
-      label.style.color = "white";
-      label.style.padding = "1px 4px";
-      label.style.borderRadius = "4px";
-      label.style.fontSize = `${Math.min(12, Math.max(8, firstRect.height / 2))}px`;
-      label.textContent = index;
-
-      labelWidth = label.offsetWidth > 0 ? label.offsetWidth : labelWidth; // Update actual width if possible
-      labelHeight = label.offsetHeight > 0 ? label.offsetHeight : labelHeight; // Update actual height if possible
-
-      const firstRectTop = firstRect.top + iframeOffset.y;
-      const firstRectLeft = firstRect.left + iframeOffset.x;
-
-      let labelTop = firstRectTop + 2;
-      let labelLeft = firstRectLeft + firstRect.width - labelWidth - 2;
-
-      // Adjust label position if first rect is too small
-      if (firstRect.width < labelWidth + 4 || firstRect.height < labelHeight + 4) {
-        labelTop = firstRectTop - labelHeight - 2;
-        labelLeft = firstRectLeft + firstRect.width - labelWidth; // Align with right edge
-        if (labelLeft < iframeOffset.x) labelLeft = firstRectLeft; // Prevent going off-left
-      }
-
-      // Ensure label stays within viewport bounds slightly better
-      labelTop = Math.max(0, Math.min(labelTop, window.innerHeight - labelHeight));
-      labelLeft = Math.max(0, Math.min(labelLeft, window.innerWidth - labelWidth));
-
-
-      label.style.top = `${labelTop}px`;
-      label.style.left = `${labelLeft}px`;
-
-      fragment.appendChild(label);
-
-      // Update positions on scroll/resize
-      const updatePositions = () => {
-        const newRects = element.getClientRects(); // Get fresh rects
-        let newIframeOffset = { x: 0, y: 0 };
-
-        if (parentIframe) {
-          const iframeRect = parentIframe.getBoundingClientRect(); // Keep getBoundingClientRect for iframe
-          newIframeOffset.x = iframeRect.left;
-          newIframeOffset.y = iframeRect.top;
-        }
-
-        // Update each overlay
-        overlays.forEach((overlayData, i) => {
-          if (i < newRects.length) { // Check if rect still exists
-            const newRect = newRects[i];
-            const newTop = newRect.top + newIframeOffset.y;
-            const newLeft = newRect.left + newIframeOffset.x;
-
-            overlayData.element.style.top = `${newTop}px`;
-            overlayData.element.style.left = `${newLeft}px`;
-            overlayData.element.style.width = `${newRect.width}px`;
-            overlayData.element.style.height = `${newRect.height}px`;
-            overlayData.element.style.display = (newRect.width === 0 || newRect.height === 0) ? 'none' : 'block';
-          } else {
-            // If fewer rects now, hide extra overlays
-            overlayData.element.style.display = 'none';
-          }
+      const highlights = [];
+      pending.forEach((entry, i) => {
+        const { rects } = measurements[i];
+        if (rects.length === 0) return;
+
+        // Generate a color based on the index
+        const baseColor = HIGHLIGHT_COLORS[entry.index % HIGHLIGHT_COLORS.length];
+        const backgroundColor = baseColor + "1A"; // 10% opacity version of the color
+
+        // One overlay per client rect
+        const overlays = Array.from(rects, () => {
+          const overlay = document.createElement("div");
+          overlay.style.position = "fixed";
+          overlay.style.border = `2px solid ${baseColor}`;
+          overlay.style.backgroundColor = backgroundColor;
+          overlay.style.pointerEvents = "none";
+          overlay.style.boxSizing = "border-box";
+          fragment.appendChild(overlay);
+          return overlay;
         });
 
-        // If there are fewer new rects than overlays, hide the extras
-        if (newRects.length < overlays.length) {
-          for (let i = newRects.length; i < overlays.length; i++) {
-            overlays[i].element.style.display = 'none';
-          }
-        }
-
-        // Update label position based on the first new rect
-        if (label && newRects.length > 0) {
-          const firstNewRect = newRects[0];
-          const firstNewRectTop = firstNewRect.top + newIframeOffset.y;
-          const firstNewRectLeft = firstNewRect.left + newIframeOffset.x;
-
-          let newLabelTop = firstNewRectTop + 2;
-          let newLabelLeft = firstNewRectLeft + firstNewRect.width - labelWidth - 2;
-
-          if (firstNewRect.width < labelWidth + 4 || firstNewRect.height < labelHeight + 4) {
-            newLabelTop = firstNewRectTop - labelHeight - 2;
-            newLabelLeft = firstNewRectLeft + firstNewRect.width - labelWidth;
-            if (newLabelLeft < newIframeOffset.x) newLabelLeft = firstNewRectLeft;
-          }
-
-          // Ensure label stays within viewport bounds
-          newLabelTop = Math.max(0, Math.min(newLabelTop, window.innerHeight - labelHeight));
-          newLabelLeft = Math.max(0, Math.min(newLabelLeft, window.innerWidth - labelWidth));
+        const label = document.createElement("div");
+        label.className = "playwright-highlight-label";
+        label.style.position = "fixed";
+        label.style.background = baseColor;
+        label.style.color = "white";
+        label.style.padding = "1px 4px";
+        label.style.borderRadius = "4px";
+        label.style.fontSize = `${Math.min(12, Math.max(8, rects[0].height / 2))}px`;
+        label.textContent = entry.index;
+        fragment.appendChild(label);
+
+        const highlight = { ...entry, overlays, label };
+        positionHighlight(highlight, measurements[i], viewport);
+        highlights.push(highlight);
+      });
 
-          label.style.top = `${newLabelTop}px`;
-          label.style.left = `${newLabelLeft}px`;
-          label.style.display = 'block';
-        } else if (label) {
-          // Hide label if element has no rects anymore
-          label.style.display = 'none';
-        }
-      };
+      // Then add fragment to container in one operation
+      container.appendChild(fragment);
 
-      const throttleFunction = (func, delay) => {
-        let lastCall = 0;
-        return (...args) => {
-          const now = performance.now();
-          if (now - lastCall < delay) return;
-          lastCall = now;
-          return func(...args);
-        };
+      // Update positions on scroll/resize, again measuring every element before writing
+      const updatePositions = () => {
+        const freshMeasurements = highlights.map(highlight => measureHighlight(highlight, true));
+        const freshViewport = { width: window.innerWidth, height: window.innerHeight };
+        highlights.forEach((highlight, i) => positionHighlight(highlight, freshMeasurements[i], freshViewport));
       };
-
       const throttledUpdatePositions = throttleFunction(updatePositions, 16); // ~60fps
       window.addEventListener('scroll', throttledUpdatePositions, true);
       window.addEventListener('resize', throttledUpdatePositions);
-      
-      // Add cleanup function
-      cleanupFn = () => {
+
+      // Keep a reference to cleanup functions in a global array
+      (window._highlightCleanupFunctions = window._highlightCleanupFunctions || []).push(() => {
         window.removeEventListener('scroll', throttledUpdatePositions, true);
         window.removeEventListener('resize', throttledUpdatePositions);
-        // Remove overlay elements if needed
-        overlays.forEach(overlay => overlay.element.remove());
-        if (label) label.remove();
-      };
-      
-      // Then add fragment to container in one operation
-      container.appendChild(fragment);
-      
-      return index + 1;
+        highlights.forEach(({ overlays, label }) => {
+          overlays.forEach(overlay => overlay.remove());
+          label.remove();
+        });
+      });
     } finally {
       popTiming('highlighting');
-      // Store cleanup function for later use
-      if (cleanupFn) {
-        // Keep a reference to cleanup functions in a global array
-        (window._highlightCleanupFunctions = window._highlightCleanupFunctions || []).push(cleanupFn);
-      }
     }
   }
 
@@ -979,6 +997,55 @@
     return false; // No rects were found in the viewport
   }
 
+  /**
+   * Collects the elements painted anywhere on a grid of points over the viewport, and all of
+   * their ancestors. These are the branches of the document that show up in the viewport.
+   */
+  function collectViewportScope() {
+    const scope = new Set();
+    const width = window.innerWidth;
+    const height = window.innerHeight;
+    for (let x = VIEWPORT_SAMPLE_SPACING / 2; x < width; x += VIEWPORT_SAMPLE_SPACING) {
+      for (let y = VIEWPORT_SAMPLE_SPACING / 2; y < height; y += VIEWPORT_SAMPLE_SPACING) {
+        for (const element of document.elementsFromPoint(x, y)) {
+          let current = element;
+          while (current && !scope.has(current)) {
+            scope.add(current);
+            current = current.parentElement;
+          }
+        }
+      }
+    }
+    return scope;
+  }
+
+  /**
+   * Whether the whole branch of an element of the top document can be skipped in viewport-scoped
+   * walks: the element lies outside the expanded viewport, is not fixed or sticky, and nothing
+   * inside it was painted at the sampled viewport points (fixed, sticky or positioned descendants included).
+   */
+  function isOffscreenBranch(element) {
+    if (viewportExpansion === -1) return false;
+    if (!VIEWPORT_SCOPE) VIEWPORT_SCOPE = collectViewportScope();
+    if (VIEWPORT_SCOPE.has(element)) return false;
+
+    const rect = getCachedBoundingRect(element);
+    if (!rect || !(
+      rect.bottom < -viewportExpansion ||
+      rect.top > window.innerHeight + viewportExpansion ||
+      rect.right < -viewportExpansion ||
+      rect.left > window.innerWidth + viewportExpansion
+    )) {
+      return false;
+    }
+
+    const style = getCachedComputedStyle(element);
+    if (style && (style.position === 'fixed' || style.position === 'sticky')) return false;
+
+    // elementsFromPoint doesn't see into shadow roots and frames, so only skip light DOM branches of the page
+    return element.getRootNode() === document;
+  }
+
   // Add this new helper function
   function getEffectiveScroll(element) {
     let currentEl = element;
@@ -1177,7 +1244,7 @@
       // When viewportExpansion is -1, all interactive elements should get a highlight index
       // regardless of viewport status
       if (nodeData.isInViewport || viewportExpansion === -1) {
-        nodeData.highlightIndex = highlightIndex++;
+        nodeData.highlightIndex = assignHighlightIndex(node, parentIframe);
 
         if (doHighlightElements) {
           if (focusHighlightIndex >= 0) {
@@ -1197,10 +1264,75 @@
     return false; // Did not highlight
   }
 
+  /**
+   * Returns the highlight index for an element, keeping the index it had in the
+   * snapshot being patched so unchanged elements keep stable indexes.
+   */
+  function assignHighlightIndex(node, parentIframe) {
+    let index;
+    if (IS_DELTA && isSnapshotHighlighted(SNAPSHOT, node)) {
+      index = SNAPSHOT.highlightIndexes.get(node);
+    } else {
+      index = highlightIndex++;
+    }
+
+    if (SNAPSHOT) {
+      SNAPSHOT.highlightIndexes.set(node, index);
+      SNAPSHOT.highlighted.set(index, { element: node, parentIframe });
+      ASSIGNED_HIGHLIGHTS.add(index);
+    } else {
+      ASSIGNED_ELEMENTS.set(index, node);
+    }
+    return index;
+  }
+
+  /**
+   * Returns the highlighted elements of the tree by their index.
+   */
+  function getHighlightedElements() {
+    if (!SNAPSHOT) return ASSIGNED_ELEMENTS;
+    // A patched snapshot also keeps the indexes of the elements that were not re-walked
+    const elements = new Map();
+    for (const [index, { element }] of SNAPSHOT.highlighted) elements.set(index, element);
+    return elements;
+  }
+
+  /**
+   * Stamps the highlighted elements of the tree with their index, and removes the stamps
+   * of the previous call from elements that are no longer highlighted.
+   */
+  function stampElements(elements) {
+    const stamped = new Set(elements.values());
+    for (const element of window[STAMPED_ELEMENTS_KEY] || []) {
+      if (!stamped.has(element)) element.removeAttribute(STAMP_ATTRIBUTE);
+    }
+    for (const [index, element] of elements) {
+      const value = String(index);
+      if (element.getAttribute(STAMP_ATTRIBUTE) !== value) element.setAttribute(STAMP_ATTRIBUTE, value);
+    }
+    window[STAMPED_ELEMENTS_KEY] = stamped;
+  }
+
+  /**
+   * Checks if an element is a rich text editor whose child nodes are all walked.
+   */
+  function isRichTextContainer(node) {
+    return (
+      node.isContentEditable ||
+      node.getAttribute("contenteditable") === "true" ||
+      node.id === "tinymce" ||
+      node.classList.contains("mce-content-body") ||
+      (node.tagName.toLowerCase() === "body" && node.getAttribute("data-id")?.startsWith("mce_"))
+    );
+  }
+
   /**
    * Creates a node data object for a given node and its descendants.
    */
   function buildDomTree(node, parentIframe = null, isParentHighlighted = false) {
+    // Drop any id from a previous snapshot, it is set again if the node is still emitted
+    if (SNAPSHOT && node) SNAPSHOT.nodeIds.delete(node);
+
     // Fast rejection checks first
     if (!node || node.id === HIGHLIGHT_CONTAINER_ID || 
         (node.nodeType !== Node.ELEMENT_NODE && node.nodeType !== Node.TEXT_NODE)) {
@@ -1232,6 +1364,7 @@
 
       const id = `${ID.current++}`;
       DOM_HASH_MAP[id] = nodeData;
+      if (SNAPSHOT) SNAPSHOT.nodeIds.set(node, id);
       if (debugMode) PERF_METRICS.nodeMetrics.processedNodes++;
       return id;
     }
@@ -1298,6 +1431,11 @@
       }
     }
 
+    if (viewportScoped && isOffscreenBranch(node)) {
+      if (debugMode) PERF_METRICS.nodeMetrics.skippedNodes++;
+      return null;
+    }
+
     // Process element node
     const nodeData = {
       tagName: node.tagName.toLowerCase(),
@@ -1310,6 +1448,8 @@
     if (isInteractiveCandidate(node) || node.tagName.toLowerCase() === 'iframe' || node.tagName.toLowerCase() === 'body') {
       const attributeNames = node.getAttributeNames?.() || [];
       for (const name of attributeNames) {
+        // the stamp of the previous walk is not an attribute of the page
+        if (name === STAMP_ATTRIBUTE) continue;
         nodeData.attributes[name] = node.getAttribute(name);
       }
     }
@@ -1337,6 +1477,7 @@
         try {
           const iframeDoc = node.contentDocument || node.contentWindow?.document;
           if (iframeDoc) {
+            if (SNAPSHOT) SNAPSHOT.observe(iframeDoc);
             for (const child of iframeDoc.childNodes) {
               const domElement = buildDomTree(child, node, false);
               if (domElement) nodeData.children.push(domElement);
@@ -1347,13 +1488,7 @@
         }
       }
       // Handle rich text editors and contenteditable elements
-      else if (
-        node.isContentEditable ||
-        node.getAttribute("contenteditable") === "true" ||
-        node.id === "tinymce" ||
-        node.classList.contains("mce-content-body") ||
-        (tagName === "body" && node.getAttribute("data-id")?.startsWith("mce_"))
-      ) {
+      else if (isRichTextContainer(node)) {
         // Process all child nodes to capture formatted text
         for (const child of node.childNodes) {
           const domElement = buildDomTree(child, parentIframe, nodeWasHighlighted);
@@ -1364,6 +1499,7 @@
         // Handle shadow DOM
         if (node.shadowRoot) {
           nodeData.shadowRoot = true;
+          if (SNAPSHOT) SNAPSHOT.observe(node.shadowRoot);
           for (const child of node.shadowRoot.childNodes) {
             const domElement = buildDomTree(child, parentIframe, nodeWasHighlighted);
             if (domElement) nodeData.children.push(domElement);
@@ -1387,10 +1523,354 @@
 
     const id = `${ID.current++}`;
     DOM_HASH_MAP[id] = nodeData;
+    if (SNAPSHOT) SNAPSHOT.nodeIds.set(node, id);
     if (debugMode) PERF_METRICS.nodeMetrics.processedNodes++;
     return id;
   }
 
+  function captureViewportState() {
+    return {
+      scrollX: window.scrollX,
+      scrollY: window.scrollY,
+      width: window.innerWidth,
+      height: window.innerHeight,
+      viewportExpansion,
+      doHighlightElements,
+    };
+  }
+
+  function isSameViewportState(a, b) {
+    return Object.keys(a).every(key => a[key] === b[key]);
+  }
+
+  /**
+   * Returns the parent of a node in the walked tree, crossing shadow roots and same-origin iframes.
+   */
+  function getParentAcrossBoundaries(node) {
+    if (node.nodeType === Node.DOCUMENT_FRAGMENT_NODE) return node.host || null;
+    if (node.nodeType === Node.DOCUMENT_NODE) {
+      try {
+        return node.defaultView?.frameElement || null;
+      } catch (e) {
+        return null;
+      }
+    }
+    return node.parentNode;
+  }
+
+  function isWithin(node, root) {
+    for (let current = node; current; current = getParentAcrossBoundaries(current)) {
+      if (current === root) return true;
+    }
+    return false;
+  }
+
+  /**
+   * Checks if a mutation was caused by our own highlight overlays.
+   */
+  function isOwnMutation(record) {
+    if (record.type === "attributes" && IGNORED_MUTATION_ATTRIBUTES.has(record.attributeName)) return true;
+
+    if (record.type === "childList") {
+      const changedNodes = [...record.addedNodes, ...record.removedNodes];
+      if (changedNodes.length > 0 && changedNodes.every(changed => changed.id === HIGHLIGHT_CONTAINER_ID)) {
+        return true;
+      }
+    }
+
+    for (let current = record.target; current; current = current.parentNode) {
+      if (current.id === HIGHLIGHT_CONTAINER_ID) return true;
+    }
+    return false;
+  }
+
+  /**
+   * Creates the snapshot state and starts recording mutations, scrolls and layout changes.
+   */
+  function createSnapshotState() {
+    const state = {
+      id: `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`,
+      rootId: null,
+      nextId: 0,
+      nextHighlightIndex: 0,
+      nodeIds: new WeakMap(), // emitted element -> node id in the map
+      highlightIndexes: new WeakMap(), // element -> highlight index
+      highlighted: new Map(), // highlight index -> { element, parentIframe }
+      dirty: new Set(),
+      overflow: false, // set when the changes can't be expressed as subtree re-walks
+      viewport: captureViewportState(),
+      observedRoots: new WeakSet(),
+    };
+
+    const markDirty = (node) => {
+      if (state.overflow || !node) return;
+      state.dirty.add(node);
+      if (state.dirty.size > MAX_DIRTY_NODES) {
+        state.overflow = true;
+        state.dirty.clear();
+      }
+    };
+
+    state.record = (records) => {
+      for (const record of records) {
+        if (isOwnMutation(record)) continue;
+        const target = record.target.nodeType === Node.TEXT_NODE ? record.target.parentNode : record.target;
+        markDirty(target);
+        // Added elements are checked for overlay positioning before patching
+        for (const added of record.addedNodes) {
+          if (added.nodeType === Node.ELEMENT_NODE) markDirty(added);
+        }
+      }
+    };
+
+    const observer = new MutationObserver(state.record);
+    state.observer = observer;
+    state.observe = (root) => {
+      if (state.observedRoots.has(root)) return;
+      state.observedRoots.add(root);
+      observer.observe(root, MUTATION_OBSERVER_OPTIONS);
+    };
+
+    // Scrolling a container moves its subtree without any mutation, and resizes or
+    // late-loading resources can shift layout outside of the mutated subtrees
+    const onScroll = (event) => {
+      if (event.target === document || event.target === window) {
+        state.overflow = true;
+      } else {
+        markDirty(event.target);
+      }
+    };
+    const onLayoutChange = () => {
+      state.overflow = true;
+    };
+    const onResourceLoad = (event) => {
+      if (LAYOUT_AFFECTING_RESOURCES.has(event.target?.tagName)) state.overflow = true;
+    };
+    window.addEventListener("scroll", onScroll, { capture: true, passive: true });
+    window.addEventListener("resize", onLayoutChange);
+    document.addEventListener("load", onResourceLoad, true);
+
+    state.disconnect = () => {
+      observer.disconnect();
+      window.removeEventListener("scroll", onScroll, { capture: true });
+      window.removeEventListener("resize", onLayoutChange);
+      document.removeEventListener("load", onResourceLoad, true);
+    };
+
+    state.observe(document);
+    return state;
+  }
+
+  function isSnapshotHighlighted(state, element) {
+    const index = state.highlightIndexes.get(element);
+    return index !== undefined && state.highlighted.get(index)?.element === element;
+  }
+
+  /**
+   * Mirrors how buildDomTree() passes isParentHighlighted down to the children of a node.
+   */
+  function getInheritedHighlightStatus(state, element) {
+    if (!doHighlightElements) return false;
+
+    const parentNode = element.parentNode;
+    if (!parentNode || parentNode.nodeType === Node.DOCUMENT_NODE || parentNode === document.body) return false;
+    if (parentNode.nodeType === Node.DOCUMENT_FRAGMENT_NODE) {
+      return parentNode.host ? isSnapshotHighlighted(state, parentNode.host) : false;
+    }
+    if (parentNode.nodeType !== Node.ELEMENT_NODE) return false;
+    if (isRichTextContainer(parentNode)) return isSnapshotHighlighted(state, parentNode);
+    return isSnapshotHighlighted(state, parentNode) || getInheritedHighlightStatus(state, parentNode);
+  }
+
+  /**
+   * Returns the topmost emitted elements containing all recorded changes, or null
+   * when the changes require a full walk.
+   */
+  function collectDirtyRoots(state) {
+    state.record(state.observer.takeRecords());
+    if (state.overflow || !isSameViewportState(state.viewport, captureViewportState())) return null;
+
+    const roots = new Set();
+    for (const node of state.dirty) {
+      // Elements that appear or change as overlays can cover content anywhere on the page
+      if (node.nodeType === Node.ELEMENT_NODE && node.isConnected) {
+        const position = getCachedComputedStyle(node)?.position;
+        if (position === "fixed" || position === "sticky" || position === "absolute") return null;
+      }
+
+      let current = node;
+      while (current && !state.nodeIds.has(current)) {
+        current = getParentAcrossBoundaries(current);
+      }
+      if (!current) {
+        // Outside of the walked tree (e.g. <head>), except for the document element
+        // whose attributes can affect the whole page
+        if (node === document.documentElement) return null;
+        continue;
+      }
+      if (state.nodeIds.get(current) === state.rootId) return null;
+      if (!current.isConnected) continue; // its removal is recorded on a connected ancestor
+
+      roots.add(current);
+    }
+
+    const topmostRoots = [...roots].filter(root => {
+      for (let current = getParentAcrossBoundaries(root); current; current = getParentAcrossBoundaries(current)) {
+        if (roots.has(current)) return false;
+      }
+      return true;
+    });
+    return topmostRoots.length > MAX_DELTA_ROOTS ? null : topmostRoots;
+  }
+
+  /**
+   * Redraws the highlights of snapshot elements that were not re-walked by this call.
+   */
+  function redrawSnapshotHighlights(state) {
+    if (!doHighlightElements) return;
+    for (const [index, { element, parentIframe }] of state.highlighted) {
+      if (ASSIGNED_HIGHLIGHTS.has(index)) continue;
+      if (focusHighlightIndex >= 0 && focusHighlightIndex !== index) continue;
+      highlightElement(element, index, parentIframe);
+    }
+  }
+
+  function buildFullSnapshot(previous) {
+    if (previous) previous.disconnect?.();
+
+    SNAPSHOT = createSnapshotState();
+    window[SNAPSHOT_STATE_KEY] = SNAPSHOT;
+
+    const rootId = buildDomTree(document.body);
+    SNAPSHOT.rootId = rootId;
+    SNAPSHOT.nextId = ID.current;
+    SNAPSHOT.nextHighlightIndex = highlightIndex;
+    return { rootId, map: DOM_HASH_MAP, snapshotId: SNAPSHOT.id };
+  }
+
+  /**
+   * Re-walks only the changed subtrees. Each patch replaces the node with id replaceId
+   * in the previous tree by the subtree rooted at rootId (null when it is gone).
+   */
+  function buildSnapshotDelta(state, dirtyRoots) {
+    SNAPSHOT = state;
+    IS_DELTA = true;
+    ID.current = state.nextId;
+    highlightIndex = state.nextHighlightIndex;
+
+    const patches = [];
+    for (const root of dirtyRoots) {
+      const replaceId = state.nodeIds.get(root);
+      const ownerWindow = root.ownerDocument.defaultView;
+      const parentIframe = root.ownerDocument === document ? null : ownerWindow?.frameElement || null;
+      const rootId = buildDomTree(root, parentIframe, getInheritedHighlightStatus(state, root));
+      patches.push({ replaceId, rootId });
+    }
+
+    // Forget the indexes of elements that were removed or are no longer highlighted
+    for (const [index, { element }] of state.highlighted) {
+      if (ASSIGNED_HIGHLIGHTS.has(index)) continue;
+      if (!element.isConnected || dirtyRoots.some(root => isWithin(element, root))) {
+        state.highlighted.delete(index);
+      }
+    }
+    redrawSnapshotHighlights(state);
+
+    state.dirty.clear();
+    state.nextId = ID.current;
+    state.nextHighlightIndex = highlightIndex;
+
+    if (patches.length === 0) {
+      return { snapshotId: state.id, unchanged: true };
+    }
+    return { snapshotId: state.id, patches, map: DOM_HASH_MAP };
+  }
+
+  function buildTrackedSnapshot() {
+    const previous = window[SNAPSHOT_STATE_KEY];
+    // Highlights of unchanged elements are redrawn, so start from a clean overlay
+    if (doHighlightElements) cleanupHighlights();
+
+    if (deltaFromSnapshot && previous && previous.id === deltaFromSnapshot) {
+      const dirtyRoots = collectDirtyRoots(previous);
+      if (dirtyRoots) return buildSnapshotDelta(previous, dirtyRoots);
+    }
+    return buildFullSnapshot(previous);
+  }
+
+  /**
+   * Packs a node map into parallel arrays, sent as a single JSON string.
+   *
+   * Node i of the arrays has id base + i, parents[i] is the array index of its parent (-1 for roots).
+   * Tags, texts, xpaths and attribute names and values are interned in the strings table, and
+   * xpaths that extend the xpath of their parent only store the remaining steps.
+   * Attributes and highlight indexes are sparse: flat (node, name, value) and (node, index) tuples.
+   * Returns null when the ids are not consecutive, the map is then sent unpacked.
+   */
+  function packNodeMap(map) {
+    const ids = Object.keys(map);
+    const count = ids.length;
+    const base = count ? Number(ids[0]) : 0;
+
+    const strings = [];
+    const stringIndexes = new Map();
+    const intern = (value) => {
+      let index = stringIndexes.get(value);
+      if (index === undefined) {
+        index = strings.length;
+        strings.push(value);
+        stringIndexes.set(value, index);
+      }
+      return index;
+    };
+
+    const parents = new Array(count).fill(-1);
+    for (let i = 0; i < count; i++) {
+      if (Number(ids[i]) !== base + i) return null;
+      for (const childId of map[ids[i]].children || []) {
+        parents[childId - base] = i;
+      }
+    }
+
+    const flags = new Array(count);
+    const tags = new Array(count);
+    const values = new Array(count);
+    const attributes = [];
+    const highlights = [];
+    for (let i = 0; i < count; i++) {
+      const nodeData = map[ids[i]];
+      if (nodeData.type === "TEXT_NODE") {
+        flags[i] = PACKED_TEXT_NODE | (nodeData.isVisible ? PACKED_FLAGS.isVisible : 0);
+        tags[i] = -1;
+        values[i] = intern(nodeData.text);
+        continue;
+      }
+
+      let nodeFlags = 0;
+      for (const key in PACKED_FLAGS) {
+        if (nodeData[key]) nodeFlags |= PACKED_FLAGS[key];
+      }
+      const parentXpath = parents[i] >= 0 ? map[ids[parents[i]]].xpath : null;
+      if (parentXpath && nodeData.xpath.startsWith(`${parentXpath}/`)) {
+        nodeFlags |= PACKED_RELATIVE_XPATH;
+        values[i] = intern(nodeData.xpath.slice(parentXpath.length + 1));
+      } else {
+        values[i] = intern(nodeData.xpath);
+      }
+      flags[i] = nodeFlags;
+      tags[i] = intern(nodeData.tagName);
+
+      for (const name in nodeData.attributes) {
+        attributes.push(i, intern(name), intern(nodeData.attributes[name]));
+      }
+      if (nodeData.highlightIndex !== undefined && nodeData.highlightIndex !== null) {
+        highlights.push(i, nodeData.highlightIndex);
+      }
+    }
+
+    return JSON.stringify({ base, strings, flags, tags, values, parents, attributes, highlights });
+  }
+
   // After all functions are defined, wrap them with performance measurement
   // Remove buildDomTree from here as we measure it separately
   highlightElement = measureTime(highlightElement);
@@ -1401,7 +1881,31 @@
   isTextNodeVisible = measureTime(isTextNodeVisible);
   getEffectiveScroll = measureTime(getEffectiveScroll);
 
-  const rootId = buildDomTree(document.body);
+  // Only look up the xpath of an element (e.g. of the iframe a separately extracted frame is embedded in)
+  if (xpathOfElement) {
+    return getXPathTree(xpathOfElement, true);
+  }
+
+  let result;
+  if (trackMutations) {
+    result = buildTrackedSnapshot();
+  } else {
+    result = { rootId: buildDomTree(document.body), map: DOM_HASH_MAP };
+  }
+
+  // The walk only read the layout, the highlights can now be written in one go
+  flushHighlights();
+  const highlightedElements = getHighlightedElements();
+  window[ELEMENTS_BY_INDEX_KEY] = highlightedElements;
+  if (stampElementIds) stampElements(highlightedElements);
+
+  if (wireFormat === "packed" && result.map) {
+    const packedMap = packNodeMap(result.map);
+    if (packedMap !== null) {
+      const { map, ...rest } = result;
+      result = { ...rest, packedMap };
+    }
+  }
 
   // Clear the cache before starting
   DOM_CACHE.clearCache();
@@ -1456,7 +1960,5 @@
     }
   }
 
-  return debugMode ?
-    { rootId, map: DOM_HASH_MAP, perfMetrics: PERF_METRICS } :
-    { rootId, map: DOM_HASH_MAP };
+  return debugMode ? { ...result, perfMetrics: PERF_METRICS } : result;
 };
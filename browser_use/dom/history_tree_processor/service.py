@@ -3,6 +3,9 @@ import hashlib
 from browser_use.dom.history_tree_processor.view import DOMHistoryElement, HashedDomElement
 from browser_use.dom.views import DOMElementNode
 
+# the hashes only identify elements within a session, a short non-cryptographic-strength digest is plenty
+HASH_DIGEST_SIZE = 16
+
 
 class HistoryTreeProcessor:
 	""" "
@@ -65,8 +68,7 @@ class HistoryTreeProcessor:
 
 	@staticmethod
 	def _hash_dom_element(dom_element: DOMElementNode) -> HashedDomElement:
-		parent_branch_path = HistoryTreeProcessor._get_parent_branch_path(dom_element)
-		branch_path_hash = HistoryTreeProcessor._parent_branch_path_hash(parent_branch_path)
+		branch_path_hash = HistoryTreeProcessor._branch_path_digest(dom_element).hex()
 		attributes_hash = HistoryTreeProcessor._attributes_hash(dom_element.attributes)
 		xpath_hash = HistoryTreeProcessor._xpath_hash(dom_element.xpath)
 		# text_hash = DomTreeProcessor._text_hash(dom_element)
@@ -85,22 +87,53 @@ class HistoryTreeProcessor:
 
 		return [parent.tag_name for parent in parents]
 
+	@staticmethod
+	def _branch_path_digest(dom_element: DOMElementNode) -> bytes:
+		"""
+		Digest of the parent branch path of the element, folded top-down from the digest of its parent.
+
+		The digests are cached on the elements, so hashing every element of a tree is O(n)
+		instead of walking up to the root from each of them.
+		"""
+		# climb up to the nearest element with a cached digest (or the root, which is not part of the path)
+		uncached: list[DOMElementNode] = []
+		current = dom_element
+		while current.parent is not None and current._branch_path_digest is None:
+			uncached.append(current)
+			current = current.parent
+
+		digest = current._branch_path_digest or b''
+		for element in reversed(uncached):
+			digest = HistoryTreeProcessor._fold_branch_path_digest(digest, element.tag_name)
+			element._branch_path_digest = digest
+		return digest
+
+	@staticmethod
+	def _fold_branch_path_digest(parent_digest: bytes, tag_name: str) -> bytes:
+		return hashlib.blake2b(parent_digest + tag_name.encode(), digest_size=HASH_DIGEST_SIZE).digest()
+
 	@staticmethod
 	def _parent_branch_path_hash(parent_branch_path: list[str]) -> str:
-		parent_branch_path_string = '/'.join(parent_branch_path)
-		return hashlib.sha256(parent_branch_path_string.encode()).hexdigest()
+		digest = b''
+		for tag_name in parent_branch_path:
+			digest = HistoryTreeProcessor._fold_branch_path_digest(digest, tag_name)
+		return digest.hex()
 
 	@staticmethod
 	def _attributes_hash(attributes: dict[str, str]) -> str:
 		attributes_string = ''.join(f'{key}={value}' for key, value in attributes.items())
-		return hashlib.sha256(attributes_string.encode()).hexdigest()
+		return HistoryTreeProcessor._hash_string(attributes_string)
 
 	@staticmethod
 	def _xpath_hash(xpath: str) -> str:
-		return hashlib.sha256(xpath.encode()).hexdigest()
+		return HistoryTreeProcessor._hash_string(xpath)
 
 	@staticmethod
 	def _text_hash(dom_element: DOMElementNode) -> str:
 		""" """
 		text_string = dom_element.get_all_text_till_next_clickable_element()
-		return hashlib.sha256(text_string.encode()).hexdigest()
+		return HistoryTreeProcessor._hash_string(text_string)
+
+	@staticmethod
+	def _hash_string(string: str) -> str:
+		return hashlib.blake2b(string.encode(), digest_size=HASH_DIGEST_SIZE).hexdigest()
@@ -1,12 +1,15 @@
+import asyncio
+import hashlib
 import json
 import logging
 from dataclasses import dataclass
+from functools import cache
 from importlib import resources
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Literal
 from urllib.parse import urlparse
 
 if TYPE_CHECKING:
-	from playwright.async_api import Page
+	from playwright.async_api import Frame, Page
 
 from browser_use.dom.views import (
 	DOMBaseNode,
@@ -20,18 +23,91 @@ from browser_use.utils import time_execution_async
 logger = logging.getLogger(__name__)
 
 
+# calls buildDomTree.js installed in the current document, only the args travel over CDP on each step
+CALL_BUILD_DOM_TREE_JS = """({ functionName, args }) => {
+	const buildDomTree = window[functionName];
+	return typeof buildDomTree === 'function' ? buildDomTree(args) : { notInstalled: true };
+}"""
+
+# after this many incremental patches the tree is rebuilt from a full walk, to pick up
+# layout changes (e.g. elements covered or uncovered) that mutations alone don't reveal
+MAX_SNAPSHOT_PATCHES = 20
+
+# cross-origin iframes are extracted separately, the elements of each frame are numbered in a block of its own
+FRAME_HIGHLIGHT_INDEX_STRIDE = 1000
+FRAME_EXTRACTION_TIMEOUT = 5.0  # seconds, frames that take longer are left out of the tree
+
+# attribute buildDomTree.js stamps the highlight index of each element into, must match STAMP_ATTRIBUTE
+ELEMENT_ID_ATTRIBUTE = 'data-browser-use-id'
+
+# invisible cross-origin iframes of these are used for ads and tracking
+AD_NETWORK_DOMAINS = ('doubleclick.net', 'adroll.com', 'googletagmanager.com')
+
+# node flags of the packed wire format, must match PACKED_FLAGS etc. in buildDomTree.js
+PACKED_VISIBLE = 1
+PACKED_INTERACTIVE = 2
+PACKED_TOP_ELEMENT = 4
+PACKED_IN_VIEWPORT = 8
+PACKED_SHADOW_ROOT = 16
+PACKED_TEXT_NODE = 32
+PACKED_RELATIVE_XPATH = 64
+
+
 @dataclass
 class ViewportInfo:
 	width: int
 	height: int
 
 
+@dataclass
+class DOMSnapshot:
+	"""
+	Last DOM tree built with in-page mutation tracking, patched in place by later deltas
+	"""
+
+	snapshot_id: str
+	url: str
+	element_tree: DOMElementNode
+	selector_map: SelectorMap
+	node_map: dict[str, DOMBaseNode]
+	patch_count: int = 0
+
+
+@cache
+def get_build_dom_tree_js() -> str:
+	"""Source of buildDomTree.js, read from the package resources once per process"""
+	return resources.files('browser_use.dom').joinpath('buildDomTree.js').read_text()
+
+
+@cache
+def get_build_dom_tree_function_name() -> str:
+	"""Name of the window function buildDomTree.js is installed as, keyed by a hash of the script version"""
+	version = hashlib.sha256(get_build_dom_tree_js().encode()).hexdigest()[:16]
+	return f'__browserUseBuildDomTree_{version}'
+
+
+@cache
+def get_install_build_dom_tree_js() -> str:
+	return f"""() => {{
+	Object.defineProperty(window, {json.dumps(get_build_dom_tree_function_name())}, {{
+		value: ({get_build_dom_tree_js().strip().removesuffix(';')}),
+		configurable: true,
+	}});
+	return true;
+}}"""
+
+
 class DomService:
 	def __init__(self, page: 'Page'):
 		self.page = page
 		self.xpath_cache = {}
+		self.snapshot: DOMSnapshot | None = None
+
+		self.js_code = get_build_dom_tree_js()
 
-		self.js_code = resources.files('browser_use.dom').joinpath('buildDomTree.js').read_text()
+		# cross-origin frames extracted by the last call, and where their trees were attached
+		self.iframe_frames: list['Frame'] = []
+		self._iframe_subtrees: list[tuple[DOMElementNode, DOMElementNode]] = []
 
 	# region - Clickable elements
 	@time_execution_async('--get_clickable_elements')
@@ -40,8 +116,63 @@ class DomService:
 		highlight_elements: bool = True,
 		focus_element: int = -1,
 		viewport_expansion: int = 0,
+		incremental: bool = False,
+		wire_format: Literal['json', 'packed'] = 'json',
+		viewport_scoped: bool = False,
+		cross_origin_iframes: bool = False,
+		construct_in_thread: bool = False,
+		stamp_element_ids: bool = False,
 	) -> DOMState:
-		element_tree, selector_map = await self._build_dom_tree(highlight_elements, focus_element, viewport_expansion)
+		"""
+		Build the DOM tree and selector map of the page.
+
+		With incremental=True, an in-page MutationObserver records which subtrees changed since the
+		previous call, and only those are re-walked and patched into the previous tree.
+
+		With wire_format='packed', the page sends the node map as parallel arrays in one JSON string
+		instead of one object per node, which is much smaller and faster to decode on large pages.
+
+		With viewport_scoped=True, branches outside the expanded viewport that contain nothing painted
+		in the viewport are skipped as a whole, instead of walking all their nodes to find that out.
+
+		With cross_origin_iframes=True, visible cross-origin iframes (which the in-page walk can't enter)
+		are extracted concurrently and their trees attached under their iframe elements. The elements of
+		each frame are numbered in a block of FRAME_HIGHLIGHT_INDEX_STRIDE indexes after the page's.
+
+		With construct_in_thread=True, the map returned by the page is decoded and the tree and selector map
+		are built in a worker thread, so a large page doesn't block the other coroutines of the event loop.
+
+		With stamp_element_ids=True, each highlighted element gets its highlight index in the ELEMENT_ID_ATTRIBUTE
+		attribute, so it can be found again with a single query.
+		"""
+		# the tree can be the incremental snapshot, which must not keep the frames attached by the previous call
+		for iframe_node, frame_tree in self._iframe_subtrees:
+			iframe_node.children = [child for child in iframe_node.children if child is not frame_tree]
+		self._iframe_subtrees = []
+		self.iframe_frames = []
+
+		element_tree, selector_map = await self._build_dom_tree(
+			highlight_elements,
+			focus_element,
+			viewport_expansion,
+			incremental,
+			wire_format,
+			viewport_scoped,
+			construct_in_thread,
+			stamp_element_ids,
+		)
+		if cross_origin_iframes and self.page.url != 'about:blank':
+			selector_map = await self._add_cross_origin_iframes(
+				element_tree,
+				selector_map,
+				highlight_elements,
+				focus_element,
+				viewport_expansion,
+				wire_format,
+				viewport_scoped,
+				construct_in_thread,
+				stamp_element_ids,
+			)
 		return DOMState(element_tree=element_tree, selector_map=selector_map)
 
 	@time_execution_async('--get_cross_origin_iframes')
@@ -49,29 +180,153 @@ class DomService:
 		# invisible cross-origin iframes are used for ads and tracking, dont open those
 		hidden_frame_urls = await self.page.locator('iframe').filter(visible=False).evaluate_all('e => e.map(e => e.src)')
 
-		is_ad_url = lambda url: any(
-			domain in urlparse(url).netloc for domain in ('doubleclick.net', 'adroll.com', 'googletagmanager.com')
-		)
-
 		return [
 			frame.url
 			for frame in self.page.frames
 			if urlparse(frame.url).netloc  # exclude data:urls and about:blank
 			and urlparse(frame.url).netloc != urlparse(self.page.url).netloc  # exclude same-origin iframes
 			and frame.url not in hidden_frame_urls  # exclude hidden frames
-			and not is_ad_url(frame.url)  # exclude most common ad network tracker frame URLs
+			and not _is_ad_url(frame.url)  # exclude most common ad network tracker frame URLs
 		]
 
+	async def _get_cross_origin_frames(self) -> list['Frame']:
+		"""
+		Frames whose content the in-page walk of their parent can't reach: cross-origin frames (also nested
+		inside other cross-origin frames) that are visible and not ads. Parents come before their children.
+		"""
+		candidates = []
+		for frame in self.page.frames:
+			parent_frame = frame.parent_frame
+			if (
+				parent_frame is not None
+				and urlparse(frame.url).netloc  # exclude data:urls and about:blank
+				and _origin(frame.url) != _origin(parent_frame.url)  # same-origin frames are walked from their parent
+				and not _is_ad_url(frame.url)
+			):
+				candidates.append(frame)
+
+		async def is_visible(frame: 'Frame') -> bool:
+			try:
+				return await (await frame.frame_element()).is_visible()
+			except Exception:
+				return False  # detached in the meantime
+
+		visible = await asyncio.gather(*(is_visible(frame) for frame in candidates))
+
+		frames = []
+		walked = {self.page.main_frame}
+		for frame, frame_is_visible in sorted(zip(candidates, visible), key=lambda item: _frame_depth(item[0])):
+			if frame_is_visible and frame.parent_frame in walked:
+				frames.append(frame)
+				walked.add(frame)
+		return frames
+
+	@time_execution_async('--add_cross_origin_iframes')
+	async def _add_cross_origin_iframes(
+		self,
+		element_tree: DOMElementNode,
+		selector_map: SelectorMap,
+		highlight_elements: bool,
+		focus_element: int,
+		viewport_expansion: int,
+		wire_format: Literal['json', 'packed'],
+		viewport_scoped: bool,
+		construct_in_thread: bool = False,
+		stamp_element_ids: bool = False,
+	) -> SelectorMap:
+		frames = await self._get_cross_origin_frames()
+		if not frames:
+			return selector_map
+
+		# the first free block of indexes after the page's own elements
+		first_base = (max(selector_map, default=-1) // FRAME_HIGHLIGHT_INDEX_STRIDE + 1) * FRAME_HIGHLIGHT_INDEX_STRIDE
+		bases = [first_base + i * FRAME_HIGHLIGHT_INDEX_STRIDE for i in range(len(frames))]
+		args = {
+			'doHighlightElements': highlight_elements,
+			'focusHighlightIndex': focus_element,
+			'viewportExpansion': viewport_expansion,
+			'debugMode': False,
+			'wireFormat': wire_format,
+			'viewportScoped': viewport_scoped,
+			'stampElementIds': stamp_element_ids,
+		}
+		results = await asyncio.gather(
+			*(
+				asyncio.wait_for(
+					self._build_frame_dom_tree(frame, {**args, 'highlightIndexBase': base}, construct_in_thread),
+					FRAME_EXTRACTION_TIMEOUT,
+				)
+				for frame, base in zip(frames, bases)
+			),
+			return_exceptions=True,
+		)
+
+		selector_map = dict(selector_map)
+		trees: dict['Frame', DOMElementNode] = {self.page.main_frame: element_tree}
+		for frame, base, result in zip(frames, bases, results):
+			if isinstance(result, BaseException):
+				logger.debug(f'Failed to extract the DOM of iframe {frame.url}: {type(result).__name__}: {result}')
+				continue
+
+			frame_tree, frame_selector_map, iframe_xpath = result
+			parent_tree = trees.get(frame.parent_frame)  # type: ignore
+			iframe_node = _find_iframe_node(parent_tree, iframe_xpath) if parent_tree else None
+			if iframe_node is None:
+				logger.debug(f'Could not find the iframe element of {frame.url} at {iframe_xpath}')
+				continue
+
+			frame_tree.parent = iframe_node
+			iframe_node.children.append(frame_tree)
+			self._iframe_subtrees.append((iframe_node, frame_tree))
+			self.iframe_frames.append(frame)
+			trees[frame] = frame_tree
+
+			for index, element in frame_selector_map.items():
+				if index < base + FRAME_HIGHLIGHT_INDEX_STRIDE:
+					selector_map[index] = element
+				else:
+					# would collide with the block of the next frame
+					element.highlight_index = None
+
+		return dict(sorted(selector_map.items()))
+
+	async def _build_frame_dom_tree(
+		self, frame: 'Frame', args: dict, construct_in_thread: bool = False
+	) -> tuple[DOMElementNode, SelectorMap, str]:
+		"""Extract the DOM of a frame, and the xpath of its iframe element in the parent frame"""
+		frame_element = await frame.frame_element()
+		assert frame.parent_frame is not None
+		iframe_xpath, eval_page = await asyncio.gather(
+			self._evaluate_build_dom_tree({'xpathOfElement': frame_element}, frame.parent_frame),
+			self._evaluate_build_dom_tree(args, frame),
+		)
+
+		node_map, selector_map = await self._parse_eval_page_map_async(eval_page, construct_in_thread)
+		frame_tree = node_map.get(str(eval_page['rootId']))
+		if not isinstance(frame_tree, DOMElementNode):
+			raise ValueError('Failed to parse the DOM of the frame')
+		return frame_tree, selector_map, iframe_xpath
+
 	@time_execution_async('--build_dom_tree')
 	async def _build_dom_tree(
 		self,
 		highlight_elements: bool,
 		focus_element: int,
 		viewport_expansion: int,
+		incremental: bool = False,
+		wire_format: Literal['json', 'packed'] = 'json',
+		viewport_scoped: bool = False,
+		construct_in_thread: bool = False,
+		stamp_element_ids: bool = False,
 	) -> tuple[DOMElementNode, SelectorMap]:
 		if await self.page.evaluate('1+1') != 2:
 			raise ValueError('The page cannot evaluate javascript code properly')
 
+		snapshot = self.snapshot if incremental else None
+		if snapshot and (snapshot.url != self.page.url or snapshot.patch_count >= MAX_SNAPSHOT_PATCHES):
+			snapshot = None
+		self.snapshot = snapshot
+
 		if self.page.url == 'about:blank':
 			# short-circuit if the page is a new empty tab for speed, no need to inject buildDomTree.js
 			return (
@@ -95,10 +350,15 @@ class DomService:
 			'focusHighlightIndex': focus_element,
 			'viewportExpansion': viewport_expansion,
 			'debugMode': debug_mode,
+			'trackMutations': incremental,
+			'deltaFromSnapshot': snapshot.snapshot_id if snapshot else None,
+			'wireFormat': wire_format,
+			'viewportScoped': viewport_scoped,
+			'stampElementIds': stamp_element_ids,
 		}
 
 		try:
-			eval_page: dict = await self.page.evaluate(self.js_code, args)
+			eval_page = await self._evaluate_build_dom_tree(args)
 		except Exception as e:
 			logger.error('Error evaluating JavaScript: %s', e)
 			raise
@@ -111,16 +371,199 @@ class DomService:
 				json.dumps(eval_page['perfMetrics'], indent=2),
 			)
 
-		return await self._construct_dom_tree(eval_page)
+		if eval_page.get('unchanged') or 'patches' in eval_page:
+			patched = self._apply_snapshot_delta(eval_page)
+			if patched is not None:
+				return patched
+
+			# our copy of the tree no longer matches the in-page snapshot, start over from a full walk
+			logger.debug('Incremental DOM snapshot out of sync, rebuilding the full tree')
+			self.snapshot = None
+			return await self._build_dom_tree(
+				highlight_elements=highlight_elements,
+				focus_element=focus_element,
+				viewport_expansion=viewport_expansion,
+				incremental=incremental,
+				wire_format=wire_format,
+				viewport_scoped=viewport_scoped,
+				construct_in_thread=construct_in_thread,
+				stamp_element_ids=stamp_element_ids,
+			)
+
+		return await self._construct_dom_tree(eval_page, construct_in_thread)
+
+	async def _evaluate_build_dom_tree(self, args: dict, frame: 'Page | Frame | None' = None) -> Any:
+		"""
+		Run buildDomTree.js in the page (or in one of its frames).
+
+		The script is installed as a window function the first time it's needed in a document,
+		so later calls only compile and send the small call wrapper and the args.
+		"""
+		target = frame or self.page
+		call_args = {'functionName': get_build_dom_tree_function_name(), 'args': args}
+		result = await target.evaluate(CALL_BUILD_DOM_TREE_JS, call_args)
+		if not (isinstance(result, dict) and result.get('notInstalled')):
+			return result
+
+		await target.evaluate(get_install_build_dom_tree_js())
+		result = await target.evaluate(CALL_BUILD_DOM_TREE_JS, call_args)
+		if isinstance(result, dict) and result.get('notInstalled'):
+			# the page navigated to a new document in between, send the whole script this time
+			result = await target.evaluate(self.js_code, args)
+		return result
 
 	@time_execution_async('--construct_dom_tree')
 	async def _construct_dom_tree(
 		self,
 		eval_page: dict,
+		construct_in_thread: bool = False,
 	) -> tuple[DOMElementNode, SelectorMap]:
-		js_node_map = eval_page['map']
-		js_root_id = eval_page['rootId']
+		node_map, selector_map = await self._parse_eval_page_map_async(eval_page, construct_in_thread)
+		html_to_dict = node_map.get(str(eval_page['rootId']))
+
+		if html_to_dict is None or not isinstance(html_to_dict, DOMElementNode):
+			raise ValueError('Failed to parse HTML to dictionary')
 
+		if eval_page.get('snapshotId'):
+			self.snapshot = DOMSnapshot(
+				snapshot_id=eval_page['snapshotId'],
+				url=self.page.url,
+				element_tree=html_to_dict,
+				selector_map=selector_map,
+				node_map=node_map,
+			)
+			# hand out a copy, the snapshot's selector map is updated by later patches
+			selector_map = dict(selector_map)
+
+		return html_to_dict, selector_map
+
+	def _apply_snapshot_delta(self, eval_page: dict) -> tuple[DOMElementNode, SelectorMap] | None:
+		"""
+		Patch the snapshot tree with the re-walked subtrees returned by buildDomTree.js.
+
+		Returns None if the delta doesn't apply to the snapshot we hold, the tree is left untouched then.
+		"""
+		snapshot = self.snapshot
+		if snapshot is None or eval_page.get('snapshotId') != snapshot.snapshot_id:
+			return None
+
+		if eval_page.get('unchanged'):
+			return snapshot.element_tree, dict(snapshot.selector_map)
+
+		node_map, patched_selector_map = self._parse_eval_page_map(eval_page)
+
+		# resolve all patches before touching the tree, so a bad delta can't leave it half patched
+		replacements: list[tuple[DOMBaseNode, DOMBaseNode | None]] = []
+		for patch in eval_page['patches']:
+			old_node = snapshot.node_map.get(patch['replaceId'])
+			if old_node is None or old_node.parent is None or not any(child is old_node for child in old_node.parent.children):
+				return None
+			new_node = node_map.get(patch['rootId']) if patch['rootId'] is not None else None
+			replacements.append((old_node, new_node))
+
+		selector_map = dict(snapshot.selector_map)
+		for old_node, new_node in replacements:
+			for index in _iter_highlight_indices(old_node):
+				selector_map.pop(index, None)
+
+			parent = old_node.parent
+			assert parent is not None
+			position = next(i for i, child in enumerate(parent.children) if child is old_node)
+			if new_node is None:
+				del parent.children[position]
+			else:
+				new_node.parent = parent
+				parent.children[position] = new_node
+
+		selector_map.update(patched_selector_map)
+		snapshot.selector_map = dict(sorted(selector_map.items()))
+		snapshot.node_map.update(node_map)
+		snapshot.patch_count += 1
+
+		return snapshot.element_tree, dict(snapshot.selector_map)
+
+	async def _parse_eval_page_map_async(self, eval_page: dict, in_thread: bool) -> tuple[dict[str, DOMBaseNode], SelectorMap]:
+		"""
+		Parse the map returned by buildDomTree.js, optionally in a worker thread.
+
+		The parsing only creates new objects, so it's safe to run off the event loop. It still holds the GIL,
+		but the interpreter switches threads every few milliseconds, so the event loop keeps running other tasks.
+		"""
+		if in_thread:
+			return await asyncio.to_thread(self._parse_eval_page_map, eval_page)
+		return self._parse_eval_page_map(eval_page)
+
+	def _parse_eval_page_map(self, eval_page: dict) -> tuple[dict[str, DOMBaseNode], SelectorMap]:
+		if 'packedMap' in eval_page:
+			return self._parse_packed_node_map(eval_page['packedMap'])
+		return self._parse_node_map(eval_page['map'])
+
+	def _parse_packed_node_map(self, packed_node_map: str) -> tuple[dict[str, DOMBaseNode], SelectorMap]:
+		"""Decode the node map packed by packNodeMap() in buildDomTree.js"""
+		packed = json.loads(packed_node_map)
+		base: int = packed['base']
+		strings: list[str] = packed['strings']
+		flags: list[int] = packed['flags']
+		tags: list[int] = packed['tags']
+		values: list[int] = packed['values']
+		parents: list[int] = packed['parents']
+		count = len(flags)
+
+		# parents come after their children, so relative xpaths are resolved from the end
+		xpaths: list[str] = [''] * count
+		for i in range(count - 1, -1, -1):
+			node_flags = flags[i]
+			if node_flags & PACKED_TEXT_NODE:
+				continue
+			xpath = strings[values[i]]
+			xpaths[i] = f'{xpaths[parents[i]]}/{xpath}' if node_flags & PACKED_RELATIVE_XPATH else xpath
+
+		attributes: dict[int, dict[str, str]] = {}
+		packed_attributes = packed['attributes']
+		for i in range(0, len(packed_attributes), 3):
+			node_index, name, value = packed_attributes[i : i + 3]
+			attributes.setdefault(node_index, {})[strings[name]] = strings[value]
+
+		packed_highlights = packed['highlights']
+		highlights = dict(zip(packed_highlights[::2], packed_highlights[1::2]))
+
+		nodes: list[DOMBaseNode] = []
+		selector_map = {}
+		for i in range(count):
+			node_flags = flags[i]
+			if node_flags & PACKED_TEXT_NODE:
+				nodes.append(DOMTextNode(text=strings[values[i]], is_visible=bool(node_flags & PACKED_VISIBLE), parent=None))
+				continue
+
+			element_node = DOMElementNode(
+				tag_name=strings[tags[i]],
+				xpath=xpaths[i],
+				attributes=attributes.get(i, {}),
+				children=[],
+				is_visible=bool(node_flags & PACKED_VISIBLE),
+				is_interactive=bool(node_flags & PACKED_INTERACTIVE),
+				is_top_element=bool(node_flags & PACKED_TOP_ELEMENT),
+				is_in_viewport=bool(node_flags & PACKED_IN_VIEWPORT),
+				highlight_index=highlights.get(i),
+				shadow_root=bool(node_flags & PACKED_SHADOW_ROOT),
+				parent=None,
+			)
+			if element_node.highlight_index is not None:
+				selector_map[element_node.highlight_index] = element_node
+			nodes.append(element_node)
+
+		# children have lower ids than their parents and siblings are in document order
+		for node, parent_index in zip(nodes, parents):
+			if parent_index >= 0:
+				parent = nodes[parent_index]
+				assert isinstance(parent, DOMElementNode)
+				node.parent = parent
+				parent.children.append(node)
+
+		node_map = {str(base + i): node for i, node in enumerate(nodes)}
+		return node_map, selector_map
+
+	def _parse_node_map(self, js_node_map: dict) -> tuple[dict[str, DOMBaseNode], SelectorMap]:
 		selector_map = {}
 		node_map = {}
 
@@ -146,16 +589,7 @@ class DomService:
 					child_node.parent = node
 					node.children.append(child_node)
 
-		html_to_dict = node_map[str(js_root_id)]
-
-		del node_map
-		del js_node_map
-		del js_root_id
-
-		if html_to_dict is None or not isinstance(html_to_dict, DOMElementNode):
-			raise ValueError('Failed to parse HTML to dictionary')
-
-		return html_to_dict, selector_map
+		return node_map, selector_map
 
 	def _parse_node(
 		self,
@@ -201,3 +635,46 @@ class DomService:
 		children_ids = node_data.get('children', [])
 
 		return element_node, children_ids
+
+
+def _is_ad_url(url: str) -> bool:
+	return any(domain in urlparse(url).netloc for domain in AD_NETWORK_DOMAINS)
+
+
+def _origin(url: str) -> tuple[str, str]:
+	parsed = urlparse(url)
+	return parsed.scheme, parsed.netloc
+
+
+def _frame_depth(frame: 'Frame') -> int:
+	depth = 0
+	while frame.parent_frame is not None:
+		frame = frame.parent_frame
+		depth += 1
+	return depth
+
+
+def _find_iframe_node(tree: DOMElementNode, xpath: str) -> DOMElementNode | None:
+	"""The iframe element at xpath in tree, without descending into the trees of other frames"""
+	stack: list[DOMBaseNode] = [tree]
+	while stack:
+		node = stack.pop()
+		if not isinstance(node, DOMElementNode):
+			continue
+		if node.tag_name == 'iframe':
+			if node.xpath == xpath:
+				return node
+			continue
+		stack.extend(reversed(node.children))
+	return None
+
+
+def _iter_highlight_indices(node: DOMBaseNode):
+	"""Yield the highlight indexes of all elements in the subtree of node"""
+	stack = [node]
+	while stack:
+		current = stack.pop()
+		if isinstance(current, DOMElementNode):
+			if current.highlight_index is not None:
+				yield current.highlight_index
+			stack.extend(current.children)
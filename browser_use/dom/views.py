@@ -1,5 +1,4 @@
-from dataclasses import dataclass
-from functools import cached_property
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Optional
 
 from browser_use.dom.history_tree_processor.view import CoordinateSet, HashedDomElement, ViewportInfo
@@ -10,7 +9,7 @@ if TYPE_CHECKING:
 	from .views import DOMElementNode
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMBaseNode:
 	is_visible: bool
 	# Use None as default and set parent later to avoid circular reference issues
@@ -20,7 +19,7 @@ class DOMBaseNode:
 		raise NotImplementedError('DOMBaseNode is an abstract class')
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMTextNode(DOMBaseNode):
 	text: str
 	type: str = 'TEXT_NODE'
@@ -52,7 +51,7 @@ class DOMTextNode(DOMBaseNode):
 		}
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMElementNode(DOMBaseNode):
 	"""
 	xpath: the xpath of the element from the last root node (shadow root or iframe OR document if no shadow root or iframe).
@@ -79,6 +78,13 @@ class DOMElementNode(DOMBaseNode):
 	"""
 	is_new: bool | None = None
 
+	# cache of the hash property (nodes are slotted, so functools.cached_property can't be used)
+	_hash: HashedDomElement | None = field(default=None, init=False, repr=False, compare=False)
+	# cache of the parent branch path digest, see HistoryTreeProcessor._branch_path_digest
+	_branch_path_digest: bytes | None = field(default=None, init=False, repr=False, compare=False)
+	# cache of the CSS selectors by include_dynamic_attributes, see BrowserSession._enhanced_css_selector_for_element
+	_css_selectors: dict[bool, str] | None = field(default=None, init=False, repr=False, compare=False)
+
 	def __json__(self) -> dict:
 		return {
 			'tag_name': self.tag_name,
@@ -121,116 +127,143 @@ class DOMElementNode(DOMBaseNode):
 
 		return tag_str
 
-	@cached_property
+	@property
 	def hash(self) -> HashedDomElement:
-		from browser_use.dom.history_tree_processor.service import (
-			HistoryTreeProcessor,
-		)
+		if self._hash is None:
+			from browser_use.dom.history_tree_processor.service import (
+				HistoryTreeProcessor,
+			)
 
-		return HistoryTreeProcessor._hash_dom_element(self)
+			self._hash = HistoryTreeProcessor._hash_dom_element(self)
+		return self._hash
 
 	def get_all_text_till_next_clickable_element(self, max_depth: int = -1) -> str:
 		text_parts = []
 
-		def collect_text(node: DOMBaseNode, current_depth: int) -> None:
+		# iterative depth-first walk, children are pushed in reverse to pop them in document order
+		stack: list[tuple[DOMBaseNode, int]] = [(self, 0)]
+		while stack:
+			node, current_depth = stack.pop()
 			if max_depth != -1 and current_depth > max_depth:
-				return
-
-			# Skip this branch if we hit a highlighted element (except for the current node)
-			if isinstance(node, DOMElementNode) and node != self and node.highlight_index is not None:
-				return
+				continue
 
 			if isinstance(node, DOMTextNode):
 				text_parts.append(node.text)
 			elif isinstance(node, DOMElementNode):
-				for child in node.children:
-					collect_text(child, current_depth + 1)
+				# Skip this branch if we hit a highlighted element (except for the current node)
+				if node is not self and node.highlight_index is not None:
+					continue
+				stack.extend((child, current_depth + 1) for child in reversed(node.children))
 
-		collect_text(self, 0)
 		return '\n'.join(text_parts).strip()
 
 	@time_execution_sync('--clickable_elements_to_string')
 	def clickable_elements_to_string(self, include_attributes: list[str] | None = None) -> str:
-		"""Convert the processed DOM content to HTML."""
-		formatted_text = []
+		"""
+		Convert the processed DOM content to HTML.
+
+		Single iterative pass over the tree: the text of each highlighted element is collected while its
+		subtree is walked, and its line is filled into the slot reserved for it once the subtree is done.
+		"""
+		formatted_text: list[str] = []
+
+		def format_highlighted_element(node: DOMElementNode, depth_str: str, text: str) -> str:
+			attributes_html_str = ''
+			if include_attributes:
+				attributes_to_include = {key: str(value) for key, value in node.attributes.items() if key in include_attributes}
+
+				# Easy LLM optimizations
+				# if tag == role attribute, don't include it
+				if node.tag_name == attributes_to_include.get('role'):
+					del attributes_to_include['role']
+
+				# if aria-label == text of the node, don't include it
+				if (
+					attributes_to_include.get('aria-label')
+					and attributes_to_include.get('aria-label', '').strip() == text.strip()
+				):
+					del attributes_to_include['aria-label']
 
-		def process_node(node: DOMBaseNode, depth: int) -> None:
-			next_depth = int(depth)
+				# if placeholder == text of the node, don't include it
+				if (
+					attributes_to_include.get('placeholder')
+					and attributes_to_include.get('placeholder', '').strip() == text.strip()
+				):
+					del attributes_to_include['placeholder']
+
+				if attributes_to_include:
+					# Format as key1='value1' key2='value2'
+					attributes_html_str = ' '.join(f"{key}='{value}'" for key, value in attributes_to_include.items())
+
+			# Build the line
+			if node.is_new:
+				highlight_indicator = f'*[{node.highlight_index}]*'
+			else:
+				highlight_indicator = f'[{node.highlight_index}]'
+
+			line = f'{depth_str}{highlight_indicator}<{node.tag_name}'
+
+			if attributes_html_str:
+				line += f' {attributes_html_str}'
+
+			if text:
+				# Add space before >text only if there were NO attributes added before
+				if not attributes_html_str:
+					line += ' '
+				line += f'>{text}'
+			# Add space before /> only if neither attributes NOR text were added
+			elif not attributes_html_str:
+				line += ' '
+
+			line += ' />'  # 1 token
+			return line
+
+		# text parts of the highlighted elements whose subtrees are being walked, innermost last.
+		# Each text node belongs to the innermost one, like get_all_text_till_next_clickable_element() collects it
+		open_text_parts: list[list[str]] = []
+
+		# the tree above self counts too when looking for highlighted parents of text nodes
+		has_highlighted_ancestor = False
+		ancestor = self.parent
+		while ancestor is not None and not has_highlighted_ancestor:
+			has_highlighted_ancestor = ancestor.highlight_index is not None
+			ancestor = ancestor.parent
+
+		# (node, depth, has a highlighted ancestor, line index): a line index >= 0 marks the end of the
+		# subtree of the highlighted element whose line is at that index in formatted_text
+		stack: list[tuple[DOMBaseNode, int, bool, int]] = [(self, 0, has_highlighted_ancestor, -1)]
+		while stack:
+			node, depth, in_highlighted, line_index = stack.pop()
 			depth_str = depth * '\t'
 
-			if isinstance(node, DOMElementNode):
+			if line_index >= 0:
+				assert isinstance(node, DOMElementNode)
+				text = '\n'.join(open_text_parts.pop()).strip()
+				formatted_text[line_index] = format_highlighted_element(node, depth_str, text)
+
+			elif isinstance(node, DOMElementNode):
+				next_depth = depth
 				# Add element with highlight_index
 				if node.highlight_index is not None:
 					next_depth += 1
-
-					text = node.get_all_text_till_next_clickable_element()
-					attributes_html_str = ''
-					if include_attributes:
-						attributes_to_include = {
-							key: str(value) for key, value in node.attributes.items() if key in include_attributes
-						}
-
-						# Easy LLM optimizations
-						# if tag == role attribute, don't include it
-						if node.tag_name == attributes_to_include.get('role'):
-							del attributes_to_include['role']
-
-						# if aria-label == text of the node, don't include it
-						if (
-							attributes_to_include.get('aria-label')
-							and attributes_to_include.get('aria-label', '').strip() == text.strip()
-						):
-							del attributes_to_include['aria-label']
-
-						# if placeholder == text of the node, don't include it
-						if (
-							attributes_to_include.get('placeholder')
-							and attributes_to_include.get('placeholder', '').strip() == text.strip()
-						):
-							del attributes_to_include['placeholder']
-
-						if attributes_to_include:
-							# Format as key1='value1' key2='value2'
-							attributes_html_str = ' '.join(f"{key}='{value}'" for key, value in attributes_to_include.items())
-
-					# Build the line
-					if node.is_new:
-						highlight_indicator = f'*[{node.highlight_index}]*'
-					else:
-						highlight_indicator = f'[{node.highlight_index}]'
-
-					line = f'{depth_str}{highlight_indicator}<{node.tag_name}'
-
-					if attributes_html_str:
-						line += f' {attributes_html_str}'
-
-					if text:
-						# Add space before >text only if there were NO attributes added before
-						if not attributes_html_str:
-							line += ' '
-						line += f'>{text}'
-					# Add space before /> only if neither attributes NOR text were added
-					elif not attributes_html_str:
-						line += ' '
-
-					line += ' />'  # 1 token
-					formatted_text.append(line)
+					open_text_parts.append([])
+					stack.append((node, depth, in_highlighted, len(formatted_text)))
+					formatted_text.append('')  # filled in when the subtree is done
 
 				# Process children regardless
-				for child in node.children:
-					process_node(child, next_depth)
+				in_highlighted = in_highlighted or node.highlight_index is not None
+				stack.extend((child, next_depth, in_highlighted, -1) for child in reversed(node.children))
 
 			elif isinstance(node, DOMTextNode):
+				if open_text_parts:
+					open_text_parts[-1].append(node.text)
+
 				# Add text only if it doesn't have a highlighted parent
 				if (
-					not node.has_parent_with_highlight_index()
-					and node.parent
-					and node.parent.is_visible
-					and node.parent.is_top_element
+					not in_highlighted and node.parent and node.parent.is_visible and node.parent.is_top_element
 				):  # and node.is_parent_top_element()
 					formatted_text.append(f'{depth_str}{node.text}')
 
-		process_node(self, 0)
 		return '\n'.join(formatted_text)
 
 	def get_file_upload_element(self, check_siblings: bool = True) -> Optional['DOMElementNode']:
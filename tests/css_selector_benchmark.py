@@ -0,0 +1,74 @@
+"""
+Microbenchmark of the CSS selectors BrowserSession builds for the elements of a selector map.
+
+Compares building every selector from scratch on each call (as get_locate_element and the history items
+used to) with the first, memoizing call on a fresh tree and with later calls that hit the memoized selector.
+
+Usage:
+	python tests/css_selector_benchmark.py              # synthetic ~20k node page
+	python tests/css_selector_benchmark.py page.json    # page captured with dom_memory_benchmark.py
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dom_memory_benchmark import build_current_tree, synthetic_node_map
+
+from browser_use.browser.session import BrowserSession, _xpath_to_css_selector
+
+RUNS = 5
+
+
+def per_element(durations: list[float], count: int) -> float:
+	return statistics.median(durations) / count * 1e6
+
+
+def benchmark(eval_page: dict) -> None:
+	_, selector_map = build_current_tree(eval_page['map'])
+	elements = list(selector_map.values())
+	print(f'{len(elements)} elements')
+
+	rebuilt = []
+	for _ in range(RUNS):
+		_xpath_to_css_selector.cache_clear()
+		start = time.perf_counter()
+		for element in elements:
+			BrowserSession._build_enhanced_css_selector(element, True)
+		rebuilt.append(time.perf_counter() - start)
+
+	first_call, memoized = [], []
+	for _ in range(RUNS):
+		# a fresh tree, as after each step, the xpath conversions are still cached from the previous trees
+		_, selector_map = build_current_tree(eval_page['map'])
+		elements = list(selector_map.values())
+		start = time.perf_counter()
+		for element in elements:
+			BrowserSession._enhanced_css_selector_for_element(element)
+		first_call.append(time.perf_counter() - start)
+
+		start = time.perf_counter()
+		for element in elements:
+			BrowserSession._enhanced_css_selector_for_element(element)
+		memoized.append(time.perf_counter() - start)
+
+	print(f'rebuilt every call:  {per_element(rebuilt, len(elements)):6.2f} us/element')
+	print(f'first call:          {per_element(first_call, len(elements)):6.2f} us/element')
+	print(f'memoized:            {per_element(memoized, len(elements)):6.2f} us/element')
+
+
+def main() -> None:
+	if len(sys.argv) == 2:
+		with open(sys.argv[1]) as f:
+			eval_page = json.load(f)
+	else:
+		eval_page = synthetic_node_map()
+	benchmark(eval_page)
+
+
+if __name__ == '__main__':
+	main()
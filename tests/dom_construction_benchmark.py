@@ -0,0 +1,135 @@
+"""
+Benchmark of how long DOM tree construction blocks the event loop.
+
+Builds the tree of a synthetic page (or of a page captured with dom_memory_benchmark.py) with
+DomService._construct_dom_tree, inline and in a worker thread, while a ticker task measures how
+late the event loop wakes it up. The longest delay is what every other agent sharing the loop waits.
+In a thread, the longest delay is bounded by the interpreter's switch interval, except for single calls
+that hold the GIL throughout, like the json.loads() of a packed map.
+
+Usage:
+	python tests/dom_construction_benchmark.py              # synthetic ~30k node page
+	python tests/dom_construction_benchmark.py page.json    # captured page
+"""
+
+import asyncio
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dom_memory_benchmark import synthetic_node_map
+
+from browser_use.dom.service import DomService
+
+TICK_INTERVAL = 0.001
+RUNS = 5
+
+
+async def ticker(stop: asyncio.Event, delays: list[float]) -> None:
+	"""Sleeps for TICK_INTERVAL in a loop and records how much later than asked it was woken up"""
+	while not stop.is_set():
+		start = time.perf_counter()
+		await asyncio.sleep(TICK_INTERVAL)
+		delays.append(time.perf_counter() - start - TICK_INTERVAL)
+
+
+async def measure(eval_page: dict, construct_in_thread: bool) -> tuple[float, float, float]:
+	"""Median construction time, and the worst and median event loop delay over all runs"""
+	dom_service = DomService(page=None)  # type: ignore
+	durations = []
+	delays: list[float] = []
+	for _ in range(RUNS):
+		# a full collection of the previous trees would stall the loop in both modes, start each run from a clean heap
+		gc.collect()
+		stop = asyncio.Event()
+		ticker_task = asyncio.create_task(ticker(stop, delays))
+		await asyncio.sleep(TICK_INTERVAL * 5)
+
+		start = time.perf_counter()
+		await dom_service._construct_dom_tree(eval_page, construct_in_thread)
+		durations.append(time.perf_counter() - start)
+
+		stop.set()
+		await ticker_task
+	return statistics.median(durations), max(delays), statistics.median(delays)
+
+
+async def benchmark(eval_page: dict) -> None:
+	print(f'{len(eval_page["map"])} nodes')
+	for label, packed in (('json', False), ('packed', True)):
+		page = eval_page
+		if packed:
+			page = {'rootId': eval_page['rootId'], 'packedMap': pack(eval_page['map'])}
+		for construct_in_thread in (False, True):
+			duration, worst_delay, median_delay = await measure(page, construct_in_thread)
+			mode = 'thread' if construct_in_thread else 'inline'
+			print(
+				f'{label:6} {mode}:  construction {duration * 1000:7.1f} ms  '
+				f'loop delay max {worst_delay * 1000:6.1f} ms  median {median_delay * 1000:5.2f} ms'
+			)
+
+
+def pack(node_map: dict) -> str:
+	"""Same as packNodeMap() in buildDomTree.js, for maps with consecutive ids"""
+	ids = sorted(node_map, key=int)
+	base = int(ids[0])
+	strings: list[str] = []
+	string_indexes: dict[str, int] = {}
+
+	def intern(value: str) -> int:
+		if value not in string_indexes:
+			string_indexes[value] = len(strings)
+			strings.append(value)
+		return string_indexes[value]
+
+	flags, tags, values, parents, attributes, highlights = [], [], [], [-1] * len(ids), [], []
+	for i, id in enumerate(ids):
+		node_data = node_map[id]
+		if node_data.get('type') == 'TEXT_NODE':
+			flags.append(32 | (1 if node_data['isVisible'] else 0))
+			tags.append(-1)
+			values.append(intern(node_data['text']))
+			continue
+		node_flags = 0
+		for bit, key in enumerate(('isVisible', 'isInteractive', 'isTopElement', 'isInViewport', 'shadowRoot')):
+			if node_data.get(key):
+				node_flags |= 1 << bit
+		flags.append(node_flags)
+		tags.append(intern(node_data['tagName']))
+		values.append(intern(node_data['xpath']))
+		for name, value in node_data.get('attributes', {}).items():
+			attributes.extend((i, intern(name), intern(value)))
+		if node_data.get('highlightIndex') is not None:
+			highlights.extend((i, node_data['highlightIndex']))
+		for child_id in node_data.get('children', []):
+			parents[int(child_id) - base] = i
+	return json.dumps(
+		{
+			'base': base,
+			'strings': strings,
+			'flags': flags,
+			'tags': tags,
+			'values': values,
+			'parents': parents,
+			'attributes': attributes,
+			'highlights': highlights,
+		}
+	)
+
+
+def main() -> None:
+	if len(sys.argv) == 2:
+		with open(sys.argv[1]) as f:
+			eval_page = json.load(f)
+	else:
+		eval_page = synthetic_node_map(rows=3000)
+	asyncio.run(benchmark(eval_page))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,225 @@
+"""
+Memory benchmark of the DOM tree node classes in browser_use/dom/views.py.
+
+Builds the same tree from a buildDomTree.js result twice, once with the current slotted node
+classes and once with copies of the previous __dict__-based classes (and their sha256 element
+hashes), and reports the memory allocated for each, including the cached element hashes.
+
+Usage:
+	python tests/dom_memory_benchmark.py --capture https://www.amazon.com page.json   # capture a page
+	python tests/dom_memory_benchmark.py page.json                                    # benchmark a captured page
+	python tests/dom_memory_benchmark.py                                              # synthetic 20k node page
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_use.dom.history_tree_processor.view import CoordinateSet, HashedDomElement, ViewportInfo
+from browser_use.dom.service import DomService, get_build_dom_tree_js
+from browser_use.dom.views import DOMElementNode
+
+
+# the node classes as they were before they got __slots__
+@dataclass(frozen=False)
+class LegacyDOMBaseNode:
+	is_visible: bool
+	parent: Optional['LegacyDOMElementNode']
+
+
+@dataclass(frozen=False)
+class LegacyDOMTextNode(LegacyDOMBaseNode):
+	text: str
+	type: str = 'TEXT_NODE'
+
+
+@dataclass(frozen=False)
+class LegacyDOMElementNode(LegacyDOMBaseNode):
+	tag_name: str
+	xpath: str
+	attributes: dict[str, str]
+	children: list[LegacyDOMBaseNode]
+	is_interactive: bool = False
+	is_top_element: bool = False
+	is_in_viewport: bool = False
+	shadow_root: bool = False
+	highlight_index: int | None = None
+	viewport_coordinates: CoordinateSet | None = None
+	page_coordinates: CoordinateSet | None = None
+	viewport_info: ViewportInfo | None = None
+	is_new: bool | None = None
+
+	@cached_property
+	def hash(self) -> HashedDomElement:
+		# the element hash as it was computed before, from the tag names of all parents
+		branch_path = []
+		current = self
+		while current.parent is not None:
+			branch_path.append(current.tag_name)
+			current = current.parent
+		branch_path.reverse()
+
+		attributes_string = ''.join(f'{key}={value}' for key, value in self.attributes.items())
+		return HashedDomElement(
+			hashlib.sha256('/'.join(branch_path).encode()).hexdigest(),
+			hashlib.sha256(attributes_string.encode()).hexdigest(),
+			hashlib.sha256(self.xpath.encode()).hexdigest(),
+		)
+
+
+def build_legacy_tree(node_map: dict) -> tuple[dict, dict]:
+	"""Same as DomService._parse_node_map, with the legacy classes"""
+	nodes = {}
+	selector_map = {}
+	for id, node_data in node_map.items():
+		if node_data.get('type') == 'TEXT_NODE':
+			nodes[id] = LegacyDOMTextNode(text=node_data['text'], is_visible=node_data['isVisible'], parent=None)
+			continue
+
+		node = LegacyDOMElementNode(
+			tag_name=node_data['tagName'],
+			xpath=node_data['xpath'],
+			attributes=node_data.get('attributes', {}),
+			children=[],
+			is_visible=node_data.get('isVisible', False),
+			is_interactive=node_data.get('isInteractive', False),
+			is_top_element=node_data.get('isTopElement', False),
+			is_in_viewport=node_data.get('isInViewport', False),
+			highlight_index=node_data.get('highlightIndex'),
+			shadow_root=node_data.get('shadowRoot', False),
+			parent=None,
+		)
+		if node.highlight_index is not None:
+			selector_map[node.highlight_index] = node
+		for child_id in node_data.get('children', []):
+			if child_id in nodes:
+				nodes[child_id].parent = node
+				node.children.append(nodes[child_id])
+		nodes[id] = node
+	return nodes, selector_map
+
+
+def build_current_tree(node_map: dict) -> tuple[dict, dict]:
+	return DomService(page=None)._parse_node_map(node_map)  # type: ignore
+
+
+def synthetic_node_map(rows: int = 2000) -> dict:
+	"""A results page: rows of a card with a link, a button and some text, ~10 nodes per row"""
+	node_map = {}
+	next_id = 0
+	highlight_index = 0
+
+	def add(node_data: dict) -> str:
+		nonlocal next_id
+		id = str(next_id)
+		next_id += 1
+		node_map[id] = node_data
+		return id
+
+	def element(tag: str, xpath: str, children: list[str], attributes: dict | None = None, interactive: bool = False) -> str:
+		nonlocal highlight_index
+		node_data = {
+			'tagName': tag,
+			'xpath': xpath,
+			'attributes': attributes or {},
+			'children': children,
+			'isVisible': True,
+			'isTopElement': True,
+		}
+		if interactive:
+			node_data.update(isInteractive=True, isInViewport=True, highlightIndex=highlight_index)
+			highlight_index += 1
+		return add(node_data)
+
+	def text(value: str) -> str:
+		return add({'type': 'TEXT_NODE', 'text': value, 'isVisible': True})
+
+	row_ids = []
+	for row in range(rows):
+		xpath = f'html/body/div/ul/li[{row + 1}]'
+		title = element('span', f'{xpath}/div/span', [text(f'Result number {row}')])
+		link = element(
+			'a',
+			f'{xpath}/div/a',
+			[text('Open')],
+			{'href': f'https://example.com/results/{row}', 'class': 'result-link'},
+			interactive=True,
+		)
+		description = element('p', f'{xpath}/div/p', [text(f'Description of result {row} with a few more words')])
+		card = element('div', f'{xpath}/div', [title, link, description], {'class': 'card'})
+		button = element('button', f'{xpath}/button', [text('Save')], {'type': 'button', 'aria-label': 'Save'}, interactive=True)
+		row_ids.append(element('li', xpath, [card, button]))
+
+	body = element('body', '/body', [element('div', 'html/body/div', [element('ul', 'html/body/div/ul', row_ids)])])
+	return {'rootId': body, 'map': node_map}
+
+
+def measure(build, node_map: dict) -> tuple[int, float]:
+	"""Memory allocated for the tree (kept alive until measured) and the time it took to build it"""
+	tracemalloc.start()
+	start = time.perf_counter()
+	nodes, selector_map = build(node_map)
+	for element in selector_map.values():
+		element.hash
+	elapsed = time.perf_counter() - start
+	allocated, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	del nodes, selector_map
+	return allocated, elapsed
+
+
+async def capture(url: str) -> dict:
+	from playwright.async_api import async_playwright
+
+	async with async_playwright() as p:
+		browser = await p.chromium.launch()
+		page = await browser.new_page()
+		await page.goto(url)
+		await page.wait_for_load_state('load')
+		eval_page = await page.evaluate(
+			get_build_dom_tree_js(), {'doHighlightElements': False, 'focusHighlightIndex': -1, 'viewportExpansion': -1}
+		)
+		await browser.close()
+	return eval_page
+
+
+def main() -> None:
+	if len(sys.argv) == 4 and sys.argv[1] == '--capture':
+		url, path = sys.argv[2:]
+		eval_page = asyncio.run(capture(url))
+		with open(path, 'w') as f:
+			json.dump(eval_page, f)
+		print(f'Captured {len(eval_page["map"])} nodes of {url} to {path}')
+		return
+
+	if len(sys.argv) == 2:
+		with open(sys.argv[1]) as f:
+			eval_page = json.load(f)
+	else:
+		eval_page = synthetic_node_map()
+	node_map = eval_page['map']
+
+	legacy_bytes, legacy_time = measure(build_legacy_tree, node_map)
+	current_bytes, current_time = measure(build_current_tree, node_map)
+
+	elements = sum(1 for node_data in node_map.values() if node_data.get('type') != 'TEXT_NODE')
+	print(f'{len(node_map)} nodes ({elements} elements, {len(node_map) - elements} text nodes)')
+	print(f'legacy:  {legacy_bytes / 1024:10.1f} KiB  {legacy_bytes / len(node_map):6.1f} B/node  {legacy_time * 1000:7.1f} ms')
+	print(
+		f'slotted: {current_bytes / 1024:10.1f} KiB  {current_bytes / len(node_map):6.1f} B/node  {current_time * 1000:7.1f} ms'
+	)
+	print(f'saved:   {(legacy_bytes - current_bytes) / legacy_bytes:10.1%}')
+	assert isinstance(build_current_tree(node_map)[0][str(eval_page['rootId'])], DOMElementNode)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,81 @@
+"""
+Benchmark of DOMElementNode.clickable_elements_to_string against the previous recursive implementation.
+
+Usage:
+	python tests/dom_serializer_benchmark.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_dom_serializer import INCLUDE_ATTRIBUTES, reference_clickable_elements_to_string
+
+from browser_use.dom.views import DOMElementNode, DOMTextNode
+
+
+def element(parent: DOMElementNode | None, highlight_index: int | None = None) -> DOMElementNode:
+	node = DOMElementNode(
+		tag_name='div',
+		xpath='',
+		attributes={'role': 'button', 'aria-label': 'Open'},
+		children=[],
+		is_visible=True,
+		is_top_element=True,
+		highlight_index=highlight_index,
+		parent=parent,
+	)
+	if parent is not None:
+		parent.children.append(node)
+	return node
+
+
+def text(parent: DOMElementNode, value: str) -> None:
+	parent.children.append(DOMTextNode(text=value, is_visible=True, parent=parent))
+
+
+def deep_tree(depth: int = 900, highlighted: int = 50) -> DOMElementNode:
+	"""A single chain of nested elements with text at each level, the innermost few of them highlighted"""
+	root = parent = element(None)
+	for i in range(depth):
+		parent = element(parent, i if i >= depth - highlighted else None)
+		text(parent, f'level {i}')
+	return root
+
+
+def wide_tree(rows: int = 5000) -> DOMElementNode:
+	"""A long list of rows, each a few levels deep with a highlighted link and button"""
+	root = element(None)
+	highlight_index = 0
+	for row in range(rows):
+		card = element(element(root))
+		text(element(card), f'Result {row}')
+		for label in ('Open', 'Save'):
+			wrapper = element(element(card), highlight_index)
+			highlight_index += 1
+			text(element(wrapper), label)
+	return root
+
+
+def benchmark(name: str, root: DOMElementNode, repeat: int = 5) -> None:
+	start = time.perf_counter()
+	for _ in range(repeat):
+		reference = reference_clickable_elements_to_string(root, INCLUDE_ATTRIBUTES)
+	reference_time = (time.perf_counter() - start) / repeat
+
+	start = time.perf_counter()
+	for _ in range(repeat):
+		output = root.clickable_elements_to_string(INCLUDE_ATTRIBUTES)
+	current_time = (time.perf_counter() - start) / repeat
+
+	assert output == reference
+	print(f'{name:<6} recursive: {reference_time * 1000:8.1f} ms   single pass: {current_time * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+	# the recursive implementation needs a few frames per level of the tree
+	sys.setrecursionlimit(100_000)
+	benchmark('deep', deep_tree())
+	benchmark('wide', wide_tree())
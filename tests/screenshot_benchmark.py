@@ -0,0 +1,80 @@
+"""
+Benchmark of the latency of BrowserSession.take_screenshot, capturing a new screenshot every call
+or returning the latest frame of the CDP screencast (screenshot_from_screencast=True).
+
+Each mode is measured on a static page, and right after a change that makes the page repaint.
+
+Usage:
+	python tests/screenshot_benchmark.py
+	python tests/screenshot_benchmark.py https://example.com
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.session import BrowserSession
+
+RUNS = 20
+
+SYNTHETIC_PAGE = (
+	'<html><body style="font-family: sans-serif">'
+	+ ''.join(f'<p>Row {i} <a href="#{i}">link {i}</a> <input value="{i}"></p>' for i in range(200))
+	+ '</body></html>'
+)
+
+REPAINT_JS = "() => { document.body.style.background = document.body.style.background === 'white' ? 'linen' : 'white' }"
+
+
+async def measure(browser_session: BrowserSession, repaint: bool) -> tuple[float, float, int]:
+	"""Median and worst latency of take_screenshot, and the size of the last screenshot"""
+	page = await browser_session.get_current_page()
+	durations = []
+	screenshot = ''
+	for _ in range(RUNS):
+		if repaint:
+			await page.evaluate(REPAINT_JS)
+		start = time.perf_counter()
+		screenshot = await browser_session.take_screenshot()
+		durations.append(time.perf_counter() - start)
+	return statistics.median(durations), max(durations), len(screenshot)
+
+
+async def benchmark(url: str | None) -> None:
+	for from_screencast in (False, True):
+		browser_session = BrowserSession(
+			browser_profile=BrowserProfile(headless=True, screenshot_from_screencast=from_screencast),
+			user_data_dir=None,
+		)
+		await browser_session.start()
+		try:
+			page = await browser_session.get_current_page()
+			if url:
+				await page.goto(url, wait_until='load')
+			else:
+				await page.set_content(SYNTHETIC_PAGE)
+			# the first call starts the screencast
+			await browser_session.take_screenshot()
+
+			mode = 'screencast' if from_screencast else 'screenshot'
+			for repaint in (False, True):
+				median, worst, size = await measure(browser_session, repaint)
+				label = 'after repaint' if repaint else 'static page'
+				print(
+					f'{mode:10} {label:13}:  median {median * 1000:6.1f} ms  max {worst * 1000:6.1f} ms  {size / 1024:6.0f} KiB'
+				)
+		finally:
+			await browser_session.stop()
+
+
+def main() -> None:
+	asyncio.run(benchmark(sys.argv[1] if len(sys.argv) == 2 else None))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,134 @@
+"""
+Tests for streaming the actions of an LLM response, so they are executed before the rest of it is generated.
+
+The responses come from a fake chat model that streams a canned message, the sanity check of the LLM is skipped.
+The agent steps run in a real headless browser.
+"""
+
+import asyncio
+import json
+from operator import itemgetter
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.runnables import RunnableMap, RunnablePassthrough
+
+from browser_use.agent.service import Agent
+from browser_use.agent.streaming import ActionStream, IncrementalActionParser
+from browser_use.browser import BrowserProfile, BrowserSession
+from browser_use.controller.service import Controller
+
+CURRENT_STATE = {'evaluation_previous_goal': 'Unknown', 'memory': 'Nothing yet', 'next_goal': 'Scroll'}
+
+ACTIONS = [
+	{'scroll_down': {'amount': 100}},
+	{'input_text': {'index': 2, 'text': 'a "quoted" {brace} [bracket]'}},
+	{'done': {'text': 'finished', 'success': True}},
+]
+
+
+def agent_output_json(actions: list[dict]) -> str:
+	return json.dumps({'current_state': CURRENT_STATE, 'action': actions})
+
+
+@pytest.fixture
+def action_model():
+	return Controller().registry.create_action_model()
+
+
+def test_actions_are_parsed_as_soon_as_they_are_complete():
+	document = '<think>{"action": [{"not": "this"}]}</think>\n```json\n' + agent_output_json(ACTIONS) + '\n```'
+	for chunk_size in (1, 5, len(document)):
+		parser = IncrementalActionParser()
+		parsed = []
+		for start in range(0, len(document), chunk_size):
+			chunk = document[start : start + chunk_size]
+			for action in parser.feed(chunk):
+				# each action is returned by the chunk that closes it
+				if chunk_size == 1:
+					assert chunk == '}'
+				parsed.append(action)
+		assert parsed == ACTIONS
+
+
+async def test_action_stream(action_model):
+	stream = ActionStream(action_model, max_actions=2)
+	stream.feed(agent_output_json(ACTIONS)[:-20])
+	assert [action.model_dump(exclude_unset=True) for action in stream.actions] == ACTIONS[:2]
+
+	# the actions that were not streamed are added once the response is parsed, up to the maximum
+	stream.finish([action_model(**action) for action in ACTIONS])
+	assert [action.model_dump(exclude_unset=True) async for action in stream] == ACTIONS[:2]
+
+	# none is dispatched after an invalid action
+	stream = ActionStream(action_model, max_actions=10)
+	stream.feed(agent_output_json([ACTIONS[0], {'no_such_action': {}}, ACTIONS[2]]))
+	assert len(stream.actions) == 1
+
+	# a cancelled stream ends without the actions that were not picked up yet
+	stream = ActionStream(action_model, max_actions=10)
+	stream.feed(agent_output_json(ACTIONS))
+	stream.cancel()
+	assert [action async for action in stream] == []
+
+
+async def test_get_next_action_streams_the_actions():
+	llm = GenericFakeChatModel(messages=iter([AIMessage(content=agent_output_json(ACTIONS))]))
+	llm._verified_api_keys = True  # type: ignore
+	agent = Agent(task='Test task', llm=llm, tool_calling_method='raw', browser_session=BrowserSession(), enable_memory=False)
+	stream = ActionStream(agent.ActionModel, max_actions=10)
+
+	model_output = await agent.get_next_action([HumanMessage(content='Test')], stream)
+
+	assert [action.model_dump(exclude_unset=True) for action in model_output.action] == ACTIONS
+	assert stream.actions == model_output.action
+
+
+async def test_structured_output_is_parsed_from_the_streamed_response(action_model):
+	llm = GenericFakeChatModel(messages=iter([AIMessage(content=agent_output_json(ACTIONS))]))
+	llm._verified_api_keys = True  # type: ignore
+	agent = Agent(
+		task='Test task', llm=llm, tool_calling_method='json_mode', browser_session=BrowserSession(), enable_memory=False
+	)
+	# the runnable returned by with_structured_output(include_raw=True)
+	parser_assign = RunnablePassthrough.assign(parsed=itemgetter('raw') | JsonOutputParser(), parsing_error=lambda _: None)
+	parser_none = RunnablePassthrough.assign(parsed=lambda _: None)
+	structured_llm = RunnableMap(raw=llm) | parser_assign.with_fallbacks([parser_none], exception_key='parsing_error')
+
+	stream = ActionStream(action_model, max_actions=10)
+	iterated = asyncio.create_task(asyncio.wait_for(anext(aiter(stream)), timeout=5))
+	response = await agent._invoke_structured_llm(structured_llm, [HumanMessage(content='Test')], stream)
+
+	assert response['parsed'] == {'current_state': CURRENT_STATE, 'action': ACTIONS}
+	assert response['raw'].content == agent_output_json(ACTIONS)
+	assert (await iterated).model_dump(exclude_unset=True) == ACTIONS[0]
+	assert len(stream.actions) == 3
+
+
+async def test_streamed_results_are_kept_when_the_response_fails():
+	# the response breaks off after the first action, so it is streamed and executed but the response can't be parsed
+	response = agent_output_json([{'wait': {'seconds': 0}}, ACTIONS[2]])
+	response = response[: response.index('{"done"')]
+	llm = GenericFakeChatModel(messages=iter([AIMessage(content=response)]))
+	llm._verified_api_keys = True  # type: ignore
+	agent = Agent(
+		task='Test task',
+		llm=llm,
+		tool_calling_method='raw',
+		browser_session=BrowserSession(browser_profile=BrowserProfile(headless=True), user_data_dir=None),
+		enable_memory=False,
+		stream_actions=True,
+	)
+
+	try:
+		await agent.step()
+	finally:
+		await agent.close()
+
+	wait_result, error_result = agent.state.last_result
+	assert not wait_result.error and 'Waiting' in (wait_result.extracted_content or '')
+	assert error_result.error and 'Could not parse response' in error_result.error
+	assert agent.state.consecutive_failures == 1
+	assert agent.state.history.history[-1].result == agent.state.last_result
@@ -0,0 +1,44 @@
+"""
+Tests for the history an Agent records while it runs, with a fake chat model that answers with canned actions
+and a real headless browser. The sanity check of the LLM is skipped.
+"""
+
+import json
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from browser_use.agent.service import Agent
+from browser_use.browser import BrowserProfile, BrowserSession
+
+CURRENT_STATE = {'evaluation_previous_goal': 'Unknown', 'memory': 'Nothing yet', 'next_goal': 'Finish'}
+
+
+def agent_output(actions: list[dict]) -> AIMessage:
+	return AIMessage(content=json.dumps({'current_state': CURRENT_STATE, 'action': actions}))
+
+
+async def test_every_step_is_recorded_in_the_history():
+	llm = GenericFakeChatModel(
+		messages=iter(
+			[
+				agent_output([{'wait': {'seconds': 0}}]),
+				agent_output([{'done': {'text': 'finished', 'success': True}}]),
+			]
+		)
+	)
+	llm._verified_api_keys = True  # type: ignore
+	agent = Agent(
+		task='Test task',
+		llm=llm,
+		tool_calling_method='raw',
+		browser_session=BrowserSession(browser_profile=BrowserProfile(headless=True), user_data_dir=None),
+		enable_memory=False,
+	)
+
+	history = await agent.run(max_steps=5)
+
+	assert history is agent.state.history
+	assert history.number_of_steps() == 2
+	assert [item.metadata.step_number for item in history.history if item.metadata] == [1, 2]
+	assert history.is_done() and history.final_result() == 'finished'
@@ -5,6 +5,7 @@ import pytest
 from pytest_httpserver import HTTPServer
 
 from browser_use.browser import BrowserProfile, BrowserSession
+from browser_use.browser.views import screenshot_mime_type
 from browser_use.dom.views import DOMElementNode
 
 
@@ -155,6 +156,29 @@ class TestBrowserContext:
 		)
 		assert actual_selector == expected_selector, f'Expected {expected_selector}, but got {actual_selector}'
 
+	def test_enhanced_css_selector_is_memoized(self):
+		"""
+		Test that the selector of an element is built once for each include_dynamic_attributes value.
+		"""
+		element = DOMElementNode(
+			tag_name='button',
+			is_visible=True,
+			parent=None,
+			xpath='/html/body/form/button[3]',
+			attributes={'class': 'btn', 'type': 'submit', 'data-testid': 'save'},
+			children=[],
+		)
+
+		with_dynamic = BrowserSession._enhanced_css_selector_for_element(element, include_dynamic_attributes=True)
+		without_dynamic = BrowserSession._enhanced_css_selector_for_element(element, include_dynamic_attributes=False)
+		assert with_dynamic == 'html > body > form > button:nth-of-type(3).btn[type="submit"][data-testid="save"]'
+		assert without_dynamic == 'html > body > form > button:nth-of-type(3)[type="submit"]'
+
+		# later changes of the node don't show, the selector is computed once per node
+		element.attributes['type'] = 'button'
+		assert BrowserSession._enhanced_css_selector_for_element(element, include_dynamic_attributes=True) is with_dynamic
+		assert BrowserSession._enhanced_css_selector_for_element(element, include_dynamic_attributes=False) is without_dynamic
+
 	@pytest.mark.asyncio
 	async def test_navigate_and_get_current_page(self, browser_session, base_url):
 		"""Test that navigate method changes the URL and get_current_page returns the proper page."""
@@ -259,6 +283,85 @@ class TestBrowserContext:
 		except Exception as e:
 			pytest.fail(f'Failed to decode screenshot as base64: {e}')
 
+	@pytest.mark.asyncio
+	async def test_take_screenshot_format_and_size(self, browser_session, base_url):
+		"""Test that the screenshot format, maximum size and clip are applied."""
+		await browser_session.navigate(f'{base_url}/')
+		page = await browser_session.get_current_page()
+		profile = browser_session.browser_profile
+
+		async def image_size(screenshot_base64):
+			return await page.evaluate(
+				"""async (url) => {
+					const image = new Image();
+					image.src = url;
+					await image.decode();
+					return [image.naturalWidth, image.naturalHeight];
+				}""",
+				f'data:{screenshot_mime_type(screenshot_base64)};base64,{screenshot_base64}',
+			)
+
+		try:
+			profile.screenshot_format = 'webp'
+			profile.screenshot_max_dimension = 200
+			screenshot_base64 = await browser_session.take_screenshot()
+			assert base64.b64decode(screenshot_base64)[8:12] == b'WEBP'
+			assert max(await image_size(screenshot_base64)) == 200
+
+			profile.screenshot_format = 'jpeg'
+			profile.screenshot_quality = 50
+			profile.screenshot_max_dimension = None
+			screenshot_base64 = await browser_session.take_screenshot(clip={'x': 10, 'y': 10, 'width': 100, 'height': 50})
+			assert screenshot_mime_type(screenshot_base64) == 'image/jpeg'
+			width, height = await image_size(screenshot_base64)
+			assert width == 2 * height
+		finally:
+			profile.screenshot_format = 'png'
+			profile.screenshot_quality = None
+			profile.screenshot_max_dimension = None
+
+	@pytest.mark.asyncio
+	async def test_get_state_summary_timings(self, browser_session, base_url):
+		"""Test that the state summary is captured concurrently and reports the time spent on each part."""
+		await browser_session.navigate(f'{base_url}/scroll_test')
+		await browser_session.execute_javascript('window.scrollBy(0, 500)')
+		await asyncio.sleep(0.2)
+
+		state = await browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+
+		assert state.pixels_above >= 400
+		assert state.screenshot
+		assert len(state.tabs) >= 1
+		assert set(state.timings) == {'remove_highlights', 'dom', 'screenshot', 'tabs', 'scroll_info', 'title', 'total'}
+		# the DOM and the screenshot are captured one after the other, the rest alongside them
+		assert state.timings['total'] >= state.timings['dom'] + state.timings['screenshot']
+
+	@pytest.mark.asyncio
+	async def test_prefetched_state_summary(self, browser_session, base_url):
+		"""Test that a prefetched state is used only while the page is unchanged since it was extracted."""
+		await browser_session.navigate(f'{base_url}/scroll_test')
+
+		browser_session.prefetch_state_summary()
+		prefetch_task = browser_session._state_prefetch.task
+		state = await browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+		assert state is prefetch_task.result()
+		assert browser_session._state_prefetch is None
+
+		# the page scrolled after the state was prefetched
+		browser_session.prefetch_state_summary()
+		prefetched_state = await browser_session._state_prefetch.task
+		await browser_session.execute_javascript('window.scrollBy(0, 500)')
+		state = await browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+		assert state is not prefetched_state
+		assert state.pixels_above >= 400
+
+		# an action that may change the page ran after the state was prefetched
+		browser_session.prefetch_state_summary()
+		prefetched_state = await browser_session._state_prefetch.task
+		browser_session.mark_page_possibly_changed()
+		state = await browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+		assert state is not prefetched_state
+
 	@pytest.mark.asyncio
 	async def test_switch_tab_operations(self, browser_session, base_url):
 		"""Test tab creation, switching, and closing operations."""
@@ -13,6 +13,7 @@ from browser_use.controller.views import (
 	CloseTabAction,
 	DoneAction,
 	DragDropAction,
+	FillFormAction,
 	GoToUrlAction,
 	InputTextAction,
 	NoParamsAction,
@@ -1250,3 +1251,132 @@ class TestControllerIntegration:
 		# Verify the click actually had an effect on the page
 		result_text = await page.evaluate("document.getElementById('result').textContent")
 		assert result_text == expected_result_text, f"Expected result text '{expected_result_text}', got '{result_text}'"
+
+	@pytest.mark.asyncio
+	async def test_fill_form_action(self, controller, browser_session, base_url, http_server):
+		"""Test that fill_form fills text fields, checkboxes and dropdowns in one action and reports each field."""
+		http_server.expect_request('/form').respond_with_data(
+			"""
+			<!DOCTYPE html>
+			<html>
+			<head><title>Form Test</title></head>
+			<body>
+				<form>
+					<input type="text" id="name" name="name">
+					<textarea id="bio" name="bio"></textarea>
+					<input type="checkbox" id="subscribe" name="subscribe">
+					<select id="country" name="country">
+						<option value="">Choose</option>
+						<option value="fr">France</option>
+						<option value="jp">Japan</option>
+					</select>
+				</form>
+				<div id="events"></div>
+				<script>
+					document.getElementById('name').addEventListener('change', () => {
+						document.getElementById('events').textContent += 'name changed;';
+					});
+				</script>
+			</body>
+			</html>
+			""",
+			content_type='text/html',
+		)
+
+		class GoToUrlActionModel(ActionModel):
+			go_to_url: GoToUrlAction | None = None
+
+		await controller.act(GoToUrlActionModel(go_to_url=GoToUrlAction(url=f'{base_url}/form')), browser_session)
+		page = await browser_session.get_current_page()
+		await page.wait_for_load_state()
+
+		await browser_session.get_state_summary(cache_clickable_elements_hashes=True)
+		selector_map = await browser_session.get_selector_map()
+		indexes = {element.attributes.get('id'): index for index, element in selector_map.items()}
+		missing_index = max(selector_map) + 100
+
+		class FillFormActionModel(ActionModel):
+			fill_form: FillFormAction | None = None
+
+		fields = [
+			{'index': indexes['name'], 'value': 'Jane Doe'},
+			{'index': indexes['bio'], 'value': 'Hello'},
+			{'index': indexes['subscribe'], 'value': 'true'},
+			{'index': indexes['country'], 'value': 'Japan'},
+			{'index': missing_index, 'value': 'ignored'},
+		]
+		result = await controller.act(FillFormActionModel(fill_form={'fields': fields}), browser_session)
+
+		assert result.error is None, f'Expected no error but got: {result.error}'
+		assert f'Input Jane Doe into index {indexes["name"]}' in result.extracted_content
+		assert f'Failed to fill index {missing_index}' in result.extracted_content
+
+		values = await page.evaluate(
+			"""() => ({
+				name: document.getElementById('name').value,
+				bio: document.getElementById('bio').value,
+				subscribe: document.getElementById('subscribe').checked,
+				country: document.getElementById('country').value,
+				events: document.getElementById('events').textContent,
+			})"""
+		)
+		assert values == {'name': 'Jane Doe', 'bio': 'Hello', 'subscribe': True, 'country': 'jp', 'events': 'name changed;'}
+
+		# the only field doesn't exist, the action fails
+		result = await controller.act(
+			FillFormActionModel(fill_form={'fields': [{'index': missing_index, 'value': 'ignored'}]}), browser_session
+		)
+		assert result.error is not None and f'Failed to fill index {missing_index}' in result.error
+
+	@pytest.mark.asyncio
+	async def test_fill_form_reports_errors_per_field(self, controller, browser_session, base_url, http_server):
+		"""Test that fill_form fills subclassed inputs and that a field that throws doesn't fail the other fields."""
+		http_server.expect_request('/custom-form').respond_with_data(
+			"""
+			<!DOCTYPE html>
+			<html>
+			<head><title>Custom Form Test</title></head>
+			<body>
+				<script>
+					customElements.define('fancy-input', class extends HTMLInputElement {}, { extends: 'input' });
+				</script>
+				<form>
+					<input type="text" id="fancy" name="fancy" is="fancy-input">
+					<input type="text" id="broken" name="broken">
+					<input type="text" id="plain" name="plain">
+				</form>
+				<script>
+					document.getElementById('broken').focus = () => { throw new Error('broken field'); };
+				</script>
+			</body>
+			</html>
+			""",
+			content_type='text/html',
+		)
+
+		class GoToUrlActionModel(ActionModel):
+			go_to_url: GoToUrlAction | None = None
+
+		await controller.act(GoToUrlActionModel(go_to_url=GoToUrlAction(url=f'{base_url}/custom-form')), browser_session)
+		page = await browser_session.get_current_page()
+		await page.wait_for_load_state()
+
+		await browser_session.get_state_summary(cache_clickable_elements_hashes=True)
+		selector_map = await browser_session.get_selector_map()
+		indexes = {element.attributes.get('id'): index for index, element in selector_map.items()}
+
+		class FillFormActionModel(ActionModel):
+			fill_form: FillFormAction | None = None
+
+		fields = [
+			{'index': indexes['fancy'], 'value': 'Fancy'},
+			{'index': indexes['broken'], 'value': 'Broken'},
+			{'index': indexes['plain'], 'value': 'Plain'},
+		]
+		result = await controller.act(FillFormActionModel(fill_form={'fields': fields}), browser_session)
+
+		assert result.error is None, f'Expected no error but got: {result.error}'
+		assert f'Failed to fill index {indexes["broken"]}' in result.extracted_content
+		assert 'broken field' in result.extracted_content
+		values = await page.evaluate("() => ['fancy', 'broken', 'plain'].map(id => document.getElementById(id).value)")
+		assert values == ['Fancy', '', 'Plain']
@@ -0,0 +1,62 @@
+"""
+Tests for the element hashes shared by the HistoryTreeProcessor and the ClickableElementProcessor.
+"""
+
+from browser_use.dom.clickable_element_processor.service import ClickableElementProcessor
+from browser_use.dom.history_tree_processor.service import HistoryTreeProcessor
+from browser_use.dom.history_tree_processor.view import DOMHistoryElement
+from browser_use.dom.views import DOMElementNode
+
+
+def element(tag_name: str, parent: DOMElementNode | None, highlight_index: int | None = None, **attributes) -> DOMElementNode:
+	node = DOMElementNode(
+		tag_name=tag_name,
+		xpath=f'{parent.xpath}/{tag_name}' if parent else '',
+		attributes=attributes,
+		children=[],
+		is_visible=True,
+		highlight_index=highlight_index,
+		parent=parent,
+	)
+	if parent is not None:
+		parent.children.append(node)
+	return node
+
+
+def history_element(dom_element: DOMElementNode) -> DOMHistoryElement:
+	return DOMHistoryElement(
+		dom_element.tag_name,
+		dom_element.xpath,
+		dom_element.highlight_index,
+		HistoryTreeProcessor._get_parent_branch_path(dom_element),
+		dom_element.attributes,
+	)
+
+
+def test_branch_path_hash_matches_the_history_element():
+	body = element('body', None)
+	form = element('form', element('div', body))
+	button = element('button', form, highlight_index=1, type='submit')
+	link = element('a', element('div', body), highlight_index=2, href='/next')
+
+	# hash the deeper element first, its parents' digests are then reused for the sibling
+	assert HistoryTreeProcessor.compare_history_element_and_dom_element(history_element(button), button)
+	assert HistoryTreeProcessor.compare_history_element_and_dom_element(history_element(link), link)
+	assert form._branch_path_digest is not None
+
+	assert button.hash.branch_path_hash == HistoryTreeProcessor._parent_branch_path_hash(['div', 'form', 'button'])
+	assert link.hash.branch_path_hash == HistoryTreeProcessor._parent_branch_path_hash(['div', 'a'])
+	assert button.hash.branch_path_hash != link.hash.branch_path_hash
+
+	assert HistoryTreeProcessor.find_history_element_in_tree(history_element(link), body) is link
+
+
+def test_clickable_element_hashes_reuse_the_element_hash():
+	body = element('body', None)
+	first = element('button', body, highlight_index=1, name='a')
+	second = element('button', body, highlight_index=2, name='b')
+
+	hashes = ClickableElementProcessor.get_clickable_elements_hashes(body)
+	assert hashes == {ClickableElementProcessor.hash_dom_element(first), ClickableElementProcessor.hash_dom_element(second)}
+	assert len(hashes) == 2
+	assert ClickableElementProcessor.hash_dom_element(first).startswith(first.hash.branch_path_hash)
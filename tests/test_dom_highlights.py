@@ -0,0 +1,73 @@
+"""
+Tests for the highlight overlays drawn by buildDomTree.js once the DOM walk is done.
+"""
+
+import pytest
+from pytest_httpserver import HTTPServer
+
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.session import BrowserSession
+from browser_use.dom.service import DomService
+
+
+@pytest.fixture
+def http_server():
+	server = HTTPServer()
+	server.start()
+	server.expect_request('/form').respond_with_data(
+		f"""
+		<html><body>
+			<button id="wrapped" style="display: inline">Multi<br>line</button>
+			{''.join(f'<p><a href="/item/{i}">Item {i}</a></p>' for i in range(50))}
+			<iframe srcdoc="<button>Inside the frame</button>" style="margin-top: 30px"></iframe>
+		</body></html>
+		""",
+		content_type='text/html',
+	)
+	yield server
+	server.stop()
+
+
+@pytest.fixture
+async def browser_session():
+	browser_session = BrowserSession(browser_profile=BrowserProfile(headless=True), user_data_dir=None)
+	await browser_session.start()
+	yield browser_session
+	await browser_session.stop()
+
+
+async def test_highlights_are_drawn_after_the_walk(browser_session: BrowserSession, http_server: HTTPServer):
+	await browser_session.navigate(http_server.url_for('/form'))
+	page = await browser_session.get_current_page()
+	await page.wait_for_function('document.querySelector("iframe").contentDocument?.querySelector("button")')
+
+	state = await DomService(page).get_clickable_elements(highlight_elements=True, viewport_expansion=-1)
+
+	labels = await page.evaluate(
+		"""() => Array.from(
+			document.querySelectorAll('#playwright-highlight-container .playwright-highlight-label'),
+			label => Number(label.textContent),
+		)"""
+	)
+	assert sorted(labels) == sorted(state.selector_map)
+	# all highlights of a call share a single scroll/resize listener
+	assert await page.evaluate('window._highlightCleanupFunctions.length') == 1
+
+	# the label of the element in the iframe is offset by the iframe's position
+	frame_button = next(
+		index
+		for index, element in state.selector_map.items()
+		if element.get_all_text_till_next_clickable_element() == 'Inside the frame'
+	)
+	label_top, iframe_top = await page.evaluate(
+		"""(index) => [
+			Array.from(document.querySelectorAll('.playwright-highlight-label')).find(label => label.textContent == index).getBoundingClientRect().top,
+			document.querySelector('iframe').getBoundingClientRect().top,
+		]""",
+		frame_button,
+	)
+	assert label_top >= iframe_top - 20
+
+	await browser_session.remove_highlights()
+	assert await page.evaluate('window._highlightCleanupFunctions.length') == 0
+	assert await page.evaluate('document.getElementById("playwright-highlight-container")') is None
@@ -0,0 +1,78 @@
+"""
+Tests for extracting cross-origin iframes (BrowserProfile(include_cross_origin_iframes=True)).
+
+The page is served from 127.0.0.1 and its iframes from localhost, which makes them cross-origin.
+"""
+
+import pytest
+from pytest_httpserver import HTTPServer
+
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.session import BrowserSession
+from browser_use.dom.service import FRAME_HIGHLIGHT_INDEX_STRIDE
+
+
+@pytest.fixture
+def http_server():
+	server = HTTPServer(host='127.0.0.1')
+	server.start()
+	frame_url = f'http://localhost:{server.port}'
+	server.expect_request('/checkout').respond_with_data(
+		f"""
+		<html><body>
+			<button id="back">Back to cart</button>
+			<iframe id="payment" src="{frame_url}/payment" style="width: 400px; height: 300px"></iframe>
+			<iframe id="hidden" src="{frame_url}/tracker" style="display: none"></iframe>
+		</body></html>
+		""",
+		content_type='text/html',
+	)
+	server.expect_request('/payment').respond_with_data(
+		"""
+		<html><body>
+			<input id="card" placeholder="Card number">
+			<button id="pay" onclick="document.title = 'paid'">Pay now</button>
+		</body></html>
+		""",
+		content_type='text/html',
+	)
+	server.expect_request('/tracker').respond_with_data('<html><body><a href="/x">Tracker</a></body></html>')
+	yield server
+	server.stop()
+
+
+@pytest.fixture
+async def browser_session():
+	browser_session = BrowserSession(
+		browser_profile=BrowserProfile(headless=True, include_cross_origin_iframes=True), user_data_dir=None
+	)
+	await browser_session.start()
+	yield browser_session
+	await browser_session.stop()
+
+
+async def test_cross_origin_iframe_elements_are_in_the_selector_map(browser_session: BrowserSession, http_server: HTTPServer):
+	await browser_session.navigate(http_server.url_for('/checkout'))
+
+	state = await browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+	elements = {element.attributes.get('id'): element for element in state.selector_map.values()}
+
+	assert set(elements) == {'back', 'card', 'pay'}
+	assert elements['back'].highlight_index < FRAME_HIGHLIGHT_INDEX_STRIDE
+	assert elements['card'].highlight_index >= FRAME_HIGHLIGHT_INDEX_STRIDE
+	assert elements['pay'].highlight_index >= FRAME_HIGHLIGHT_INDEX_STRIDE
+
+	# the frame's tree hangs below its iframe element, so the element can be located and clicked through it
+	iframe = elements['pay'].parent
+	while iframe is not None and iframe.tag_name != 'iframe':
+		iframe = iframe.parent
+	assert iframe is not None and iframe.attributes.get('id') == 'payment'
+
+	await browser_session._click_element_node(elements['pay'])
+	page = await browser_session.get_current_page()
+	payment_frame = next(frame for frame in page.frames if frame.url.endswith('/payment'))
+	assert await payment_frame.title() == 'paid'
+
+	# the frames are attached again on the next step, not twice
+	state = await browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+	assert sorted(element.attributes.get('id') for element in state.selector_map.values()) == ['back', 'card', 'pay']
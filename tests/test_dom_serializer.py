@@ -0,0 +1,178 @@
+"""
+Tests for DOMElementNode.clickable_elements_to_string and get_all_text_till_next_clickable_element.
+
+Both are checked against the previous recursive implementations (kept below as the reference)
+on random trees, and must produce byte-identical output.
+"""
+
+import random
+
+from browser_use.dom.views import DOMBaseNode, DOMElementNode, DOMTextNode
+
+INCLUDE_ATTRIBUTES = ['title', 'type', 'name', 'role', 'aria-label', 'placeholder', 'value']
+
+
+def reference_get_all_text(element: DOMElementNode, max_depth: int = -1) -> str:
+	text_parts = []
+
+	def collect_text(node: DOMBaseNode, current_depth: int) -> None:
+		if max_depth != -1 and current_depth > max_depth:
+			return
+
+		if isinstance(node, DOMElementNode) and node is not element and node.highlight_index is not None:
+			return
+
+		if isinstance(node, DOMTextNode):
+			text_parts.append(node.text)
+		elif isinstance(node, DOMElementNode):
+			for child in node.children:
+				collect_text(child, current_depth + 1)
+
+	collect_text(element, 0)
+	return '\n'.join(text_parts).strip()
+
+
+def reference_clickable_elements_to_string(element: DOMElementNode, include_attributes: list[str] | None = None) -> str:
+	formatted_text = []
+
+	def process_node(node: DOMBaseNode, depth: int) -> None:
+		next_depth = int(depth)
+		depth_str = depth * '\t'
+
+		if isinstance(node, DOMElementNode):
+			if node.highlight_index is not None:
+				next_depth += 1
+
+				text = reference_get_all_text(node)
+				attributes_html_str = ''
+				if include_attributes:
+					attributes_to_include = {
+						key: str(value) for key, value in node.attributes.items() if key in include_attributes
+					}
+					if node.tag_name == attributes_to_include.get('role'):
+						del attributes_to_include['role']
+					if (
+						attributes_to_include.get('aria-label')
+						and attributes_to_include.get('aria-label', '').strip() == text.strip()
+					):
+						del attributes_to_include['aria-label']
+					if (
+						attributes_to_include.get('placeholder')
+						and attributes_to_include.get('placeholder', '').strip() == text.strip()
+					):
+						del attributes_to_include['placeholder']
+					if attributes_to_include:
+						attributes_html_str = ' '.join(f"{key}='{value}'" for key, value in attributes_to_include.items())
+
+				if node.is_new:
+					highlight_indicator = f'*[{node.highlight_index}]*'
+				else:
+					highlight_indicator = f'[{node.highlight_index}]'
+
+				line = f'{depth_str}{highlight_indicator}<{node.tag_name}'
+				if attributes_html_str:
+					line += f' {attributes_html_str}'
+				if text:
+					if not attributes_html_str:
+						line += ' '
+					line += f'>{text}'
+				elif not attributes_html_str:
+					line += ' '
+				line += ' />'
+				formatted_text.append(line)
+
+			for child in node.children:
+				process_node(child, next_depth)
+
+		elif isinstance(node, DOMTextNode):
+			if (
+				not node.has_parent_with_highlight_index()
+				and node.parent
+				and node.parent.is_visible
+				and node.parent.is_top_element
+			):
+				formatted_text.append(f'{depth_str}{node.text}')
+
+	process_node(element, 0)
+	return '\n'.join(formatted_text)
+
+
+def random_tree(rng: random.Random, nodes: int) -> tuple[DOMElementNode, list[DOMElementNode]]:
+	"""A random tree with a mix of highlighted, hidden and nested elements and text nodes"""
+	root = DOMElementNode(
+		tag_name='body', xpath='/body', attributes={}, children=[], is_visible=True, is_top_element=True, parent=None
+	)
+	elements = [root]
+	words = ['Submit', ' Search ', 'menu', '', 'Open results', '  ', 'Next page']
+	highlight_index = 0
+	for _ in range(nodes):
+		parent = rng.choice(elements[-20:] if rng.random() < 0.7 else elements)
+		if rng.random() < 0.4:
+			parent.children.append(DOMTextNode(text=rng.choice(words), is_visible=rng.random() < 0.9, parent=parent))
+			continue
+
+		text = rng.choice(words)
+		attributes = {
+			key: rng.choice([text, 'button', 'input', 'x'])
+			for key in rng.sample(INCLUDE_ATTRIBUTES + ['class', 'id'], rng.randint(0, 4))
+		}
+		element = DOMElementNode(
+			tag_name=rng.choice(['div', 'span', 'button', 'input', 'a']),
+			xpath='',
+			attributes=attributes,
+			children=[],
+			is_visible=rng.random() < 0.9,
+			is_top_element=rng.random() < 0.8,
+			highlight_index=highlight_index if rng.random() < 0.3 else None,
+			is_new=rng.choice([None, False, True]),
+			parent=parent,
+		)
+		if element.highlight_index is not None:
+			highlight_index += 1
+		parent.children.append(element)
+		elements.append(element)
+	return root, elements
+
+
+def test_matches_the_recursive_implementation():
+	rng = random.Random(0)
+	for _ in range(200):
+		root, elements = random_tree(rng, rng.randint(1, 120))
+		include_attributes = rng.choice([None, [], INCLUDE_ATTRIBUTES])
+		assert root.clickable_elements_to_string(include_attributes) == reference_clickable_elements_to_string(
+			root, include_attributes
+		)
+
+		# serializing a subtree takes the highlighted elements above it into account
+		element = rng.choice(elements)
+		assert element.clickable_elements_to_string(include_attributes) == reference_clickable_elements_to_string(
+			element, include_attributes
+		)
+
+		max_depth = rng.choice([-1, 0, 1, 2, 5])
+		assert element.get_all_text_till_next_clickable_element(max_depth) == reference_get_all_text(element, max_depth)
+
+
+def test_very_deep_tree_does_not_hit_the_recursion_limit():
+	root = DOMElementNode(
+		tag_name='body', xpath='/body', attributes={}, children=[], is_visible=True, is_top_element=True, parent=None
+	)
+	parent = root
+	for i in range(20_000):
+		element = DOMElementNode(
+			tag_name='div',
+			xpath='',
+			attributes={},
+			children=[],
+			is_visible=True,
+			is_top_element=True,
+			highlight_index=0 if i == 10_000 else None,
+			parent=parent,
+		)
+		parent.children.append(element)
+		parent = element
+	parent.children.append(DOMTextNode(text='deep', is_visible=True, parent=parent))
+
+	output = root.clickable_elements_to_string()
+	assert output == '[0]<div >deep />'
+	assert root.get_all_text_till_next_clickable_element() == ''
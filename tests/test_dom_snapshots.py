@@ -0,0 +1,145 @@
+"""
+Tests for patching incremental DOM snapshots (DomService with incremental=True).
+
+The maps below mimic what buildDomTree.js returns for a full walk and for the deltas
+computed from its MutationObserver records.
+"""
+
+from browser_use.dom.service import DomService, DOMSnapshot
+from browser_use.dom.views import DOMElementNode
+
+
+def full_walk_result() -> dict:
+	return {
+		'snapshotId': 'snapshot-1',
+		'rootId': '4',
+		'map': {
+			'0': {'type': 'TEXT_NODE', 'text': 'Submit', 'isVisible': True},
+			'1': {
+				'tagName': 'button',
+				'xpath': 'html/body/button',
+				'attributes': {'id': 'submit'},
+				'children': ['0'],
+				'isVisible': True,
+				'isTopElement': True,
+				'isInteractive': True,
+				'isInViewport': True,
+				'highlightIndex': 0,
+			},
+			'2': {'type': 'TEXT_NODE', 'text': 'Loading...', 'isVisible': True},
+			'3': {
+				'tagName': 'div',
+				'xpath': 'html/body/div',
+				'attributes': {},
+				'children': ['2'],
+				'isVisible': True,
+				'isTopElement': True,
+			},
+			'4': {'tagName': 'body', 'xpath': '/body', 'attributes': {}, 'children': ['1', '3']},
+		},
+	}
+
+
+def make_snapshot(dom_service: DomService) -> DOMSnapshot:
+	eval_page = full_walk_result()
+	node_map, selector_map = dom_service._parse_node_map(eval_page['map'])
+	root = node_map[eval_page['rootId']]
+	assert isinstance(root, DOMElementNode)
+	dom_service.snapshot = DOMSnapshot(
+		snapshot_id=eval_page['snapshotId'],
+		url='http://example.com',
+		element_tree=root,
+		selector_map=selector_map,
+		node_map=node_map,
+	)
+	return dom_service.snapshot
+
+
+def test_patch_replaces_changed_subtree():
+	dom_service = DomService(page=None)  # type: ignore
+	snapshot = make_snapshot(dom_service)
+	button = snapshot.selector_map[0]
+
+	delta = {
+		'snapshotId': 'snapshot-1',
+		'patches': [{'replaceId': '3', 'rootId': '7'}],
+		'map': {
+			'5': {'type': 'TEXT_NODE', 'text': 'Open results', 'isVisible': True},
+			'6': {
+				'tagName': 'a',
+				'xpath': 'html/body/div/a',
+				'attributes': {'href': '/results'},
+				'children': ['5'],
+				'isVisible': True,
+				'isTopElement': True,
+				'isInteractive': True,
+				'isInViewport': True,
+				'highlightIndex': 1,
+			},
+			'7': {
+				'tagName': 'div',
+				'xpath': 'html/body/div',
+				'attributes': {},
+				'children': ['6'],
+				'isVisible': True,
+				'isTopElement': True,
+			},
+		},
+	}
+
+	result = dom_service._apply_snapshot_delta(delta)
+	assert result is not None
+	element_tree, selector_map = result
+
+	assert element_tree is snapshot.element_tree
+	assert list(selector_map) == [0, 1]
+	# unchanged elements keep their node objects (and their cached hashes)
+	assert selector_map[0] is button
+	assert selector_map[1].parent is element_tree.children[1]
+	assert element_tree.clickable_elements_to_string() == '[0]<button >Submit />\n[1]<a >Open results />'
+
+
+def test_patch_removes_subtree_and_its_indexes():
+	dom_service = DomService(page=None)  # type: ignore
+	make_snapshot(dom_service)
+
+	delta = {'snapshotId': 'snapshot-1', 'patches': [{'replaceId': '1', 'rootId': None}], 'map': {}}
+
+	result = dom_service._apply_snapshot_delta(delta)
+	assert result is not None
+	element_tree, selector_map = result
+
+	assert selector_map == {}
+	assert [child.tag_name for child in element_tree.children if isinstance(child, DOMElementNode)] == ['div']
+
+
+def test_returned_selector_map_is_a_copy():
+	dom_service = DomService(page=None)  # type: ignore
+	snapshot = make_snapshot(dom_service)
+
+	result = dom_service._apply_snapshot_delta({'snapshotId': 'snapshot-1', 'unchanged': True})
+	assert result is not None
+	element_tree, selector_map = result
+
+	assert element_tree is snapshot.element_tree
+	selector_map.clear()
+	assert list(snapshot.selector_map) == [0]
+
+
+def test_mismatched_delta_is_rejected_without_touching_the_tree():
+	dom_service = DomService(page=None)  # type: ignore
+	snapshot = make_snapshot(dom_service)
+	before = snapshot.element_tree.clickable_elements_to_string()
+
+	# first patch is valid, the second refers to a node the snapshot never had
+	delta = {
+		'snapshotId': 'snapshot-1',
+		'patches': [{'replaceId': '1', 'rootId': None}, {'replaceId': '42', 'rootId': None}],
+		'map': {},
+	}
+	assert dom_service._apply_snapshot_delta(delta) is None
+	assert dom_service._apply_snapshot_delta({'snapshotId': 'other-page', 'unchanged': True}) is None
+
+	assert snapshot.element_tree.clickable_elements_to_string() == before
+	assert list(snapshot.selector_map) == [0]
+	assert snapshot.patch_count == 0
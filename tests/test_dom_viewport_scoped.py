@@ -0,0 +1,71 @@
+"""
+Tests for viewport-scoped DOM extraction (BrowserProfile(viewport_scoped_dom=True)).
+"""
+
+import pytest
+from pytest_httpserver import HTTPServer
+
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.session import BrowserSession
+from browser_use.dom.service import DomService
+
+FEED_ITEMS = 2000
+
+FEED_PAGE = f"""
+<html>
+<head><title>Feed</title></head>
+<body style="margin: 0">
+	<header style="position: fixed; top: 0; left: 0; right: 0; height: 40px; background: white; z-index: 10">
+		<button id="menu">Menu</button>
+	</header>
+	<main style="padding-top: 40px">
+		<section>
+			<div style="position: sticky; top: 40px; background: white"><a href="/filters">Filters</a></div>
+			{''.join(f'<article style="height: 60px"><p>Post {i}</p><button>Like {i}</button></article>' for i in range(FEED_ITEMS))}
+		</section>
+	</main>
+	<div id="offscreen-parent" style="position: absolute; top: 100000px">
+		<button id="popup" style="position: fixed; bottom: 10px; right: 10px; width: 200px; height: 80px">Chat with us</button>
+	</div>
+</body>
+</html>
+"""
+
+
+@pytest.fixture
+def http_server():
+	server = HTTPServer()
+	server.start()
+	server.expect_request('/feed').respond_with_data(FEED_PAGE, content_type='text/html')
+	yield server
+	server.stop()
+
+
+@pytest.fixture
+async def browser_session():
+	browser_session = BrowserSession(browser_profile=BrowserProfile(headless=True), user_data_dir=None)
+	await browser_session.start()
+	yield browser_session
+	await browser_session.stop()
+
+
+async def test_viewport_scoped_extraction_finds_the_same_elements(browser_session: BrowserSession, http_server: HTTPServer):
+	await browser_session.navigate(http_server.url_for('/feed'))
+	page = await browser_session.get_current_page()
+	await page.evaluate('window.scrollTo(0, 30000)')
+
+	full = await DomService(page).get_clickable_elements(highlight_elements=False, viewport_expansion=500)
+	scoped = await DomService(page).get_clickable_elements(highlight_elements=False, viewport_expansion=500, viewport_scoped=True)
+
+	assert scoped.element_tree.clickable_elements_to_string() == full.element_tree.clickable_elements_to_string()
+	texts = [element.get_all_text_till_next_clickable_element() for element in scoped.selector_map.values()]
+	# the fixed header, the sticky filter bar and the fixed popup of an off-screen parent are all kept
+	assert {'Menu', 'Filters', 'Chat with us'} <= set(texts)
+	assert 'Like 500' in texts
+	assert 'Like 0' not in texts
+
+	def count_nodes(node) -> int:
+		return 1 + sum(count_nodes(child) for child in getattr(node, 'children', []))
+
+	# the feed items far outside the viewport are not walked at all
+	assert count_nodes(scoped.element_tree) < count_nodes(full.element_tree) / 10
@@ -0,0 +1,129 @@
+"""
+Tests for decoding the packed DOM map of buildDomTree.js (wireFormat: 'packed'),
+and for building the tree from it in a worker thread.
+
+The packed strings below are what packNodeMap() in buildDomTree.js produces for the
+equivalent unpacked maps next to them.
+"""
+
+import json
+
+from browser_use.dom.service import DomService, DOMSnapshot
+from browser_use.dom.views import DOMBaseNode, DOMElementNode
+
+NODE_MAP = {
+	'0': {'type': 'TEXT_NODE', 'text': 'Submit', 'isVisible': True},
+	'1': {
+		'tagName': 'button',
+		'xpath': 'html/body/button',
+		'attributes': {'id': 'submit', 'class': 'x'},
+		'children': ['0'],
+		'isVisible': True,
+		'isTopElement': True,
+		'isInteractive': True,
+		'isInViewport': True,
+		'highlightIndex': 0,
+	},
+	'2': {'type': 'TEXT_NODE', 'text': 'Loading...', 'isVisible': True},
+	'3': {
+		'tagName': 'div',
+		'xpath': 'html/body/div',
+		'attributes': {},
+		'children': ['2'],
+		'isVisible': True,
+		'isTopElement': True,
+	},
+	'4': {'tagName': 'body', 'xpath': 'html/body', 'attributes': {}, 'children': ['1', '3']},
+}
+
+PACKED_NODE_MAP = json.dumps(
+	{
+		'base': 0,
+		'strings': ['Submit', 'button', 'id', 'submit', 'class', 'x', 'Loading...', 'div', 'html/body', 'body'],
+		'flags': [33, 79, 33, 69, 0],
+		'tags': [-1, 1, -1, 7, 9],
+		'values': [0, 1, 6, 7, 8],
+		'parents': [1, 4, 3, 4, -1],
+		'attributes': [1, 2, 3, 1, 4, 5],
+		'highlights': [1, 0],
+	}
+)
+
+
+def dump(node: DOMBaseNode) -> tuple:
+	parent_tag = node.parent.tag_name if node.parent else None
+	if isinstance(node, DOMElementNode):
+		return (
+			node.tag_name,
+			node.xpath,
+			node.attributes,
+			node.is_visible,
+			node.is_interactive,
+			node.is_top_element,
+			node.is_in_viewport,
+			node.highlight_index,
+			node.shadow_root,
+			parent_tag,
+			[dump(child) for child in node.children],
+		)
+	return (node.text, node.is_visible, parent_tag)  # type: ignore
+
+
+def test_packed_map_decodes_like_the_json_map():
+	dom_service = DomService(page=None)  # type: ignore
+	json_nodes, json_selector_map = dom_service._parse_node_map(NODE_MAP)
+	packed_nodes, packed_selector_map = dom_service._parse_packed_node_map(PACKED_NODE_MAP)
+
+	assert list(packed_nodes) == list(json_nodes)
+	assert dump(packed_nodes['4']) == dump(json_nodes['4'])
+	assert list(packed_selector_map) == list(json_selector_map) == [0]
+	assert packed_selector_map[0] is packed_nodes['1']
+
+
+def test_packed_delta_patches_the_snapshot():
+	dom_service = DomService(page=None)  # type: ignore
+	node_map, selector_map = dom_service._parse_packed_node_map(PACKED_NODE_MAP)
+	root = node_map['4']
+	assert isinstance(root, DOMElementNode)
+	dom_service.snapshot = DOMSnapshot(
+		snapshot_id='snapshot-1',
+		url='http://example.com',
+		element_tree=root,
+		selector_map=selector_map,
+		node_map=node_map,
+	)
+
+	# the div (id 3) was re-walked into ids 5-7, its xpath is relative to the div as it's in the delta too
+	packed_delta = json.dumps(
+		{
+			'base': 5,
+			'strings': ['Open results', 'a', 'href', '/results', 'html/body/div', 'div'],
+			'flags': [33, 79, 5],
+			'tags': [-1, 1, 5],
+			'values': [0, 1, 4],
+			'parents': [1, 2, -1],
+			'attributes': [1, 2, 3],
+			'highlights': [1, 1],
+		}
+	)
+	result = dom_service._apply_snapshot_delta(
+		{'snapshotId': 'snapshot-1', 'patches': [{'replaceId': '3', 'rootId': '7'}], 'packedMap': packed_delta}
+	)
+	assert result is not None
+	element_tree, selector_map = result
+
+	assert list(selector_map) == [0, 1]
+	assert selector_map[1].xpath == 'html/body/div/a'
+	assert selector_map[1].attributes == {'href': '/results'}
+	assert element_tree.clickable_elements_to_string() == '[0]<button >Submit />\n[1]<a >Open results />'
+
+
+async def test_tree_constructed_in_a_thread_matches():
+	dom_service = DomService(page=None)  # type: ignore
+	for eval_page in ({'rootId': '4', 'map': NODE_MAP}, {'rootId': '4', 'packedMap': PACKED_NODE_MAP}):
+		inline_tree, inline_selector_map = await dom_service._construct_dom_tree(eval_page)
+		thread_tree, thread_selector_map = await dom_service._construct_dom_tree(eval_page, construct_in_thread=True)
+
+		assert dump(thread_tree) == dump(inline_tree)
+		assert list(thread_selector_map) == list(inline_selector_map)
+		assert thread_selector_map[0].parent is thread_tree
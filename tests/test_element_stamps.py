@@ -0,0 +1,156 @@
+"""
+Tests for how BrowserSession resolves the elements of the DOM tree for actions: by the elements buildDomTree.js
+keeps for their index, by the element stamps, and by the element handles cached by BrowserSession.get_locate_element.
+"""
+
+import pytest
+from pytest_httpserver import HTTPServer
+
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.session import BrowserSession
+from browser_use.dom.service import ELEMENT_ID_ATTRIBUTE
+
+
+@pytest.fixture
+def http_server():
+	server = HTTPServer()
+	server.start()
+	server.expect_request('/list').respond_with_data(
+		f"""
+		<html><body>
+			<div id="list">{''.join(f'<button>Item {i}</button>' for i in range(5))}</div>
+			<input id="name" name="name"> <input id="code" name="code" readonly value="ABC">
+		</body></html>
+		""",
+		content_type='text/html',
+	)
+	yield server
+	server.stop()
+
+
+@pytest.fixture
+async def browser_session():
+	browser_session = BrowserSession(
+		browser_profile=BrowserProfile(headless=True, stamp_element_ids=True, highlight_elements=False),
+		user_data_dir=None,
+	)
+	await browser_session.start()
+	yield browser_session
+	await browser_session.stop()
+
+
+async def test_elements_are_stamped_with_their_index(browser_session: BrowserSession, http_server: HTTPServer):
+	await browser_session.navigate(http_server.url_for('/list'))
+	page = await browser_session.get_current_page()
+
+	state = await browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+	stamps = await page.evaluate(
+		f"""() => Object.fromEntries(Array.from(
+			document.querySelectorAll('[{ELEMENT_ID_ATTRIBUTE}]'),
+			element => [element.getAttribute('{ELEMENT_ID_ATTRIBUTE}'), element.textContent],
+		))"""
+	)
+	assert stamps == {
+		str(index): element.get_all_text_till_next_clickable_element() for index, element in state.selector_map.items()
+	}
+
+	# the stamps of elements that are no longer highlighted are removed
+	await page.evaluate(
+		'document.querySelectorAll("button")[0].disabled = true; document.querySelectorAll("button")[0].hidden = true'
+	)
+	browser_session.mark_page_possibly_changed()
+	state = await browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+	assert await page.evaluate(f'document.querySelectorAll("[{ELEMENT_ID_ATTRIBUTE}]").length') == len(state.selector_map) == 6
+
+
+async def test_element_handles_are_reused_until_the_element_is_replaced(browser_session: BrowserSession, http_server: HTTPServer):
+	await browser_session.navigate(http_server.url_for('/list'))
+	page = await browser_session.get_current_page()
+	state = await browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+	element = next(iter(state.selector_map.values()))
+
+	handle = await browser_session.get_locate_element(element)
+	assert handle is not None
+	assert await browser_session.get_locate_element(element) is handle
+
+	# the page re-rendered the list, the element is found again by its selector
+	await page.evaluate('const list = document.getElementById("list"); list.innerHTML = list.innerHTML')
+	new_handle = await browser_session.get_locate_element(element)
+	assert new_handle is not None and new_handle is not handle
+	assert await new_handle.evaluate('element => element.isConnected')
+	assert await new_handle.text_content() == element.get_all_text_till_next_clickable_element()
+
+
+async def test_elements_are_resolved_by_their_index(browser_session: BrowserSession, http_server: HTTPServer):
+	await browser_session.navigate(http_server.url_for('/list'))
+	page = await browser_session.get_current_page()
+	state = await browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+	name_input, code_input = (element for element in state.selector_map.values() if element.tag_name == 'input')
+
+	# the selector built from the attributes no longer matches, the element is still the one that was extracted
+	await page.evaluate('document.getElementById("name").name = "renamed"')
+	prepared = await browser_session._prepare_element(name_input)
+	assert prepared is not None
+	assert await prepared.handle.evaluate('element => element.id') == 'name'
+	assert (prepared.tag_name, prepared.is_visible, prepared.readonly) == ('input', True, False)
+
+	prepared = await browser_session._prepare_element(code_input)
+	assert prepared is not None and prepared.readonly
+
+	await browser_session._input_text_element_node(name_input, 'Jane')
+	assert await page.evaluate('document.getElementById("name").value') == 'Jane'
+
+
+async def test_only_page_attribute_changes_bump_the_dom_version(browser_session: BrowserSession, http_server: HTTPServer):
+	await browser_session.navigate(http_server.url_for('/list'))
+	page = await browser_session.get_current_page()
+	tracker = browser_session.get_page_activity_tracker(page)
+	version = await tracker.get_dom_version()
+
+	# our own stamps and highlight ids are not changes of the page
+	await page.evaluate(
+		f"""() => {{
+			const button = document.querySelector('button');
+			button.setAttribute('{ELEMENT_ID_ATTRIBUTE}', '42');
+			button.setAttribute('browser-user-highlight-id', 'playwright-highlight-42');
+		}}"""
+	)
+	assert await tracker.get_dom_version() == version
+
+	# the changes of the page in the same batch are still counted
+	await page.evaluate(
+		f"""() => {{
+			const button = document.querySelector('button');
+			button.setAttribute('{ELEMENT_ID_ATTRIBUTE}', '43');
+			button.setAttribute('aria-pressed', 'true');
+		}}"""
+	)
+	assert await tracker.get_dom_version() != version
+
+
+async def test_stamps_are_not_read_back_as_attributes(browser_session: BrowserSession, http_server: HTTPServer):
+	await browser_session.navigate(http_server.url_for('/list'))
+	page = await browser_session.get_current_page()
+	await browser_session.get_state_summary(cache_clickable_elements_hashes=True)
+	assert await page.evaluate(f'document.querySelectorAll("[{ELEMENT_ID_ATTRIBUTE}]").length') > 0
+
+	# the elements were stamped by the first walk, they are not new on the second one
+	browser_session.mark_page_possibly_changed()
+	state = await browser_session.get_state_summary(cache_clickable_elements_hashes=True)
+	assert state.selector_map
+	for element in state.selector_map.values():
+		assert ELEMENT_ID_ATTRIBUTE not in element.attributes
+		assert not element.is_new
+
+
+async def test_stamps_of_cloned_elements_are_not_trusted(browser_session: BrowserSession, http_server: HTTPServer):
+	await browser_session.navigate(http_server.url_for('/list'))
+	page = await browser_session.get_current_page()
+	state = await browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+	button = next(element for element in state.selector_map.values() if element.tag_name == 'button')
+
+	# a clone before the element in the document keeps its stamp, the element is found by its selector instead
+	await page.evaluate('document.body.prepend(document.querySelector("#list button").cloneNode(true))')
+	handle = await browser_session._locate_element(page, button)
+	assert handle is not None
+	assert await handle.evaluate('element => element.parentElement.id') == 'list'
@@ -0,0 +1,94 @@
+"""
+Tests for the procedural memory created in the background with the LLM summarizer, which needs no mem0 embedder
+or vector store. The summaries come from a fake chat model.
+"""
+
+import asyncio
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from browser_use.agent.memory import Memory, MemoryConfig
+from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
+from browser_use.agent.views import MessageManagerState
+
+
+def message_manager_with_history(steps: int) -> MessageManager:
+	message_manager = MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='System prompt'),
+		settings=MessageManagerSettings(),
+		state=MessageManagerState(),
+	)
+	for step in range(steps):
+		message_manager._add_message_with_tokens(
+			AIMessage(
+				content='',
+				tool_calls=[{'name': 'AgentOutput', 'args': {'memory': f'Step {step}'}, 'id': str(step), 'type': 'tool_call'}],
+			)
+		)
+		message_manager._add_message_with_tokens(HumanMessage(content=f'Action result {step}'))
+	return message_manager
+
+
+def memory(message_manager: MessageManager, summary: str = 'Summary of the history') -> Memory:
+	llm = GenericFakeChatModel(messages=iter([AIMessage(content=summary)]))
+	return Memory(message_manager, llm, MemoryConfig(summarizer='llm'))
+
+
+async def test_compaction_runs_in_the_background_and_keeps_newer_messages():
+	message_manager = message_manager_with_history(3)
+	history = message_manager.state.history
+	init_messages = [m for m in history.messages if m.metadata.message_type == 'init']
+	agent_memory = memory(message_manager)
+	assert agent_memory.mem0 is None
+
+	agent_memory.start_compaction(current_step=3)
+	# nothing is swapped in before the summary is ready
+	assert not agent_memory.apply_compaction()
+
+	# the agent keeps working while the summary is created
+	message_manager._add_message_with_tokens(HumanMessage(content='Action result 3'))
+	newer_message = history.messages[-1]
+	await asyncio.sleep(0.1)
+
+	assert agent_memory.apply_compaction()
+	assert history.messages[: len(init_messages)] == init_messages
+	memory_message, last_message = history.messages[len(init_messages) :]
+	assert memory_message.message.content == 'Summary of the history'
+	assert memory_message.metadata.message_type == 'memory'
+	assert last_message is newer_message
+	assert history.current_tokens == sum(m.metadata.tokens for m in history.messages)
+
+
+async def test_summary_prompt_contains_the_history():
+	message_manager = message_manager_with_history(2)
+	agent_memory = memory(message_manager)
+	summary_messages = agent_memory._get_summary_messages([m.message for m in message_manager.state.history.messages[-4:]])
+	assert summary_messages[0].content == Memory.SUMMARY_PROMPT
+	assert summary_messages[1].content == (
+		'ai: {"memory": "Step 0"}\n\nhuman: Action result 0\n\nai: {"memory": "Step 1"}\n\nhuman: Action result 1'
+	)
+
+
+async def test_compaction_is_discarded_if_the_history_changed():
+	message_manager = message_manager_with_history(3)
+	agent_memory = memory(message_manager)
+	agent_memory.start_compaction(current_step=3)
+	message_manager.state.history.remove_last_state_message()
+	messages = list(message_manager.state.history.messages)
+	await asyncio.sleep(0.1)
+
+	assert not agent_memory.apply_compaction()
+	assert message_manager.state.history.messages == messages
+
+
+async def test_cancelled_compaction_is_not_applied():
+	message_manager = message_manager_with_history(3)
+	messages = list(message_manager.state.history.messages)
+	agent_memory = memory(message_manager)
+	agent_memory.start_compaction(current_step=3)
+	await agent_memory.cancel_compaction()
+
+	assert not agent_memory.apply_compaction()
+	assert message_manager.state.history.messages == messages
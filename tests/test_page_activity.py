@@ -0,0 +1,168 @@
+"""
+Tests for the PageActivityTracker, which tells when a page has settled from its network and navigation events,
+and for the read-only actions after which the page isn't waited for again.
+
+The events are emitted by a minimal page that only supports the listener API the tracker uses.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+import pytest
+
+from browser_use.agent.views import ActionResult
+from browser_use.browser import BrowserProfile, BrowserSession
+from browser_use.browser.page_activity import PageActivityTracker
+from browser_use.controller.registry.service import Registry
+from browser_use.controller.service import Controller
+from browser_use.exceptions import URLNotAllowedError
+
+
+class EventPage:
+	def __init__(self, url: str = 'https://example.com/'):
+		self.listeners = {}
+		self.url = url
+		self.main_frame = SimpleNamespace(parent_frame=None)
+
+	def on(self, event, listener):
+		self.listeners.setdefault(event, []).append(listener)
+
+	def remove_listener(self, event, listener):
+		self.listeners[event].remove(listener)
+
+	def emit(self, event, arg):
+		for listener in self.listeners.get(event, []):
+			listener(arg)
+
+	async def wait_for_load_state(self, state):
+		pass
+
+	async def evaluate(self, script, arg=None):
+		return True
+
+
+@dataclass(eq=False)
+class Request:
+	url: str
+	resource_type: str = 'document'
+	headers: dict = field(default_factory=dict)
+
+
+def response(request: Request, content_type: str = 'text/html'):
+	return SimpleNamespace(request=request, headers={'content-type': content_type})
+
+
+async def test_idle_page_is_settled_right_away():
+	page = EventPage()
+	tracker = PageActivityTracker(page)  # type: ignore
+	tracker.last_activity -= 10  # nothing happened while the agent was thinking
+
+	start = time.perf_counter()
+	await tracker.wait_for_network_idle(0.5)
+	assert time.perf_counter() - start < 0.05
+
+
+async def test_waits_for_pending_requests_and_the_idle_time():
+	page = EventPage()
+	tracker = PageActivityTracker(page)  # type: ignore
+	document = Request('https://example.com/')
+	analytics = Request('https://example.com/analytics.js', 'script')
+	image = Request('https://example.com/logo.png', 'image')
+	page.emit('request', document)
+	page.emit('request', analytics)
+	page.emit('request', image)
+	assert tracker.pending_requests == {document, image}
+
+	async def load():
+		await asyncio.sleep(0.1)
+		page.emit('response', response(document))
+		await asyncio.sleep(0.1)
+		page.emit('requestfailed', image)
+
+	start = time.perf_counter()
+	await asyncio.gather(tracker.wait_for_network_idle(0.2), load())
+	elapsed = time.perf_counter() - start
+
+	# idle 0.2s after the last response, not rounded up to a polling interval
+	assert 0.3 <= elapsed < 0.45
+	assert not tracker.pending_requests
+
+
+async def test_counts_main_frame_navigations():
+	page = EventPage()
+	tracker = PageActivityTracker(page)  # type: ignore
+	assert tracker.navigated_since_settled
+
+	tracker.settled_navigation_count = tracker.navigation_count
+	page.emit('framenavigated', SimpleNamespace(parent_frame=page.main_frame))
+	assert not tracker.navigated_since_settled
+
+	page.emit('framenavigated', page.main_frame)
+	assert tracker.navigated_since_settled
+
+	tracker.detach()
+	assert not any(page.listeners.values())
+
+
+async def test_navigation_is_handled_after_a_settle_timeout():
+	page = EventPage()
+	tracker = PageActivityTracker(page)  # type: ignore
+	page.emit('request', Request('https://example.com/stream'))
+	assert tracker.navigated_since_settled
+
+	assert not await tracker.wait_until_settled(0.05, timeout=0.1)
+	# the next state doesn't wait for the load of this navigation again
+	assert not tracker.navigated_since_settled
+
+	page.emit('response', response(next(iter(tracker.pending_requests))))
+	tracker.last_activity -= 10
+	assert await tracker.wait_until_settled(0.05, timeout=0.1)
+
+
+async def test_only_actions_that_are_not_read_only_mark_the_page_as_changed():
+	registry = Registry()
+
+	@registry.action('Read from the page', read_only=True)
+	async def read_page(selector: str, browser_session: BrowserSession):
+		return ActionResult(extracted_content='read')
+
+	@registry.action('Click on the page')
+	async def click_page(selector: str, browser_session: BrowserSession):
+		return ActionResult(extracted_content='clicked')
+
+	browser_session = BrowserSession()
+	browser_session._page_possibly_changed = False
+
+	await registry.execute_action('read_page', {'selector': 'h1'}, browser_session=browser_session)
+	assert not browser_session._page_possibly_changed
+
+	await registry.execute_action('click_page', {'selector': 'h1'}, browser_session=browser_session)
+	assert browser_session._page_possibly_changed
+
+	actions = Controller().registry.registry.actions
+	assert {name for name, action in actions.items() if action.read_only} == {'wait', 'extract_content', 'get_dropdown_options'}
+
+
+async def test_url_is_checked_after_a_page_load_timeout(monkeypatch):
+	page = EventPage('https://evil.test/')
+	browser_session = BrowserSession(
+		browser_profile=BrowserProfile(
+			allowed_domains=['example.com'], maximum_wait_page_load_time=0.1, minimum_wait_page_load_time=0
+		)
+	)
+
+	async def get_current_page(self):
+		return page
+
+	async def go_back(self):
+		pass
+
+	monkeypatch.setattr(BrowserSession, 'get_current_page', get_current_page)
+	monkeypatch.setattr(BrowserSession, 'go_back', go_back)
+	# a request that never finishes, the page never settles
+	page.emit('request', Request('https://evil.test/stream'))
+
+	with pytest.raises(URLNotAllowedError):
+		await browser_session._wait_for_page_and_frames_load()
@@ -0,0 +1,131 @@
+"""
+Tests for the cache-friendly message layout of the MessageManager: the prefix of the messages stays the same
+from one step to the next, and its end is marked with cache breakpoints for the providers that need them.
+"""
+
+import pytest
+from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
+from browser_use.agent.service import Agent
+from browser_use.agent.views import ActionResult, AgentBrain, AgentOutput, MessageManagerState
+from browser_use.browser.views import BrowserStateSummary, TabInfo
+from browser_use.dom.views import DOMElementNode
+
+BREAKPOINT = {'type': 'ephemeral'}
+
+
+def browser_state(url: str) -> BrowserStateSummary:
+	return BrowserStateSummary(
+		url=url,
+		title='Test Page',
+		element_tree=DOMElementNode(tag_name='div', attributes={}, children=[], is_visible=True, parent=None, xpath='//div'),
+		selector_map={},
+		tabs=[TabInfo(page_id=0, url=url, title='Test Page')],
+	)
+
+
+def run_step(message_manager: MessageManager, step: int) -> tuple[list[BaseMessage], list[BaseMessage]]:
+	"""
+	Adds the state of a step and the output of the LLM like Agent.step(),
+	returns the messages sent to the LLM, and the same messages without the cache breakpoints
+	"""
+	message_manager.add_state_message(
+		browser_state_summary=browser_state(f'https://example.com/{step}'),
+		result=[ActionResult(extracted_content=f'Result {step}', include_in_memory=True)],
+		use_vision=False,
+	)
+	messages = message_manager.get_messages()
+	unmarked_messages = message_manager.get_messages(add_cache_breakpoints=False)
+	message_manager._remove_last_state_message()
+	message_manager.add_model_output(
+		AgentOutput(
+			current_state=AgentBrain(evaluation_previous_goal='Success', memory=f'Step {step}', next_goal='Next'), action=[]
+		)
+	)
+	return messages, unmarked_messages
+
+
+def breakpoints(messages: list) -> list[int]:
+	return [
+		i
+		for i, message in enumerate(messages)
+		if isinstance(message.content, list) and any(block.get('cache_control') == BREAKPOINT for block in message.content)
+	]
+
+
+@pytest.fixture
+def message_manager():
+	return MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='System prompt'),
+		settings=MessageManagerSettings(
+			cache_breakpoints=True,
+			sensitive_data={'password': 'hunter2', 'username': 'admin'},
+			available_file_paths=['/tmp/file.txt'],
+		),
+		state=MessageManagerState(),
+	)
+
+
+def test_initial_messages_come_before_the_history(message_manager: MessageManager):
+	message_types = [m.metadata.message_type for m in message_manager.state.history.messages]
+	assert message_types == ['init'] * (len(message_types) - 1) + ['history_start']
+	contents = [str(m.message.content) for m in message_manager.state.history.messages]
+	assert "Here are placeholders for sensitive data: ['password', 'username']" in contents[2]
+	assert 'Here are file paths you can use' in contents[3]
+
+
+def test_cache_breakpoints_mark_the_stable_prefix(message_manager: MessageManager):
+	previous_messages: list[BaseMessage] = []
+	for step in range(3):
+		messages, unmarked_messages = run_step(message_manager, step)
+		history = message_manager.state.history.messages
+
+		# the system prompt, the last initial message and the last message before the state
+		init_end = max(
+			i for i, m in enumerate(history) if m.metadata.message_type == 'init' and isinstance(m.message, HumanMessage)
+		)
+		assert breakpoints(messages) == [0, init_end, len(messages) - 2]
+		assert f'Result {step}' in str(messages[-2].content)
+		assert [block['text'] for block in messages[0].content] == [unmarked_messages[0].content]  # type: ignore
+
+		# the breakpoints are only added to the messages sent to the LLM
+		assert not breakpoints(unmarked_messages)
+		assert not breakpoints([m.message for m in history])
+
+		# everything but the state of the previous step is a prefix of the messages of this step
+		prefix = previous_messages[:-1]
+		assert [m.content for m in unmarked_messages[: len(prefix)]] == [m.content for m in prefix]
+		previous_messages = unmarked_messages
+
+
+def test_cache_breakpoints_are_sent_to_anthropic(message_manager: MessageManager):
+	messages, _ = run_step(message_manager, 0)
+	payload = ChatAnthropic(model_name='claude-3-5-sonnet-latest', api_key='test', timeout=None, stop=None)._get_request_payload(
+		messages
+	)
+	assert payload['system'][-1]['cache_control'] == BREAKPOINT
+	cached_blocks = [
+		block
+		for message in payload['messages']
+		if isinstance(message['content'], list)
+		for block in message['content']
+		if block.get('cache_control')
+	]
+	assert len(cached_blocks) == 2
+
+
+def test_cached_input_tokens_are_read_from_the_usage_metadata():
+	message = AIMessage(
+		content='',
+		usage_metadata={
+			'input_tokens': 1200,
+			'output_tokens': 50,
+			'total_tokens': 1250,
+			'input_token_details': {'cache_read': 1024},
+		},
+	)
+	assert Agent._get_cached_input_tokens(message) == 1024
+	assert Agent._get_cached_input_tokens(AIMessage(content='')) is None
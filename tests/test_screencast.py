@@ -0,0 +1,83 @@
+"""
+Tests for the Screencast, which keeps the latest frames the browser paints for a page.
+
+The frames are sent by a minimal CDP session that only supports the API the screencast uses.
+"""
+
+import asyncio
+import time
+
+from browser_use.browser.screencast import SCREENCAST_FRAME_GRACE_TIME, Screencast
+
+
+class FakeCDPSession:
+	def __init__(self):
+		self.listeners = {}
+		self.sent = []
+
+	def on(self, event, listener):
+		self.listeners.setdefault(event, []).append(listener)
+
+	def remove_listener(self, event, listener):
+		self.listeners[event].remove(listener)
+
+	async def send(self, method, params=None):
+		self.sent.append((method, params))
+
+	def emit_frame(self, session_id: int):
+		for listener in self.listeners.get('Page.screencastFrame', []):
+			listener({'data': f'frame{session_id}', 'sessionId': session_id, 'metadata': {}})
+
+
+class PaintingPage:
+	"""Repaints during the next evaluate() if a change is pending"""
+
+	def __init__(self, cdp_session: FakeCDPSession):
+		self.cdp_session = cdp_session
+		self.pending_repaint: int | None = None
+
+	async def evaluate(self, expression):
+		if self.pending_repaint is not None:
+			session_id, self.pending_repaint = self.pending_repaint, None
+			asyncio.get_running_loop().call_later(0.01, self.cdp_session.emit_frame, session_id)
+
+
+async def test_frames_are_acknowledged_and_bounded():
+	cdp_session = FakeCDPSession()
+	page = PaintingPage(cdp_session)
+	screencast = Screencast(page, cdp_session, image_format='jpeg', quality=60, max_dimension=800, buffer_size=2)  # type: ignore
+	await screencast.start()
+	assert cdp_session.sent == [
+		('Page.startScreencast', {'format': 'jpeg', 'everyNthFrame': 1, 'quality': 60, 'maxWidth': 800, 'maxHeight': 800})
+	]
+
+	for session_id in range(5):
+		cdp_session.emit_frame(session_id)
+	await asyncio.sleep(0)
+
+	assert [frame.data for frame in screencast.frames] == ['frame3', 'frame4']
+	acks = [params['sessionId'] for method, params in cdp_session.sent if method == 'Page.screencastFrameAck']
+	assert acks == [0, 1, 2, 3, 4]
+
+	await screencast.stop()
+	assert not screencast.frames
+	assert not cdp_session.listeners['Page.screencastFrame']
+
+
+async def test_current_frame_waits_for_the_repaint():
+	cdp_session = FakeCDPSession()
+	page = PaintingPage(cdp_session)
+	screencast = Screencast(page, cdp_session)  # type: ignore
+	await screencast.start()
+	assert await screencast.get_current_frame() is None
+
+	cdp_session.emit_frame(1)
+	page.pending_repaint = 2
+	start = time.perf_counter()
+	frame = await screencast.get_current_frame()
+	assert frame and frame.data == 'frame2'
+	assert time.perf_counter() - start < SCREENCAST_FRAME_GRACE_TIME
+
+	# the page didn't repaint, the latest frame is still up to date
+	frame = await screencast.get_current_frame()
+	assert frame and frame.data == 'frame2'
@@ -5,6 +5,7 @@ from pydantic import BaseModel, Field
 from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
 from browser_use.agent.views import MessageManagerState
 from browser_use.controller.registry.service import Registry
+from browser_use.controller.views import FillFormAction
 
 
 class SensitiveParams(BaseModel):
@@ -62,6 +63,20 @@ def test_replace_sensitive_data_with_missing_keys(registry):
 	# Empty value should be treated the same as missing key
 
 
+def test_replace_sensitive_data_in_form_fields(registry):
+	"""Test that _replace_sensitive_data replaces the placeholders in each field of a form"""
+	params = FillFormAction(
+		fields=[
+			{'index': 1, 'value': '<secret>username</secret>'},
+			{'index': 2, 'value': '<secret>password</secret>'},
+			{'index': 3, 'value': 'not a secret'},
+		]
+	)
+	result = registry._replace_sensitive_data(params, {'username': 'user123', 'password': 'pass456'})
+	assert isinstance(result, FillFormAction)
+	assert [field.value for field in result.fields] == ['user123', 'pass456', 'not a secret']
+
+
 def test_filter_sensitive_data(message_manager):
 	"""Test that _filter_sensitive_data handles all sensitive data scenarios correctly"""
 	# Set up a message with sensitive information
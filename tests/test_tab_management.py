@@ -313,3 +313,70 @@ class TestTabManagement:
 		# close_tab should have called get_current_page, which creates a new about:blank tab if none are left
 		assert browser_session.human_current_page.url == 'about:blank'
 		assert browser_session.agent_current_page.url == 'about:blank'
+
+	@pytest.mark.asyncio
+	async def test_tab_titles_are_cached_until_navigation(self, browser_session, base_url):
+		"""Test that get_tabs_info only fetches the titles of the current tab and of tabs that navigated."""
+
+		first_tab = await self._reset_tab_state(browser_session, base_url)
+		await browser_session.navigate(f'{base_url}/page1')
+		await browser_session.create_new_tab(f'{base_url}/page2')
+
+		tabs = await browser_session.get_tabs_info()
+		assert [tab.title for tab in tabs] == ['Test Page 1', 'Test Page 2']
+
+		fetched_titles = []
+		original_fetch_tab_title = browser_session._fetch_tab_title
+
+		async def fetch_tab_title(page):
+			fetched_titles.append(page.url)
+			return await original_fetch_tab_title(page)
+
+		browser_session._fetch_tab_title = fetch_tab_title
+		try:
+			await browser_session.get_tabs_info()
+			assert fetched_titles == [f'{base_url}/page2']
+
+			fetched_titles.clear()
+			await first_tab.goto(f'{base_url}/page3')
+			tabs = await browser_session.get_tabs_info()
+			assert fetched_titles == [f'{base_url}/page3', f'{base_url}/page2']
+			assert [tab.title for tab in tabs] == ['Test Page 3', 'Test Page 2']
+		finally:
+			del browser_session._fetch_tab_title
+
+
+class NavigatingPage:
+	"""A page that navigates to a new document while its title is being fetched"""
+
+	def __init__(self):
+		self.listeners = {}
+		self.url = 'https://example.com/old'
+		self.main_frame = type('Frame', (), {'parent_frame': None})()
+		self.document_title = 'Old Title'
+		self.navigate_during_fetch = True
+
+	def on(self, event, listener):
+		self.listeners.setdefault(event, []).append(listener)
+
+	async def title(self):
+		title = self.document_title
+		await asyncio.sleep(0)
+		if self.navigate_during_fetch:
+			self.navigate_during_fetch = False
+			self.url, self.document_title = 'https://example.com/new', 'New Title'
+			for listener in self.listeners['framenavigated']:
+				listener(self.main_frame)
+		return title
+
+
+async def test_tab_title_fetched_before_a_navigation_is_not_cached():
+	browser_session = BrowserSession()
+	page = NavigatingPage()
+
+	assert await browser_session._fetch_tab_title(page) == 'Old Title'  # type: ignore
+	assert page not in browser_session._tab_titles
+
+	# without a navigation during the fetch, the title is cached
+	assert await browser_session._fetch_tab_title(page) == 'New Title'  # type: ignore
+	assert browser_session._tab_titles[page] == 'New Title'  # type: ignore
@@ -0,0 +1,229 @@
+"""
+Tests for the token accounting of the MessageManager: the pluggable tokenizers, the image tokens and cutting the
+messages to the input token budget.
+"""
+
+import base64
+import struct
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from browser_use.agent.message_manager import tokenizer as tokenizer_module
+from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
+from browser_use.agent.message_manager.tokenizer import (
+	TiktokenTokenizer,
+	Tokenizer,
+	_load_encoding,
+	count_openai_image_tokens,
+	get_image_size,
+	get_tokenizer,
+)
+from browser_use.agent.views import MessageManagerState
+
+
+class WordTokenizer(Tokenizer):
+	"""Counts every word as a token"""
+
+	def count_text_tokens(self, text: str) -> int:
+		return len(text.split())
+
+	def truncate_text(self, text: str, max_tokens: int) -> str:
+		return ' '.join(text.split()[:max_tokens])
+
+
+class WordEncoding:
+	"""A tiktoken encoding with a token for every word"""
+
+	def encode(self, text: str, disallowed_special=()) -> list[str]:
+		return text.split()
+
+	def decode(self, tokens: list[str]) -> str:
+		return ' '.join(tokens)
+
+
+def data_url(mime_type: str, data: bytes) -> str:
+	return f'data:{mime_type};base64,{base64.b64encode(data).decode()}'
+
+
+def png(width: int, height: int) -> bytes:
+	return b'\x89PNG\r\n\x1a\n' + struct.pack('>I4sII', 13, b'IHDR', width, height) + b'\x08\x06\x00\x00\x00' + b'\x00' * 64
+
+
+def jpeg(width: int, height: int) -> bytes:
+	app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00' + b'\x00' * 9
+	start_of_frame = b'\xff\xc0' + struct.pack('>HBHHB', 11, 8, height, width, 1) + b'\x11\x00'
+	return b'\xff\xd8' + app0 + start_of_frame + b'\x00' * 64
+
+
+def webp(width: int, height: int) -> bytes:
+	vp8x = b'VP8X' + struct.pack('<I', 10) + b'\x00' * 4 + (width - 1).to_bytes(3, 'little') + (height - 1).to_bytes(3, 'little')
+	return b'RIFF' + struct.pack('<I', 4 + len(vp8x)) + b'WEBP' + vp8x + b'\x00' * 32
+
+
+def message_manager(max_input_tokens: int, tokenizer: Tokenizer | None = None) -> MessageManager:
+	return MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='System prompt'),
+		settings=MessageManagerSettings(max_input_tokens=max_input_tokens),
+		state=MessageManagerState(),
+		tokenizer=tokenizer,
+	)
+
+
+def test_estimating_tokenizer():
+	tokenizer = Tokenizer(characters_per_token=3, image_tokens=800)
+	assert tokenizer.count_text_tokens('a' * 10) == 3
+	assert tokenizer.truncate_text('a' * 10, 2) == 'a' * 6
+	assert tokenizer.count_image_tokens(data_url('image/png', png(1280, 1100))) == 800
+
+
+def test_image_size_is_read_from_the_header():
+	assert get_image_size(data_url('image/png', png(1280, 1100))) == (1280, 1100)
+	assert get_image_size(data_url('image/jpeg', jpeg(1024, 768))) == (1024, 768)
+	assert get_image_size(data_url('image/webp', webp(800, 600))) == (800, 600)
+	assert get_image_size(data_url('image/gif', b'GIF89a' + b'\x00' * 64)) is None
+	assert get_image_size('https://example.com/image.png') is None
+
+
+def test_image_tokens_depend_on_the_model():
+	assert count_openai_image_tokens(1280, 1100) == 85 + 170 * 4
+	assert count_openai_image_tokens(512, 512) == 85 + 170
+
+	screenshot = data_url('image/png', png(1280, 1100))
+	assert get_tokenizer('gpt-4o').count_image_tokens(screenshot) == 765
+	assert get_tokenizer('claude-3-5-sonnet-latest', image_tokens=1500).count_image_tokens(screenshot) == 1500
+
+
+def test_other_providers_use_the_estimate():
+	for model_name in ('claude-3-5-sonnet-latest', 'gemini-2.0-flash', 'deepseek-chat'):
+		tokenizer = get_tokenizer(model_name, characters_per_token=4, image_tokens=500)
+		assert type(tokenizer) is Tokenizer
+		assert (tokenizer.characters_per_token, tokenizer.image_tokens) == (4, 500)
+	assert isinstance(get_tokenizer('gpt-4o'), TiktokenTokenizer)
+
+
+def test_tiktoken_tokenizer_falls_back_to_the_estimate():
+	tokenizer = TiktokenTokenizer('no_such_encoding', characters_per_token=4)
+	assert tokenizer.encoding is None
+	assert tokenizer.count_text_tokens('a' * 10) == 2
+	assert tokenizer.truncate_text('a' * 10, 2) == 'a' * 8
+
+
+def test_tiktoken_tokenizer_counts_exactly():
+	if _load_encoding('cl100k_base') is None:
+		pytest.skip('the cl100k_base encoding could not be loaded')
+	tokenizer = TiktokenTokenizer('cl100k_base')
+	assert tokenizer.count_text_tokens('hello world') == 2
+	text = 'The quick brown fox jumps over the lazy dog. ' * 20
+	assert tokenizer.count_text_tokens(tokenizer.truncate_text(text, 50)) == 50
+
+
+async def test_the_encoding_is_loaded_off_the_event_loop(monkeypatch):
+	loading_threads = []
+
+	def get_encoding(encoding_name: str) -> WordEncoding:
+		loading_threads.append(threading.current_thread())
+		return WordEncoding()
+
+	monkeypatch.setattr('tiktoken.get_encoding', get_encoding)
+	monkeypatch.setattr(tokenizer_module, '_encodings', {})
+	manager = message_manager(10_000, TiktokenTokenizer('word_encoding', characters_per_token=1))
+
+	# the tokens are estimated while the encoding is not loaded, instead of loading it on the event loop
+	assert loading_threads == []
+	assert manager.tokenizer.count_text_tokens('one two three') == len('one two three')
+
+	await manager.load_tokenizer()
+
+	assert loading_threads and loading_threads[0] is not threading.main_thread()
+	assert manager.tokenizer.count_text_tokens('one two three') == 3
+	messages = manager.state.history.messages
+	assert [m.metadata.tokens for m in messages] == [manager._count_tokens(m.message) for m in messages]
+	assert manager.state.history.current_tokens == sum(m.metadata.tokens for m in messages)
+
+
+def test_tokens_are_counted_once_with_the_tokenizer():
+	manager = message_manager(1000, WordTokenizer())
+	manager._add_message_with_tokens(HumanMessage(content='one two three'))
+	assert manager.state.history.messages[-1].metadata.tokens == 3
+	assert manager.state.history.current_tokens == sum(m.metadata.tokens for m in manager.state.history.messages)
+
+
+def test_cut_messages_fits_the_budget_exactly():
+	manager = message_manager(10_000, WordTokenizer())
+	initial_tokens = manager.state.history.current_tokens
+	manager.settings.max_input_tokens = initial_tokens + 100
+	screenshot = data_url('image/png', png(1280, 1100))
+	state = ' '.join(f'word{i}' for i in range(300))
+	manager._add_message_with_tokens(
+		HumanMessage(content=[{'type': 'text', 'text': state}, {'type': 'image_url', 'image_url': {'url': screenshot}}])
+	)
+	assert manager.state.history.messages[-1].metadata.tokens == 300 + 800
+
+	manager.cut_messages()
+
+	last_message = manager.state.history.messages[-1]
+	assert last_message.message.content == ' '.join(f'word{i}' for i in range(100))
+	assert last_message.metadata.tokens == 100
+	assert manager.state.history.current_tokens == manager.settings.max_input_tokens
+
+
+def test_cut_messages_only_removes_the_image_if_that_is_enough():
+	manager = message_manager(10_000)
+	manager.settings.max_input_tokens = manager.state.history.current_tokens + 500
+	screenshot = data_url('image/png', png(1280, 1100))
+	manager._add_message_with_tokens(
+		HumanMessage(content=[{'type': 'text', 'text': 'a' * 300}, {'type': 'image_url', 'image_url': {'url': screenshot}}])
+	)
+
+	manager.cut_messages()
+
+	assert manager.state.history.messages[-1].message.content == 'a' * 300
+	assert manager.state.history.messages[-1].metadata.tokens == 100
+
+
+def test_cut_messages_raises_if_the_history_is_too_long():
+	manager = message_manager(10_000, WordTokenizer())
+	manager.settings.max_input_tokens = manager.state.history.current_tokens
+	manager._add_message_with_tokens(HumanMessage(content='state ' * 50))
+	with pytest.raises(ValueError, match='Max token limit reached'):
+		manager.cut_messages()
+
+
+def test_cut_messages_fits_the_budget_with_the_estimate():
+	manager = message_manager(10_000, get_tokenizer('claude-3-5-sonnet-latest'))
+	manager.settings.max_input_tokens = manager.state.history.current_tokens + 100
+	screenshot = data_url('image/png', png(1280, 1100))
+	manager._add_message_with_tokens(
+		HumanMessage(content=[{'type': 'text', 'text': 'word ' * 1000}, {'type': 'image_url', 'image_url': {'url': screenshot}}])
+	)
+
+	manager.cut_messages()
+
+	assert manager.state.history.messages[-1].metadata.tokens == 100
+	assert manager.state.history.current_tokens == manager.settings.max_input_tokens
+
+
+def test_cut_messages_removes_the_oldest_history_first():
+	manager = message_manager(10_000, WordTokenizer())
+	for step in range(5):
+		manager._add_message_with_tokens(AIMessage(content=' '.join([f'step{step}'] * 20)))
+		manager.add_tool_message(content=f'result{step}')
+	manager.add_new_task('Second task')
+	manager.settings.max_input_tokens = manager.state.history.current_tokens + 40
+	manager._add_message_with_tokens(HumanMessage(content=' '.join(f'word{i}' for i in range(100))))
+
+	manager.cut_messages()
+
+	history = [m for m in manager.state.history.messages if m.metadata.message_type != 'init']
+	contents = [str(m.message.content) for m in history]
+	# the oldest step is removed with its tool message, the start of the history and the new task stay
+	assert contents[0] == '[Your task history memory starts here]'
+	assert not any(c.startswith(('step0', 'result0')) for c in contents)
+	assert contents[1].startswith('step1') and not isinstance(history[1].message, ToolMessage)
+	assert any('Second task' in c for c in contents)
+	# at least half of the state is kept
+	assert history[-1].metadata.tokens >= 50
+	assert manager.state.history.current_tokens <= manager.settings.max_input_tokens